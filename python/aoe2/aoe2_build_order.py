@@ -1,15 +1,35 @@
 import math
 from aoe2.aoe2_civ_icon import aoe2_civilization_icon
-from common.build_order_tools import check_valid_faction, FieldDefinition, check_valid_steps
+from common.build_order_tools import check_valid_faction, FieldDefinition, StepsValidator
 
 
-def check_valid_aoe2_build_order(data: dict, bo_name_msg: bool = False) -> (bool, str):
+# validator of the build order steps (fields definitions compiled once)
+aoe2_steps_validator = StepsValidator(
+    [
+        FieldDefinition('villager_count', 'integer', True),
+        FieldDefinition('age', 'integer', True, None, [-math.inf, 4]),
+        FieldDefinition('wood', 'integer', True, 'resources'),
+        FieldDefinition('food', 'integer', True, 'resources'),
+        FieldDefinition('gold', 'integer', True, 'resources'),
+        FieldDefinition('stone', 'integer', True, 'resources'),
+        FieldDefinition('builder', 'integer', False, 'resources'),
+        FieldDefinition('notes', 'array of strings', True),
+        FieldDefinition('time', 'string', False),
+    ]
+)
+
+
+def check_valid_aoe2_build_order(
+    data: dict, bo_name_msg: bool = False, all_errors: bool = False, check_steps: bool = True
+) -> (bool, str):
     """Check if a build order is valid for AoE2.
 
     Parameters
     ----------
     data           Data of the build order JSON file.
     bo_name_msg    True to add the build order name in the error message.
+    all_errors     True to report all the steps errors (one per line), False to stop at the first error.
+    check_steps    True to check the steps, False to only check the other fields (e.g. lazy loading).
 
     Returns
     -------
@@ -33,19 +53,10 @@ def check_valid_aoe2_build_order(data: dict, bo_name_msg: bool = False) -> (bool
         if not valid_faction:
             return False, faction_msg
 
-        fields = [
-            FieldDefinition('villager_count', 'integer', True),
-            FieldDefinition('age', 'integer', True, None, [-math.inf, 4]),
-            FieldDefinition('wood', 'integer', True, 'resources'),
-            FieldDefinition('food', 'integer', True, 'resources'),
-            FieldDefinition('gold', 'integer', True, 'resources'),
-            FieldDefinition('stone', 'integer', True, 'resources'),
-            FieldDefinition('builder', 'integer', False, 'resources'),
-            FieldDefinition('notes', 'array of strings', True),
-            FieldDefinition('time', 'string', False),
-        ]
+        if not check_steps:  # steps checked later
+            return True, ''
 
-        return check_valid_steps(data, bo_name_str, fields)
+        return aoe2_steps_validator.check(data, bo_name_str, all_errors)
 
     except KeyError as err:
         return False, bo_name_str + f'Wrong JSON key: {err}.'
@@ -53,6 +53,7 @@ class AoE2GameOverlay(RTSGameOverlay):
             settings_class=AoE2OverlaySettings,
             check_valid_build_order=check_valid_aoe2_build_order,
             get_faction_selection=get_aoe2_faction_selection,
+            build_order_sorting=aoe2_build_order_sorting,
             build_order_timer_step_starting_flag=False,
         )
 
@@ -78,9 +79,6 @@ class AoE2GameOverlay(RTSGameOverlay):
         self.civilization_select.setFont(QFont(layout.font_police, layout.font_size))
         self.civilization_select.adjustSize()
 
-        # sort build orders
-        self.build_orders.sort(key=aoe2_build_order_sorting)
-
         self.update_panel_elements()  # update the current panel elements
 
     def reload(self, update_settings):
@@ -104,9 +102,6 @@ class AoE2GameOverlay(RTSGameOverlay):
         self.civilization_select.setFont(QFont(layout.font_police, layout.font_size))
         self.civilization_select.adjustSize()
 
-        # sort build orders
-        self.build_orders.sort(key=aoe2_build_order_sorting)
-
         self.update_panel_elements()  # update the current panel elements
 
     def settings_scaling(self):
@@ -138,11 +133,7 @@ class AoE2GameOverlay(RTSGameOverlay):
                     key_condition={'civilization': self.civilization_combo_ids[civilization_id]}
                 )
                 if build_order_id >= 0:  # directly select in case of clicking
-                    self.select_build_order(
-                        key_condition={
-                            'civilization': self.civilization_combo_ids[self.civilization_select.currentIndex()]
-                        }
-                    )
+                    self.select_build_order()
                 self.config_panel_layout()
                 return True
         return False
@@ -186,9 +177,7 @@ class AoE2GameOverlay(RTSGameOverlay):
         """Actions performed when pressing the Enter key."""
         if self.selected_panel == PanelID.CONFIG:
             if self.build_order_search.hasFocus():
-                self.select_build_order(
-                    key_condition={'civilization': self.civilization_combo_ids[self.civilization_select.currentIndex()]}
-                )
+                self.select_build_order()
 
             self.config_panel_layout()  # update layout
 
@@ -244,50 +233,59 @@ class AoE2GameOverlay(RTSGameOverlay):
 
         self.config_panel_layout_resize_move()  # size and position
 
-    def update_build_order(self):
-        """Update the build order panel."""
-        super().update_build_order()
+    def get_resources_line(self, resource_step: dict) -> str:
+        """Get the line displaying the resources of a build order step.
+
+        Parameters
+        ----------
+        resource_step    Build order step.
+
+        Returns
+        -------
+        Line with images between @ markers, empty if no resource to display.
+        """
+        layout = self.settings.layout
+        spacing = ' ' * layout.build_order.resource_spacing  # space between the elements
+        images = self.images
+
+        # target resources
+        target_resources = resource_step['resources']
+        target_wood = target_resources['wood']
+        target_food = target_resources['food']
+        target_gold = target_resources['gold']
+        target_stone = target_resources['stone']
+        target_builder = target_resources['builder'] if ('builder' in target_resources) else -1
+        target_villager = resource_step['villager_count']
+
+        # line to display the target resources
+        resources_line = images.wood + '@ ' + (str(target_wood) if (target_wood >= 0) else ' ')
+        resources_line += spacing + '@' + images.food + '@ ' + (str(target_food) if (target_food >= 0) else ' ')
+        resources_line += spacing + '@' + images.gold + '@ ' + (str(target_gold) if (target_gold >= 0) else ' ')
+        resources_line += spacing + '@' + images.stone + '@ ' + (str(target_stone) if (target_stone >= 0) else ' ')
+        if target_builder > 0:  # add builders count if indicated
+            resources_line += spacing + '@' + images.builder + '@ ' + str(target_builder)
+        if target_villager >= 0:
+            resources_line += spacing + '@' + images.villager + '@ ' + str(target_villager)
+        if 1 <= resource_step['age'] <= 4:
+            resources_line += spacing + '@' + self.get_age_image(resource_step['age'])
+        # add time if indicated
+        if layout.show_time_resource and ('time' in resource_step) and (resource_step['time'] != ''):
+            resources_line += '@' + spacing + '@' + self.images.time + '@' + resource_step['time']
+
+        return resources_line
+
+    def update_build_order_displays(self):
+        """Update the build order resources and notes displays."""
+        super().update_build_order_displays()
 
         # valid build order selected
         if (self.selected_build_order is not None) and ('build_order' in self.selected_build_order):
 
-            layout = self.settings.layout
-            spacing = ' ' * layout.build_order.resource_spacing  # space between the elements
-
-            # get selected steps and corresponding IDs
-            selected_steps, selected_steps_ids = self.get_build_order_selected_steps_and_ids()
+            # get selected steps (precomputed display) and corresponding IDs
+            selected_steps, selected_steps_ids = self.get_build_order_selected_steps_display()
 
             # resource line
-            images = self.images
-            resource_step = selected_steps[selected_steps_ids[-1]]  # ID of the step to use to display the resources
-
-            # target resources
-            target_resources = resource_step['resources']
-            target_wood = target_resources['wood']
-            target_food = target_resources['food']
-            target_gold = target_resources['gold']
-            target_stone = target_resources['stone']
-            target_builder = target_resources['builder'] if ('builder' in target_resources) else -1
-            target_villager = resource_step['villager_count']
-
-            # line to display the target resources
-            resources_line = images.wood + '@ ' + (str(target_wood) if (target_wood >= 0) else ' ')
-            resources_line += spacing + '@' + images.food + '@ ' + (str(target_food) if (target_food >= 0) else ' ')
-            resources_line += spacing + '@' + images.gold + '@ ' + (str(target_gold) if (target_gold >= 0) else ' ')
-            resources_line += spacing + '@' + images.stone + '@ ' + (str(target_stone) if (target_stone >= 0) else ' ')
-            if target_builder > 0:  # add builders count if indicated
-                resources_line += spacing + '@' + images.builder + '@ ' + str(target_builder)
-            if target_villager >= 0:
-                resources_line += spacing + '@' + images.villager + '@ ' + str(target_villager)
-            if 1 <= resource_step['age'] <= 4:
-                resources_line += spacing + '@' + self.get_age_image(resource_step['age'])
-            # add time if indicated
-            if layout.show_time_resource and ('time' in resource_step) and (resource_step['time'] != ''):
-                resources_line += '@' + spacing + '@' + self.images.time + '@' + resource_step['time']
-
-            self.build_order_resources.add_row_from_picture_line(parent=self, line=str(resources_line))
+            self.update_build_order_resources(selected_steps, selected_steps_ids)
 
             # update the notes of the build order
             self.update_build_order_notes(selected_steps, selected_steps_ids)
-
-        self.build_order_panel_layout()  # update layout
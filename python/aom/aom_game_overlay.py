@@ -130,9 +130,7 @@ class AoMGameOverlay(RTSGameOverlay):
                 assert 0 <= major_god_id < len(self.major_god_combo_ids)
                 self.obtain_build_order_search(key_condition={'major_god': self.major_god_combo_ids[major_god_id]})
                 if build_order_id >= 0:  # directly select in case of clicking
-                    self.select_build_order(
-                        key_condition={'major_god': self.major_god_combo_ids[self.major_god_select.currentIndex()]}
-                    )
+                    self.select_build_order()
                 self.config_panel_layout()
                 return True
         return False
@@ -178,9 +176,7 @@ class AoMGameOverlay(RTSGameOverlay):
         """Actions performed when pressing the Enter key."""
         if self.selected_panel == PanelID.CONFIG:
             if self.build_order_search.hasFocus():
-                self.select_build_order(
-                    key_condition={'major_god': self.major_god_combo_ids[self.major_god_select.currentIndex()]}
-                )
+                self.select_build_order()
 
             self.config_panel_layout()  # update layout
 
@@ -236,64 +232,72 @@ class AoMGameOverlay(RTSGameOverlay):
 
         self.config_panel_layout_resize_move()  # size and position
 
-    def update_build_order(self):
-        """Update the build order panel."""
-        super().update_build_order()
+    def get_resources_line(self, resource_step: dict) -> str:
+        """Get the line displaying the resources of a build order step.
+
+        Parameters
+        ----------
+        resource_step    Build order step.
+
+        Returns
+        -------
+        Line with images between @ markers, empty if no resource to display.
+        """
+        layout = self.settings.layout
+        spacing = ' ' * layout.build_order.resource_spacing  # space between the elements
+        images = self.images
+
+        # target resources
+        target_resources = resource_step['resources']
+        target_food = target_resources['food']
+        target_wood = target_resources['wood']
+        target_gold = target_resources['gold']
+        target_favor = target_resources['favor']
+        target_builder = target_resources['builder'] if ('builder' in target_resources) else -1
+        target_worker = resource_step['worker_count']
+
+        # line to display the target resources
+        display_age = 1 <= resource_step['age'] <= 5
+        display_time = layout.show_time_resource and ('time' in resource_step) and (resource_step['time'] != '')
+        if (
+            (target_food >= 0)
+            or (target_wood >= 0)
+            or (target_gold >= 0)
+            or (target_favor >= 0)
+            or (target_builder >= 0)
+            or (target_worker >= 0)
+            or display_age
+            or display_time
+        ):
+            resources_line = images.food + '@ ' + (str(target_food) if (target_food >= 0) else ' ')
+            resources_line += spacing + '@' + images.wood + '@ ' + (str(target_wood) if (target_wood >= 0) else ' ')
+            resources_line += spacing + '@' + images.gold + '@ ' + (str(target_gold) if (target_gold >= 0) else ' ')
+            resources_line += spacing + '@' + images.favor + '@ ' + (str(target_favor) if (target_favor >= 0) else ' ')
+            if target_builder >= 0:  # add builders count if indicated
+                resources_line += spacing + '@' + images.builder + '@ ' + str(target_builder)
+            if target_worker >= 0:
+                resources_line += spacing + '@' + images.worker + '@ ' + str(target_worker)
+            if display_age:
+                resources_line += spacing + '@' + self.get_age_image(resource_step['age'])
+            # add time if indicated
+            if display_time:
+                resources_line += '@' + spacing + '@' + self.images.time + '@' + resource_step['time']
+
+            return resources_line
+        return ''
+
+    def update_build_order_displays(self):
+        """Update the build order resources and notes displays."""
+        super().update_build_order_displays()
 
         # valid build order selected
         if (self.selected_build_order is not None) and ('build_order' in self.selected_build_order):
 
-            layout = self.settings.layout
-            spacing = ' ' * layout.build_order.resource_spacing  # space between the elements
-
-            # get selected steps and corresponding IDs
-            selected_steps, selected_steps_ids = self.get_build_order_selected_steps_and_ids()
+            # get selected steps (precomputed display) and corresponding IDs
+            selected_steps, selected_steps_ids = self.get_build_order_selected_steps_display()
 
             # resource line
-            images = self.images
-            resource_step = selected_steps[selected_steps_ids[-1]]  # ID of the step to use to display the resources
-
-            # target resources
-            target_resources = resource_step['resources']
-            target_food = target_resources['food']
-            target_wood = target_resources['wood']
-            target_gold = target_resources['gold']
-            target_favor = target_resources['favor']
-            target_builder = target_resources['builder'] if ('builder' in target_resources) else -1
-            target_worker = resource_step['worker_count']
-
-            # line to display the target resources
-            display_age = 1 <= resource_step['age'] <= 5
-            display_time = layout.show_time_resource and ('time' in resource_step) and (resource_step['time'] != '')
-            if (
-                (target_food >= 0)
-                or (target_wood >= 0)
-                or (target_gold >= 0)
-                or (target_favor >= 0)
-                or (target_builder >= 0)
-                or (target_worker >= 0)
-                or display_age
-                or display_time
-            ):
-                resources_line = images.food + '@ ' + (str(target_food) if (target_food >= 0) else ' ')
-                resources_line += spacing + '@' + images.wood + '@ ' + (str(target_wood) if (target_wood >= 0) else ' ')
-                resources_line += spacing + '@' + images.gold + '@ ' + (str(target_gold) if (target_gold >= 0) else ' ')
-                resources_line += (
-                    spacing + '@' + images.favor + '@ ' + (str(target_favor) if (target_favor >= 0) else ' ')
-                )
-                if target_builder >= 0:  # add builders count if indicated
-                    resources_line += spacing + '@' + images.builder + '@ ' + str(target_builder)
-                if target_worker >= 0:
-                    resources_line += spacing + '@' + images.worker + '@ ' + str(target_worker)
-                if display_age:
-                    resources_line += spacing + '@' + self.get_age_image(resource_step['age'])
-                # add time if indicated
-                if display_time:
-                    resources_line += '@' + spacing + '@' + self.images.time + '@' + resource_step['time']
-
-                self.build_order_resources.add_row_from_picture_line(parent=self, line=str(resources_line))
+            self.update_build_order_resources(selected_steps, selected_steps_ids)
 
             # update the notes of the build order
             self.update_build_order_notes(selected_steps, selected_steps_ids)
-
-        self.build_order_panel_layout()  # update layout
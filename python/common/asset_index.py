@@ -0,0 +1,146 @@
+import os
+import re
+from typing import Union
+
+IMAGE_EXTENSIONS = ['.webp', '.png', '.jpg']  # extensions of the images, in order of preference
+IMAGE_EXTENSION_REGEX = re.compile(r'\.(webp|png|jpg)$')  # extension of a searched image
+
+
+def scan_images(folder: str, images: dict, relative_folder: str = ''):
+    """Scan a folder (recursively) to store its images.
+
+    Parameters
+    ----------
+    folder             Folder to scan.
+    images             Images found, updated as {relative path without extension: {extension: path}}
+                       (extension kept with its case).
+    relative_folder    Path of 'folder' relative to the scanned root folder ('' for the root folder).
+    """
+    try:
+        entries = list(os.scandir(folder))
+    except OSError:  # folder not available
+        return
+
+    for entry in entries:
+        relative_path = f'{relative_folder}/{entry.name}' if relative_folder else entry.name
+        try:
+            if entry.is_dir():
+                scan_images(entry.path, images, relative_path)
+                continue
+        except OSError:
+            continue
+
+        base_path, extension = os.path.splitext(relative_path)
+        if extension.lower() in IMAGE_EXTENSIONS:
+            images.setdefault(base_path, dict())[extension] = entry.path
+
+
+class AssetIndex:
+    """Index of the images available in the pictures folders, scanned once (no file system access to find them)."""
+
+    def __init__(self, folders: list, case_insensitive: bool = False):
+        """Constructor
+
+        Parameters
+        ----------
+        folders             Pictures folders, in order of priority (None elements ignored).
+        case_insensitive    True to look for the images without considering the case if not found with it.
+        """
+        self.folders = [folder for folder in folders if folder is not None]
+        self.case_insensitive = case_insensitive
+
+        self.images = []  # images of each folder as {relative path without extension: {extension: path}}
+        self.lower_images = []  # same as 'images' with lower case keys (for the case insensitive search)
+        self.lookups = dict()  # results of the previous searches (including the images not found) as {search: path}
+        self.refresh()
+
+    def refresh(self):
+        """Scan the folders again (e.g. after adding images)."""
+        self.images.clear()
+        self.lower_images.clear()
+        self.lookups.clear()
+        for folder in self.folders:
+            images = dict()
+            scan_images(folder, images)
+            self.images.append(images)
+
+            lower_images = dict()
+            for base_path, extensions in images.items():
+                lower_extensions = lower_images.setdefault(base_path.lower(), dict())
+                for extension, path in extensions.items():
+                    lower_extensions.setdefault(extension.lower(), path)  # first one kept in case of conflict
+            self.lower_images.append(lower_images)
+
+    def set_case_insensitive(self, case_insensitive: bool):
+        """Set the case insensitive search.
+
+        Parameters
+        ----------
+        case_insensitive    True to look for the images without considering the case if not found with it.
+        """
+        if case_insensitive != self.case_insensitive:
+            self.case_insensitive = case_insensitive
+            self.lookups.clear()
+
+    def find(self, images_list: list, base_path: str, ordered_extensions: list) -> Union[str, None]:
+        """Find an image in the indexed folders.
+
+        Parameters
+        ----------
+        images_list           Images of each folder, see 'images' and 'lower_images'.
+        base_path             Relative path of the image without extension (with '/' separators).
+        ordered_extensions    Extensions to try, in order of preference.
+
+        Returns
+        -------
+        Image with its path, None if not found.
+        """
+        for extension in ordered_extensions:  # same priority as checking each extension in each folder
+            for images in images_list:
+                extensions = images.get(base_path)
+                if (extensions is not None) and (extension in extensions):
+                    return extensions[extension]
+        return None
+
+    def get_image_path(self, image_search: str) -> Union[str, None]:
+        """Get the path for an image.
+
+        Parameters
+        ----------
+        image_search    Image to search, relative to the pictures folders (extension optional).
+
+        Returns
+        -------
+        Image with its path, None if not found.
+        """
+        if image_search in self.lookups:
+            return self.lookups[image_search]
+
+        # extract current extension (if any) and try it first
+        match = IMAGE_EXTENSION_REGEX.search(image_search)
+        current_ext = match.group(0) if match else None
+        base_path = image_search[: -len(current_ext)] if current_ext else image_search
+        ordered_extensions = (
+            [current_ext] + [ext for ext in IMAGE_EXTENSIONS if ext != current_ext] if current_ext else IMAGE_EXTENSIONS
+        )
+
+        normalized_path = base_path.replace('\\', '/')
+        if os.path.isabs(base_path) or any(part in ['', '.', '..'] for part in normalized_path.split('/')):
+            image_path = None  # not in the index: check the files (only once for this search)
+            for ext in ordered_extensions:
+                for folder in self.folders:
+                    folder_image_path = os.path.join(folder, f'{base_path}{ext}')
+                    if os.path.isfile(folder_image_path):
+                        image_path = folder_image_path
+                        break
+                if image_path is not None:
+                    break
+        else:
+            image_path = self.find(self.images, normalized_path, ordered_extensions)
+            if (image_path is None) and self.case_insensitive:
+                image_path = self.find(
+                    self.lower_images, normalized_path.lower(), [ext.lower() for ext in ordered_extensions]
+                )
+
+        self.lookups[image_search] = image_path
+        return image_path
@@ -0,0 +1,190 @@
+import os
+import sys
+import json
+import hashlib
+
+# version of the cache content, to increase when the cache format changes (the validation code being in the signature)
+BUILD_ORDER_CACHE_VERSION = 3
+
+# directory of the overlay sources: only the validation code located there is followed in the signature
+SOURCES_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def is_source_object(value) -> bool:
+    """Check if a function or class is defined in the overlay sources (i.e. not a library or a builtin).
+
+    Parameters
+    ----------
+    value    Object to check.
+
+    Returns
+    -------
+    True if defined in the overlay sources.
+    """
+    module = sys.modules.get(getattr(value, '__module__', None) or '')
+    module_file = getattr(module, '__file__', None)
+    return (module_file is not None) and os.path.abspath(module_file).startswith(SOURCES_DIRECTORY + os.sep)
+
+
+def update_code_signature(signature, function, visited: set):
+    """Add the code of a function to a signature, following the functions and classes of the sources it uses.
+
+    Parameters
+    ----------
+    signature    Signature to update (see 'hashlib').
+    function     Function (or method) whose code is added.
+    visited      Identifiers of the objects already added (updated).
+    """
+    if (id(function) in visited) or (getattr(function, '__code__', None) is None):
+        return
+    visited.add(id(function))
+    function_globals = getattr(function, '__globals__', dict())
+
+    codes = [function.__code__]  # function code, then its nested functions and comprehensions
+    while codes:
+        code = codes.pop()
+        signature.update(code.co_code)
+        signature.update(repr([const for const in code.co_consts if isinstance(const, (str, int, float))]).encode())
+        codes += [const for const in code.co_consts if hasattr(const, 'co_code')]
+
+        for name in code.co_names:
+            value = function_globals.get(name)
+            if isinstance(value, dict):  # e.g. factions lists (civilizations)
+                signature.update(f'{name}:{sorted(value.keys())}'.encode())
+            elif hasattr(value, 'signature'):  # compiled steps validator (see 'StepsValidator')
+                signature.update(f'{name}:{value.signature}'.encode())
+                value = type(value)
+
+            if isinstance(value, type) and is_source_object(value) and (id(value) not in visited):  # class methods
+                visited.add(id(value))
+                for attribute in vars(value).values():
+                    update_code_signature(signature, getattr(attribute, '__func__', attribute), visited)
+            elif is_source_object(value):
+                update_code_signature(signature, value, visited)
+
+
+def get_validator_signature(
+    check_valid_build_order, category_name: str = None, metadata_only: bool = False, load_function=None
+) -> str:
+    """Get a signature of a build order validator, used to invalidate the cache when the validation rules change.
+
+    The signature covers the code of the validator and of the functions and classes of the sources it uses
+    (e.g. 'check_valid_faction' or 'StepsValidator'), followed recursively.
+
+    Parameters
+    ----------
+    check_valid_build_order    Function to check if a build order is valid.
+    category_name              Name of the category field (see 'get_build_orders'), None if no category.
+    metadata_only              True if only the metadata of the build orders are stored (see 'load_build_order_file').
+    load_function              Function reading and validating a build order file (see 'load_build_order_file'),
+                               whose code is also part of the signature, None to skip it.
+
+    Returns
+    -------
+    Signature of the validator (hexadecimal string).
+    """
+    signature = hashlib.sha1()
+    signature.update(f'{BUILD_ORDER_CACHE_VERSION}|{category_name}|{metadata_only}'.encode())
+    signature.update(f'{check_valid_build_order.__module__}.{check_valid_build_order.__qualname__}'.encode())
+
+    visited = set()
+    update_code_signature(signature, check_valid_build_order, visited)
+    if load_function is not None:
+        update_code_signature(signature, load_function, visited)
+
+    return signature.hexdigest()
+
+
+class BuildOrderCache:
+    """On-disk cache of the parsed and validated build orders."""
+
+    def __init__(self, cache_file: str, signature: str):
+        """Constructor
+
+        Parameters
+        ----------
+        cache_file    File used to store the cache (JSON format).
+        signature     Signature of the validator (see 'get_validator_signature').
+        """
+        self.cache_file = cache_file
+        self.signature = signature
+        self.entries = dict()  # cache entries as {path: {'mtime_ns', 'size', 'data', 'error'}}
+        self.updated = False  # True if the entries must be saved
+
+        self.load()
+
+    def load(self):
+        """Load the cache file (ignored if missing, corrupted or obtained with another validator)."""
+        self.entries = dict()
+        self.updated = False
+
+        if not os.path.isfile(self.cache_file):
+            return
+
+        try:
+            with open(self.cache_file, 'rb') as f:
+                cache_data = json.load(f)
+            if isinstance(cache_data, dict) and (cache_data.get('signature') == self.signature):
+                self.entries = cache_data['entries']
+            else:
+                print(f'Build orders cache \'{self.cache_file}\' outdated, build orders will be validated again.')
+        except (OSError, ValueError, KeyError):
+            print(f'Could not read build orders cache \'{self.cache_file}\', build orders will be validated again.')
+
+    def get(self, path: str, stat: os.stat_result) -> (bool, dict, str):
+        """Get the cached content of a build order file.
+
+        Parameters
+        ----------
+        path    Path of the build order file.
+        stat    Result of 'os.stat' on this file.
+
+        Returns
+        -------
+        True if the file content is cached (and up-to-date), False otherwise.
+        Valid build order data, None if not valid (or not cached).
+        Error message (empty if valid or not cached).
+        """
+        entry = self.entries.get(path)
+        if (entry is None) or (entry['mtime_ns'] != stat.st_mtime_ns) or (entry['size'] != stat.st_size):
+            return False, None, ''
+        return True, entry['data'], entry['error']
+
+    def set(self, path: str, stat: os.stat_result, data: dict, error: str):
+        """Store the content of a build order file.
+
+        Parameters
+        ----------
+        path     Path of the build order file.
+        stat     Result of 'os.stat' on this file (obtained before reading it).
+        data     Valid build order data, None if not valid.
+        error    Error message (empty if valid).
+        """
+        self.entries[path] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'data': data, 'error': error}
+        self.updated = True
+
+    def evict(self, existing_paths: set):
+        """Remove the entries of files which do not exist anymore.
+
+        Parameters
+        ----------
+        existing_paths    Paths of the build order files still present.
+        """
+        for path in [path for path in self.entries if path not in existing_paths]:
+            del self.entries[path]
+            self.updated = True
+
+    def save(self):
+        """Save the cache file (only if it was updated)."""
+        if not self.updated:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            temporary_file = self.cache_file + '.tmp'
+            with open(temporary_file, 'w') as f:
+                f.write(json.dumps({'signature': self.signature, 'entries': self.entries}))
+            os.replace(temporary_file, self.cache_file)  # avoid a corrupted cache if interrupted
+            self.updated = False
+        except OSError:
+            print(f'Could not save build orders cache \'{self.cache_file}\'.')
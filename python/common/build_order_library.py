@@ -0,0 +1,489 @@
+from bisect import insort, bisect_left
+from collections import OrderedDict
+
+from common.build_order_notes_index import NOTES_TERMS_KEY, BuildOrderNotesIndex, get_build_order_notes_terms
+
+
+def get_build_order_metadata(data: dict) -> dict:
+    """Get the metadata of a build order, i.e. all its fields except the steps, with its notes terms.
+
+    Parameters
+    ----------
+    data    Full build order data.
+
+    Returns
+    -------
+    Metadata of the build order.
+    """
+    metadata = {key: value for key, value in data.items() if key != 'build_order'}
+    metadata[NOTES_TERMS_KEY] = get_build_order_notes_terms(data)  # notes searched without reading the file
+    return metadata
+
+
+class BuildOrderLibrary:
+    """Store of the valid build orders, indexed by name (and category), with stable integer handles."""
+
+    def __init__(
+        self, category_name: str = None, sort_key=None, loader=None, resident_count: int = 10, path_order_key=None
+    ):
+        """Constructor
+
+        Parameters
+        ----------
+        category_name     If not None, accept build orders with same name, if they are in different categories.
+        sort_key          Function providing the sorting key of a build order (kept sorted when adding elements),
+                          None to keep the insertion order.
+        loader            Function reading and validating the full build order from its file, returning the data
+                          (None if not valid) and an error message (see 'load_build_order_file'),
+                          None if the added build orders are already full (i.e. not only their metadata).
+        resident_count    Maximal number of full build orders kept in memory (only used with a loader).
+        path_order_key    Function providing the sorting key of a file (see 'get_scan_order_key'): among build orders
+                          with the same key (name and category), the one with the first file is kept,
+                          None to keep the first added one.
+        """
+        self.category_name = category_name
+        self.sort_key = sort_key
+        self.loader = loader
+        self.resident_count = max(1, resident_count)
+        self.path_order_key = path_order_key
+
+        self.build_orders = []  # build orders data, accessed by handle (None for removed build orders)
+        self.paths = []  # file of each build order, accessed by handle (None if unknown)
+        self.handles_by_key = dict()  # handles as {(name, category): handle}
+        self.handles_by_name = dict()  # handles as {name: [handles]}
+        self.handles_by_path = dict()  # handles as {path: handle}, for the build orders with a known file
+        self.shadowed_paths = dict()  # files skipped as already added, as {path: key}, in the adding order
+        self.sorted_entries = []  # sorted list of (sorting key, handle)
+        self.sorted_handles = None  # handles in sorted order (None if must be updated)
+        self.sort_values = []  # sorting key of each build order, accessed by handle
+        self.version = 0  # incremented each time the content changes
+
+        # inverted indexes of the key values (e.g. civilization) as {key: (values, generic)} with
+        # values as {value: set of handles} and generic as set of handles valid for any value
+        self.key_indexes = dict()
+        self.filter_cache = dict()  # results of 'filter' for the current version, as {conditions: handles}
+        self.notes_index = BuildOrderNotesIndex()  # index of the notes terms, filled when adding the build orders
+
+        # only used with a loader
+        self.resident_build_orders = OrderedDict()  # full build orders as {handle: data}, least recently used first
+        self.errors = dict()  # errors found when reading the full build orders as {handle: error message}
+
+    def __len__(self) -> int:
+        """Count of build orders in the library."""
+        return len(self.sorted_entries)
+
+    def __iter__(self):
+        """Iterate on the build orders data, in sorted order."""
+        for handle in self.handles():
+            yield self.build_orders[handle]
+
+    def get_key(self, data: dict) -> tuple:
+        """Get the key identifying a build order.
+
+        Parameters
+        ----------
+        data    Build order data.
+
+        Returns
+        -------
+        Key as (name, category), category being None if no category.
+        """
+        if self.category_name is None:
+            return data['name'], None
+
+        category = data[self.category_name]
+        return data['name'], (tuple(category) if isinstance(category, list) else category)
+
+    def add(self, data: dict, path: str = None) -> int:
+        """Add a build order.
+
+        Parameters
+        ----------
+        data    Build order data (already validated).
+        path    File of the build order, None if unknown.
+
+        Returns
+        -------
+        Handle of the build order, -1 if a build order with the same key (name and category) is kept instead
+        (its file is then kept, see 'pop_shadowed_paths').
+        """
+        key = self.get_key(data)
+        other_handle = self.handles_by_key.get(key, -1)
+        if other_handle >= 0:
+            other_path = self.paths[other_handle]
+            if (
+                (path is None)
+                or (other_path is None)
+                or (self.path_order_key is None)
+                or (self.path_order_key(other_path) < self.path_order_key(path))
+            ):
+                if path is not None:
+                    self.shadowed_paths[path] = key
+                return -1
+
+            # file before the one of the same build order: replacing it
+            self.remove(other_handle)
+            self.shadowed_paths[other_path] = key
+
+        handle = len(self.build_orders)
+        self.build_orders.append(None)
+        self.paths.append(None)
+        self.sort_values.append(None)
+        self.set_entry(handle, data, path)
+        return handle
+
+    def set_entry(self, handle: int, data: dict, path: str):
+        """Set and index the data of a build order, whose key is not yet used (see 'add' and 'replace').
+
+        Parameters
+        ----------
+        handle    Handle of the build order (without data).
+        data      Build order data (already validated).
+        path      File of the build order, None if unknown.
+        """
+        self.build_orders[handle] = data
+        self.paths[handle] = path
+        self.handles_by_key[self.get_key(data)] = handle
+        insort(self.handles_by_name.setdefault(data['name'], []), handle)  # handles in adding order
+        if path is not None:
+            self.handles_by_path[path] = handle
+
+        # handles are increasing, so build orders with the same sorting key keep the insertion order
+        sort_value = self.sort_key(data) if self.sort_key else 0
+        self.sort_values[handle] = sort_value
+        insort(self.sorted_entries, (sort_value, handle))
+
+        for key_name, key_index in self.key_indexes.items():
+            self.index_key_value(key_index, key_name, handle, add_flag=True)
+        self.notes_index.add(handle, data)
+
+        self.content_updated()
+
+    def replace(self, handle: int, data: dict) -> bool:
+        """Replace the data of a build order (e.g. file modified), keeping its handle and file.
+
+        Parameters
+        ----------
+        handle    Handle of the build order.
+        data      New build order data (already validated).
+
+        Returns
+        -------
+        True if replaced, False if invalid handle or if another build order has the same key (name and category).
+        """
+        if (self.get(handle) is None) or (self.handles_by_key.get(self.get_key(data), handle) != handle):
+            return False
+
+        path = self.paths[handle]
+        self.remove(handle)
+        self.set_entry(handle, data, path)
+        return True
+
+    def remove(self, handle: int) -> bool:
+        """Remove a build order (its handle is never reused).
+
+        Parameters
+        ----------
+        handle    Handle of the build order.
+
+        Returns
+        -------
+        True if removed, False if invalid handle.
+        """
+        data = self.get(handle)
+        if data is None:
+            return False
+
+        del self.handles_by_key[self.get_key(data)]
+        name_handles = self.handles_by_name[data['name']]
+        name_handles.remove(handle)
+        if not name_handles:
+            del self.handles_by_name[data['name']]
+        path = self.paths[handle]
+        if (path is not None) and (self.handles_by_path.get(path) == handle):
+            del self.handles_by_path[path]
+
+        entry = (self.sort_values[handle], handle)
+        entry_id = bisect_left(self.sorted_entries, entry)
+        assert self.sorted_entries[entry_id] == entry
+        del self.sorted_entries[entry_id]
+
+        for key_name, key_index in self.key_indexes.items():
+            self.index_key_value(key_index, key_name, handle, add_flag=False)
+        self.notes_index.remove(handle)
+
+        self.resident_build_orders.pop(handle, None)
+        self.errors.pop(handle, None)
+        self.build_orders[handle] = None
+        self.paths[handle] = None
+        self.content_updated()
+        return True
+
+    def content_updated(self):
+        """Invalidate the data derived from the content (to call after each content change)."""
+        self.sorted_handles = None
+        self.filter_cache.clear()
+        self.version += 1
+
+    def get(self, handle: int) -> dict:
+        """Get a build order data.
+
+        Parameters
+        ----------
+        handle    Handle of the build order.
+
+        Returns
+        -------
+        Build order data, None if invalid handle.
+        """
+        return self.build_orders[handle] if (0 <= handle < len(self.build_orders)) else None
+
+    def get_full(self, handle: int) -> (dict, str):
+        """Get a full build order data (i.e. with its steps), read and validated at first request with a loader.
+
+        If the file was modified since its metadata were read, the build order is updated (same handle).
+
+        Parameters
+        ----------
+        handle    Handle of the build order.
+
+        Returns
+        -------
+        Full build order data, None if invalid handle or not valid build order.
+        Message explaining why the build order is not valid (empty if valid).
+        """
+        data = self.get(handle)
+        if (data is None) or (self.loader is None) or (self.paths[handle] is None):
+            return data, ''
+
+        full_data = self.resident_build_orders.get(handle)
+        if full_data is not None:
+            self.resident_build_orders.move_to_end(handle)
+            return full_data, ''
+
+        error_msg = self.errors.get(handle)
+        if error_msg is not None:  # already known as not valid
+            return None, error_msg
+
+        path = self.paths[handle]
+        full_data, error_msg = self.loader(path)
+        if full_data is None:
+            self.errors[handle] = error_msg
+            return None, error_msg
+
+        metadata = get_build_order_metadata(full_data)
+        if metadata != data:  # file modified since its metadata were read: indexes updated
+            old_key = self.get_key(data)
+            if not self.replace(handle, metadata):
+                error_msg = f'Build order file \'{path}\' modified, same name as another build order.'
+                self.errors[handle] = error_msg
+                return None, error_msg
+            if self.get_key(metadata) != old_key:  # files skipped as duplicates of the previous version
+                self.restore_shadowed_paths(old_key)
+
+        self.resident_build_orders[handle] = full_data
+        while len(self.resident_build_orders) > self.resident_count:
+            self.resident_build_orders.popitem(last=False)
+        return full_data, ''
+
+    def get_error(self, handle: int) -> str:
+        """Get the error found when reading a full build order (see 'get_full').
+
+        Parameters
+        ----------
+        handle    Handle of the build order.
+
+        Returns
+        -------
+        Error message, empty if no error found (yet).
+        """
+        return self.errors.get(handle, '')
+
+    def get_path(self, handle: int) -> str:
+        """Get the file of a build order.
+
+        Parameters
+        ----------
+        handle    Handle of the build order.
+
+        Returns
+        -------
+        File of the build order, None if unknown or invalid handle.
+        """
+        return self.paths[handle] if (0 <= handle < len(self.paths)) else None
+
+    def find(self, name: str, category=None) -> int:
+        """Find a build order by name (and category).
+
+        Parameters
+        ----------
+        name        Name of the build order.
+        category    Category value (ignored if the library has no category),
+                    None to get the first build order with this name (in sorted order).
+
+        Returns
+        -------
+        Handle of the build order, -1 if not found.
+        """
+        if (self.category_name is not None) and (category is not None):
+            return self.handles_by_key.get((name, tuple(category) if isinstance(category, list) else category), -1)
+
+        handles = self.handles_by_name.get(name)
+        if not handles:
+            return -1
+        if self.sort_key is None:
+            return handles[0]
+        return min(handles, key=lambda handle: (self.sort_values[handle], handle))
+
+    def find_path(self, path: str) -> int:
+        """Find a build order by file.
+
+        Parameters
+        ----------
+        path    File of the build order.
+
+        Returns
+        -------
+        Handle of the build order, -1 if not found.
+        """
+        return self.handles_by_path.get(path, -1)
+
+    def discard_shadowed_path(self, path: str):
+        """Forget a file skipped as already added (e.g. file modified or deleted).
+
+        Parameters
+        ----------
+        path    File of the skipped build order.
+        """
+        self.shadowed_paths.pop(path, None)
+
+    def pop_shadowed_paths(self, key: tuple) -> list:
+        """Get and forget the files skipped because a build order with the same key was already added.
+
+        Parameters
+        ----------
+        key    Key of the build order (see 'get_key').
+
+        Returns
+        -------
+        Files skipped for this key, in the adding order.
+        """
+        paths = [path for path, shadowed_key in self.shadowed_paths.items() if shadowed_key == key]
+        for path in paths:
+            del self.shadowed_paths[path]
+        return paths
+
+    def restore_shadowed_paths(self, key: tuple):
+        """Add the build orders skipped as duplicates of a key not used anymore, reading their files with the loader.
+
+        Parameters
+        ----------
+        key    Key of the build order (see 'get_key').
+        """
+        for path in self.pop_shadowed_paths(key):
+            full_data, error_msg = self.loader(path)
+            if full_data is None:
+                print(error_msg)
+            else:
+                self.add(get_build_order_metadata(full_data), path)  # skipped again if already added
+
+    def handles(self) -> list:
+        """Get the handles of all the build orders, in sorted order.
+
+        Returns
+        -------
+        List of handles (must not be modified).
+        """
+        if self.sorted_handles is None:
+            self.sorted_handles = [handle for _, handle in self.sorted_entries]
+        return self.sorted_handles
+
+    def index_key_value(self, key_index: tuple, key_name: str, handle: int, add_flag: bool):
+        """Add (or remove) a build order in the inverted index of a key.
+
+        Parameters
+        ----------
+        key_index    Inverted index of the key, as (values, generic), see 'key_indexes'.
+        key_name     Name of the key (e.g. 'civilization').
+        handle       Handle of the build order.
+        add_flag     True to add the build order, False to remove it.
+        """
+        values, generic = key_index
+        data = self.build_orders[handle]
+
+        # same rules as 'check_build_order_key_values'
+        if key_name not in data:
+            handle_sets = [generic]  # no value to check: valid for any value
+        else:
+            data_value = data[key_name]
+            if isinstance(data_value, list):
+                handle_sets = [values.setdefault(value, set()) for value in data_value]
+            elif data_value in ['any', 'Any', 'Generic']:
+                handle_sets = [generic]
+            else:
+                handle_sets = [values.setdefault(data_value, set())]
+
+        for handle_set in handle_sets:
+            if add_flag:
+                handle_set.add(handle)
+            else:
+                handle_set.discard(handle)
+
+    def get_key_index(self, key_name: str) -> tuple:
+        """Get the inverted index of a key (built at first request, then kept up-to-date).
+
+        Parameters
+        ----------
+        key_name    Name of the key (e.g. 'civilization').
+
+        Returns
+        -------
+        Inverted index of the key, see 'key_indexes'.
+        """
+        key_index = self.key_indexes.get(key_name)
+        if key_index is None:
+            key_index = (dict(), set())
+            for handle in self.handles():
+                self.index_key_value(key_index, key_name, handle, add_flag=True)
+            self.key_indexes[key_name] = key_index
+        return key_index
+
+    def filter(self, key_condition: dict = None) -> list:
+        """Get the build orders fulfilling key conditions (see 'check_build_order_key_values').
+
+        Parameters
+        ----------
+        key_condition    Dictionary with the keys to look for and their value (to consider as valid), None to skip it.
+
+        Returns
+        -------
+        Handles of the valid build orders, in sorted order (must not be modified).
+        """
+        conditions = tuple(
+            sorted((key, value) for key, value in key_condition.items() if value not in ['all', 'All'])
+            if (key_condition is not None)
+            else ()
+        )
+        if not conditions:
+            return self.handles()
+
+        handles = self.filter_cache.get(conditions)
+        if handles is None:
+            valid_handles = None
+            for key_name, value in conditions:  # intersection of the valid handles of each condition
+                values, generic = self.get_key_index(key_name)
+                key_handles = values.get(value, set()) | generic
+                valid_handles = key_handles if (valid_handles is None) else (valid_handles & key_handles)
+
+            handles = sorted(valid_handles, key=lambda handle: (self.sort_values[handle], handle))
+            self.filter_cache[conditions] = handles
+        return handles
+
+    def get_notes_index(self) -> BuildOrderNotesIndex:
+        """Get the index of the notes terms (built when loading the build orders, then kept up-to-date).
+
+        Returns
+        -------
+        Index of the notes terms.
+        """
+        return self.notes_index
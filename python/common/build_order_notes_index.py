@@ -0,0 +1,161 @@
+import re
+import math
+from bisect import insort, bisect_left
+
+from common.multi_label_line import split_multi_label_line
+
+IMAGE_EXTENSION_REGEX = re.compile(r'\.(webp|png|jpg)$')  # extension of an image in the notes
+WORD_REGEX = re.compile(r'\w+')  # word of the notes (letters, digits and underscores)
+NOTES_TERMS_KEY = '_notes_terms'  # field of the build order metadata (i.e. without steps) with its notes terms
+
+
+def get_notes_terms(line: str, image_words: bool = True) -> list:
+    """Get the terms of a note line: words of the text (lower case) and images (path without extension).
+
+    Parameters
+    ----------
+    line           Note line, with images between @ markers (e.g. 'Build @building_economy/house@').
+    image_words    True to add the words of the images file names (e.g. 'house'), False to only add their path.
+
+    Returns
+    -------
+    List of terms (with duplicates).
+    """
+    terms = []
+    for part in split_multi_label_line(line):
+        stripped_part = part.strip().lower()
+        if ('/' in stripped_part) and (not any(character.isspace() for character in stripped_part)):  # image
+            image = IMAGE_EXTENSION_REGEX.sub('', stripped_part)
+            terms.append(image)
+            if image_words:
+                terms += WORD_REGEX.findall(image.rsplit('/', 1)[-1])
+        else:
+            terms += WORD_REGEX.findall(stripped_part)
+    return terms
+
+
+def get_build_order_notes_terms(data: dict) -> dict:
+    """Count the terms of the notes of a build order.
+
+    Parameters
+    ----------
+    data    Build order data, with its steps (not yet validated) or with the counts in 'NOTES_TERMS_KEY'.
+
+    Returns
+    -------
+    Count of each term as {term: count}.
+    """
+    counts = data.get(NOTES_TERMS_KEY)
+    if counts is not None:  # already counted (e.g. metadata)
+        return counts
+
+    counts = dict()
+    build_order_data = data.get('build_order')
+    for step in build_order_data if isinstance(build_order_data, list) else []:
+        notes = step.get('notes') if isinstance(step, dict) else None
+        for note in notes if isinstance(notes, list) else []:
+            if isinstance(note, str):
+                for term in get_notes_terms(note):
+                    counts[term] = counts.get(term, 0) + 1
+    return counts
+
+
+class BuildOrderNotesIndex:
+    """Inverted index of the notes terms (words and images) of the build orders."""
+
+    def __init__(self):
+        """Constructor"""
+        self.postings = dict()  # occurrences of each term as {term: {handle: count}}
+        self.handle_terms = dict()  # terms of each indexed build order as {handle: terms}
+        self.sorted_terms = []  # all the terms, sorted (for the prefix search)
+
+    def add(self, handle: int, data: dict):
+        """Add a build order to the index.
+
+        Parameters
+        ----------
+        handle    Handle of the build order.
+        data      Build order data, or its metadata (see 'get_build_order_notes_terms').
+        """
+        counts = get_build_order_notes_terms(data)
+        for term, count in counts.items():
+            term_postings = self.postings.get(term)
+            if term_postings is None:
+                term_postings = self.postings[term] = dict()
+                insort(self.sorted_terms, term)
+            term_postings[handle] = count
+        self.handle_terms[handle] = list(counts.keys())
+
+    def remove(self, handle: int):
+        """Remove a build order from the index.
+
+        Parameters
+        ----------
+        handle    Handle of the build order.
+        """
+        for term in self.handle_terms.pop(handle, []):
+            term_postings = self.postings[term]
+            del term_postings[handle]
+            if not term_postings:
+                del self.postings[term]
+                del self.sorted_terms[bisect_left(self.sorted_terms, term)]
+
+    def get_prefix_terms(self, prefix: str) -> list:
+        """Get the indexed terms starting with a prefix.
+
+        Parameters
+        ----------
+        prefix    Prefix of the terms.
+
+        Returns
+        -------
+        List of terms.
+        """
+        prefix_terms = []
+        for term_id in range(bisect_left(self.sorted_terms, prefix), len(self.sorted_terms)):
+            term = self.sorted_terms[term_id]
+            if not term.startswith(prefix):
+                break
+            prefix_terms.append(term)
+        return prefix_terms
+
+    def search(self, terms: list, last_term_prefix: bool = False) -> dict:
+        """Search the build orders containing all the requested terms in their notes.
+
+        Parameters
+        ----------
+        terms               Terms to look for (see 'get_notes_terms').
+        last_term_prefix    True to accept any term starting with the last one (text still being typed).
+
+        Returns
+        -------
+        Score of each matching build order as {handle: score}, rare terms getting a higher score.
+        """
+        if not terms:
+            return dict()
+
+        indexed_count = len(self.handle_terms)
+        scores = None
+        for term_id, term in enumerate(terms):
+            if last_term_prefix and (term_id == len(terms) - 1):
+                matched_terms = self.get_prefix_terms(term)
+            else:
+                matched_terms = [term] if (term in self.postings) else []
+
+            term_scores = dict()
+            for matched_term in matched_terms:
+                term_postings = self.postings[matched_term]
+                idf = math.log(1.0 + indexed_count / len(term_postings))
+                for handle, count in term_postings.items():
+                    term_scores[handle] = term_scores.get(handle, 0.0) + (1.0 + math.log(count)) * idf
+
+            if scores is None:
+                scores = term_scores
+            else:  # all terms must be present
+                scores = {
+                    handle: score + term_scores[handle] for handle, score in scores.items() if handle in term_scores
+                }
+            if not scores:
+                break
+
+        return scores
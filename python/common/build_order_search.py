@@ -0,0 +1,600 @@
+import heapq
+import threading
+from collections import Counter, OrderedDict
+
+from thefuzz import fuzz, utils
+
+from common.build_order_library import BuildOrderLibrary
+from common.build_order_notes_index import get_notes_terms
+
+CANCEL_CHECK_PERIOD = 256  # number of build orders processed between two checks of the search cancellation
+NOTES_SEARCH_KEYWORD = 'note:'  # keyword starting the part of the search text to look for in the notes
+NOTES_NAME_MATCH_BONUS = 10.0  # score bonus of a notes search term also found in the build order name
+NOTES_NAME_SCORE_WEIGHT = 0.1  # weight of the name score (0 to 100) added to the notes score
+
+
+def split_notes_search(search_text: str) -> (str, str):
+    """Split a search text between the name part and the notes part (after the 'note:' keyword).
+
+    Parameters
+    ----------
+    search_text    Search text, e.g. 'archers note:fast castle'.
+
+    Returns
+    -------
+    Part of the search text to look for in the names.
+    Part of the search text to look for in the notes, None if no notes search.
+    """
+    keyword_id = search_text.lower().find(NOTES_SEARCH_KEYWORD)
+    if keyword_id < 0:
+        return search_text, None
+    return search_text[:keyword_id], search_text[keyword_id + len(NOTES_SEARCH_KEYWORD) :]
+
+
+class FuzzyProfile:
+    """Character and token counts of a text processed by 'thefuzz', used to bound its fuzzy scores."""
+
+    __slots__ = ['text', 'length', 'tokens', 'tokens_count', 'chars_count', 'counts', 'set_chars_count', 'set_counts']
+
+    def __init__(self, text: str):
+        """Constructor
+
+        Parameters
+        ----------
+        text    Text processed by 'thefuzz.utils.full_process'.
+        """
+        self.text = text
+        self.length = len(text)
+
+        tokens = text.split()
+        self.tokens = set(tokens)  # distinct tokens
+        self.tokens_count = len(tokens)
+        self.chars_count = sum(len(token) for token in tokens)  # count of characters in the tokens
+        self.counts = Counter(''.join(tokens))  # count of each character in the tokens
+
+        # same for the distinct tokens (used by the token set ratios)
+        if len(self.tokens) == len(tokens):
+            self.set_chars_count = self.chars_count
+            self.set_counts = self.counts
+        else:
+            self.set_chars_count = sum(len(token) for token in self.tokens)
+            self.set_counts = Counter(''.join(self.tokens))
+
+
+def count_overlap(counts_1: dict, counts_2: dict) -> int:
+    """Count the characters shared by two texts (upper bound of their matching characters).
+
+    Parameters
+    ----------
+    counts_1    Count of each character in the first text.
+    counts_2    Count of each character in the second text.
+
+    Returns
+    -------
+    Count of shared characters.
+    """
+    if len(counts_1) > len(counts_2):
+        counts_1, counts_2 = counts_2, counts_1
+    overlap = 0
+    for character, count in counts_1.items():
+        other_count = counts_2.get(character)
+        if other_count is not None:
+            overlap += count if (count < other_count) else other_count
+    return overlap
+
+
+def ratio_score_bound(ratio_bound: float) -> int:
+    """Upper bound of a 'thefuzz' score (0 to 100), given an upper bound of its ratio.
+
+    Parameters
+    ----------
+    ratio_bound    Upper bound of the ratio (0 to 1).
+
+    Returns
+    -------
+    Upper bound of the score (rounded as 'thefuzz' does, with a margin for floating point errors).
+    """
+    return utils.intr(100.0 * ratio_bound + 1e-6)
+
+
+def partial_score_bound(shorter_length: int, overlap: int) -> int:
+    """Upper bound of a 'thefuzz' partial ratio score.
+
+    The partial ratio compares the shorter text with a substring of the longer one,
+    of length L (at most the length S of the shorter text) and sharing at most min(L, overlap) characters:
+    the ratio 2 * min(L, overlap) / (S + L) is maximal for L = overlap.
+
+    Parameters
+    ----------
+    shorter_length    Length of the shorter text.
+    overlap           Count of characters shared by both texts.
+
+    Returns
+    -------
+    Upper bound of the score.
+    """
+    overlap = min(overlap, shorter_length)
+    ratio_bound = 2.0 * overlap / (shorter_length + overlap) if (overlap > 0) else 0.0
+    if ratio_bound > 0.995 - 1e-6:  # partial ratio returns 100 above 0.995
+        return 100
+    return ratio_score_bound(ratio_bound)
+
+
+def fuzzy_score_bound(query: FuzzyProfile, name: FuzzyProfile) -> int:
+    """Upper bound of 'thefuzz.fuzz.WRatio' (without processing) computed with characters and tokens counts.
+
+    Each ratio is bounded by 2 * M / T with T the total length of both compared texts and M their count of shared
+    characters, then combined with the same scaling and rounding as 'WRatio'.
+
+    Parameters
+    ----------
+    query    Profile of the processed query.
+    name     Profile of the processed build order name.
+
+    Returns
+    -------
+    Upper bound of the score (0 to 100).
+    """
+    length_1, length_2 = query.length, name.length
+    if (length_1 == 0) or (length_2 == 0):
+        return 0
+
+    # shared characters of the tokens, and of the full texts (including the spaces)
+    tokens_overlap = count_overlap(query.counts, name.counts)
+    overlap = tokens_overlap + min(length_1 - query.chars_count, length_2 - name.chars_count)
+
+    # sorted tokens joined with spaces (token sort ratios)
+    sort_length_1 = query.chars_count + query.tokens_count - 1
+    sort_length_2 = name.chars_count + name.tokens_count - 1
+    sort_overlap = min(tokens_overlap + min(query.tokens_count, name.tokens_count) - 1, sort_length_1, sort_length_2)
+
+    # sorted distinct tokens joined with spaces (token set ratios)
+    set_length_1 = query.set_chars_count + len(query.tokens) - 1
+    set_length_2 = name.set_chars_count + len(name.tokens) - 1
+    if (query.set_counts is query.counts) and (name.set_counts is name.counts):
+        set_tokens_overlap = tokens_overlap
+    else:
+        set_tokens_overlap = count_overlap(query.set_counts, name.set_counts)
+    set_overlap = min(set_tokens_overlap + min(len(query.tokens), len(name.tokens)) - 1, set_length_1, set_length_2)
+    intersection = query.tokens & name.tokens
+    if intersection:
+        intersection_length = sum(len(token) for token in intersection) + len(intersection) - 1
+    else:
+        intersection_length = 0
+
+    base = ratio_score_bound(2.0 * overlap / (length_1 + length_2))
+
+    shorter_length = min(length_1, length_2)
+    length_ratio = float(max(length_1, length_2)) / shorter_length
+
+    if length_ratio < 1.5:  # no partial ratio
+        token_sort = ratio_score_bound(2.0 * sort_overlap / (sort_length_1 + sort_length_2))
+        token_set = ratio_score_bound(2.0 * set_overlap / (set_length_1 + set_length_2))
+        if intersection_length > 0:  # intersection compared to itself followed by the other tokens
+            token_set = max(
+                token_set,
+                ratio_score_bound(2.0 * intersection_length / (intersection_length + set_length_1)),
+                ratio_score_bound(2.0 * intersection_length / (intersection_length + set_length_2)),
+            )
+        return utils.intr(max(base, token_sort * 0.95, token_set * 0.95))
+    else:
+        partial_scale = 0.6 if (length_ratio > 8) else 0.9
+        partial = partial_score_bound(shorter_length, overlap)
+        partial_token_sort = partial_score_bound(min(sort_length_1, sort_length_2), sort_overlap)
+        if intersection_length > 0:  # intersection found as a prefix of the other text
+            partial_token_set = 100
+        else:
+            partial_token_set = partial_score_bound(min(set_length_1, set_length_2), set_overlap)
+        return utils.intr(
+            max(
+                base,
+                partial * partial_scale,
+                partial_token_sort * 0.95 * partial_scale,
+                partial_token_set * 0.95 * partial_scale,
+            )
+        )
+
+
+class BuildOrderSearch:
+    """Search of the build orders by name, refining the previous results when the search text is extended."""
+
+    def __init__(self, build_orders: BuildOrderLibrary, cache_size: int = 64):
+        """Constructor
+
+        Parameters
+        ----------
+        build_orders    Library of the build orders to search in.
+        cache_size      Maximal number of search results kept in cache.
+        """
+        self.build_orders = build_orders
+        self.cache_size = cache_size
+
+        # normalized names, accessed by handle (None if not yet computed), valid as long as the handle exists
+        self.lower_names = []  # lower case names (split words search)
+        self.name_profiles = []  # profiles of the names processed by 'thefuzz' (fuzzy search)
+
+        self.context = None  # library version and search parameters of the cached results
+        self.results_cache = OrderedDict()  # results as {search text: handles}, for the current context
+
+        # lock held during a search (searches can run in another thread), also to hold when modifying the library
+        self.lock = threading.RLock()
+
+    def get_lower_name(self, handle: int) -> str:
+        """Get the lower case name of a build order.
+
+        Parameters
+        ----------
+        handle    Handle of the build order.
+
+        Returns
+        -------
+        Lower case name.
+        """
+        if handle >= len(self.lower_names):
+            self.lower_names.extend([None] * (handle + 1 - len(self.lower_names)))
+        lower_name = self.lower_names[handle]
+        if lower_name is None:
+            lower_name = self.lower_names[handle] = self.build_orders.get(handle)['name'].lower()
+        return lower_name
+
+    def get_name_profile(self, handle: int) -> FuzzyProfile:
+        """Get the profile of a build order name, as processed by 'thefuzz' before scoring it.
+
+        Parameters
+        ----------
+        handle    Handle of the build order.
+
+        Returns
+        -------
+        Profile of the processed name.
+        """
+        if handle >= len(self.name_profiles):
+            self.name_profiles.extend([None] * (handle + 1 - len(self.name_profiles)))
+        name_profile = self.name_profiles[handle]
+        if name_profile is None:
+            name_profile = self.name_profiles[handle] = FuzzyProfile(
+                utils.full_process(self.build_orders.get(handle)['name'], force_ascii=True)
+            )
+        return name_profile
+
+    def set_context(self, context: tuple):
+        """Set the context of the search, clearing the cached results if it changed.
+
+        Parameters
+        ----------
+        context    Library version and search parameters.
+        """
+        if context != self.context:
+            self.context = context
+            self.results_cache.clear()
+
+    def get_cached_results(self, search_text: str) -> list:
+        """Get the cached results of a search text.
+
+        Parameters
+        ----------
+        search_text    Search text.
+
+        Returns
+        -------
+        Handles of the results, None if not in cache.
+        """
+        results = self.results_cache.get(search_text)
+        if results is not None:
+            self.results_cache.move_to_end(search_text)
+        return results
+
+    def set_cached_results(self, search_text: str, results: list):
+        """Store the results of a search text in the cache.
+
+        Parameters
+        ----------
+        search_text    Search text.
+        results        Handles of the results.
+        """
+        self.results_cache[search_text] = results
+        self.results_cache.move_to_end(search_text)
+        while len(self.results_cache) > self.cache_size:
+            self.results_cache.popitem(last=False)
+
+    def search_split_words(self, search_text: str, candidates: list, cancel_check=None, use_cache: bool = True) -> list:
+        """Search the build orders containing all the words of the search text (case insensitive).
+
+        Parameters
+        ----------
+        search_text     Search text, with words separated by spaces.
+        candidates      Handles of the candidate build orders, in sorted order.
+        cancel_check    Function returning True if the search must be cancelled, None if it cannot be cancelled.
+        use_cache       True to use the cache (candidates from the key conditions), False for other candidates.
+
+        Returns
+        -------
+        Handles of all the matching build orders, in sorted order, None if cancelled.
+        """
+        if use_cache:
+            results = self.get_cached_results(search_text)
+            if results is not None:
+                return results
+
+            # the matches of a text are a subset of the matches of its prefixes: start from the longest cached one
+            for prefix_length in range(len(search_text) - 1, 0, -1):
+                prefix_results = self.get_cached_results(search_text[:prefix_length])
+                if prefix_results is not None:
+                    candidates = prefix_results
+                    break
+
+        search_split = search_text.lower().split(' ')  # split according to spaces
+        get_lower_name = self.get_lower_name
+        results = []
+        for start_id in range(0, len(candidates), CANCEL_CHECK_PERIOD):
+            if (cancel_check is not None) and cancel_check():
+                return None
+            results += [
+                handle
+                for handle in candidates[start_id : start_id + CANCEL_CHECK_PERIOD]
+                if all((search_part in get_lower_name(handle)) for search_part in search_split)
+            ]
+
+        if use_cache:
+            self.set_cached_results(search_text, results)
+        return results
+
+    def search_fuzzy(
+        self,
+        search_text: str,
+        candidates: list,
+        score_cutoff: int,
+        limit: int,
+        cancel_check=None,
+        use_cache: bool = True,
+    ) -> list:
+        """Fuzzy search of the build orders, with the same results as 'thefuzz.process.extractBests'.
+
+        The full score is only computed for the candidates whose score upper bound can still reach
+        the cutoff and the limit count of results.
+
+        Parameters
+        ----------
+        search_text     Search text.
+        candidates      Handles of the candidate build orders, in sorted order.
+        score_cutoff    Minimal score (0 to 100) of a valid build order.
+        limit           Maximal number of results.
+        cancel_check    Function returning True if the search must be cancelled, None if it cannot be cancelled.
+        use_cache       True to use the cache (candidates from the key conditions), False for other candidates.
+
+        Returns
+        -------
+        Handles of the best matching build orders, from the best one, None if cancelled.
+        """
+        if use_cache:
+            results = self.get_cached_results(search_text)
+            if results is not None:
+                return results
+
+        # same processing of the query as 'extractBests' with its default processor and scorer
+        query_profile = FuzzyProfile(utils.full_process(utils.full_process(search_text), force_ascii=True))
+
+        if limit <= 0:
+            results = []
+        elif query_profile.length == 0:  # all scores are 0
+            results = list(candidates[:limit]) if (score_cutoff <= 0) else []
+        else:
+            # upper bound of the score of each candidate, to only score the ones which can be selected
+            get_name_profile = self.get_name_profile
+            bounds = []
+            for position, handle in enumerate(candidates):
+                if (cancel_check is not None) and (position % CANCEL_CHECK_PERIOD == 0) and cancel_check():
+                    return None
+                bound = fuzzy_score_bound(query_profile, get_name_profile(handle))
+                if bound >= score_cutoff:
+                    bounds.append((-bound, position, handle))
+            bounds.sort()  # highest bounds first
+
+            # best results as a min-heap of (score, -position, handle), the candidates order breaking ties
+            best = []
+            processed_query = query_profile.text
+            for scored_count, (negative_bound, position, handle) in enumerate(bounds):
+                if (cancel_check is not None) and (scored_count % CANCEL_CHECK_PERIOD == 0) and cancel_check():
+                    return None
+                if len(best) >= limit:
+                    if -negative_bound < best[0][0]:  # the next candidates cannot reach the selected scores
+                        break
+                    if (-negative_bound == best[0][0]) and (-position < best[0][1]):
+                        continue
+                score = fuzz.WRatio(processed_query, get_name_profile(handle).text, full_process=False)
+                if score >= score_cutoff:
+                    entry = (score, -position, handle)
+                    if len(best) < limit:
+                        heapq.heappush(best, entry)
+                    elif entry > best[0]:
+                        heapq.heapreplace(best, entry)
+
+            # same order as 'extractBests' (highest score first, then candidates order)
+            results = [handle for _, _, handle in sorted(best, reverse=True)]
+
+        if use_cache:
+            self.set_cached_results(search_text, results)
+        return results
+
+    def get_name_score_bounds(
+        self,
+        search_text: str,
+        query_profile: FuzzyProfile,
+        candidates: list,
+        score_cutoff: int,
+        cancel_check=None,
+    ) -> dict:
+        """Get the name scores of the candidates matching a search text, or their upper bound for the fuzzy search.
+
+        Parameters
+        ----------
+        search_text      Search text.
+        query_profile    Profile of the processed search text for the fuzzy search ('thefuzz' default scorer,
+                         upper bounds of the scores), None for the splitting words search (exact scores,
+                         as percentage of the name covered by the search words).
+        candidates       Handles of the candidate build orders.
+        score_cutoff     Minimal score (0 to 100) of a valid build order for the fuzzy search.
+        cancel_check     Function returning True if the search must be cancelled, None if it cannot be cancelled.
+
+        Returns
+        -------
+        Score (or upper bound, 0 to 100) of each possibly matching build order as {handle: score}, None if cancelled.
+        """
+        name_scores = dict()
+        if query_profile is not None:
+            get_name_profile = self.get_name_profile
+            for position, handle in enumerate(candidates):
+                if (cancel_check is not None) and (position % CANCEL_CHECK_PERIOD == 0) and cancel_check():
+                    return None
+                bound = fuzzy_score_bound(query_profile, get_name_profile(handle)) if query_profile.length else 0
+                if bound >= score_cutoff:
+                    name_scores[handle] = bound
+        else:
+            search_split = search_text.lower().split(' ')  # split according to spaces
+            search_length = sum(len(search_part) for search_part in search_split)
+            get_lower_name = self.get_lower_name
+            for position, handle in enumerate(candidates):
+                if (cancel_check is not None) and (position % CANCEL_CHECK_PERIOD == 0) and cancel_check():
+                    return None
+                lower_name = get_lower_name(handle)
+                if all((search_part in lower_name) for search_part in search_split):
+                    name_scores[handle] = min(100.0, 100.0 * search_length / max(1, len(lower_name)))
+        return name_scores
+
+    def search_notes(
+        self,
+        search_text: str,
+        candidates: list,
+        fuzz_search: bool,
+        score_cutoff: int,
+        limit: int,
+        cancel_check=None,
+    ) -> list:
+        """Search the build orders by notes content and name, see 'split_notes_search'.
+
+        The results are ranked by a weighted sum of the name score and of the notes score.
+
+        Parameters
+        ----------
+        search_text     Search text, e.g. 'archers note:fast castle' or 'note:@unit_cavalry/scout-cavalry@'.
+        candidates      Handles of the candidate build orders, in sorted order.
+        fuzz_search     True to use fuzzy search for the name part, False for splitting words search.
+        score_cutoff    Score cutoff parameter for the fuzzy search.
+        limit           Maximal number of results.
+        cancel_check    Function returning True if the search must be cancelled, None if it cannot be cancelled.
+
+        Returns
+        -------
+        Handles of the valid build orders, from the best one, None if cancelled.
+        """
+        cache_key = (NOTES_SEARCH_KEYWORD, search_text)  # not mixed with the names search cache
+        results = self.get_cached_results(cache_key)
+        if results is not None:
+            return results
+
+        name_text, notes_text = split_notes_search(search_text)
+        name_text = name_text.strip()
+        notes_terms = get_notes_terms(notes_text, image_words=False)
+
+        notes_scores = None
+        if notes_terms:  # only keep the build orders with all the terms in their notes
+            # the last term may still be typed
+            last_term_prefix = (notes_text != '') and (not notes_text[-1].isspace()) and (notes_text[-1] != '@')
+            notes_scores = self.build_orders.get_notes_index().search(notes_terms, last_term_prefix)
+            candidates = [handle for handle in candidates if handle in notes_scores]
+
+        if (cancel_check is not None) and cancel_check():
+            return None
+
+        name_scores = None  # exact name scores, or their upper bound for the fuzzy search
+        query_profile = None
+        if name_text != '':  # only keep the build orders matching the name part
+            if fuzz_search:  # same processing of the query as 'search_fuzzy'
+                query_profile = FuzzyProfile(utils.full_process(utils.full_process(name_text), force_ascii=True))
+            name_scores = self.get_name_score_bounds(name_text, query_profile, candidates, score_cutoff, cancel_check)
+            if name_scores is None:
+                return None
+
+        if (limit <= 0) or ((name_scores is None) and (notes_scores is None)):  # nothing to search
+            results = []
+        else:  # ranking according to the name and the notes, with a bonus for the notes terms in the name
+            bounds = []
+            for position, handle in enumerate(candidates):
+                if (name_scores is not None) and (handle not in name_scores):
+                    continue
+                name_score = name_scores[handle] if (name_scores is not None) else 0.0
+                notes_score = 0.0
+                if notes_scores is not None:
+                    lower_name = self.get_lower_name(handle)
+                    name_bonus = NOTES_NAME_MATCH_BONUS * sum((term in lower_name) for term in notes_terms)
+                    notes_score = notes_scores[handle] + name_bonus
+                bounds.append((-(NOTES_NAME_SCORE_WEIGHT * name_score + notes_score), position, handle, notes_score))
+            bounds.sort()  # highest bounds first
+
+            # best results as a min-heap of (score, -position, handle), the candidates order breaking ties
+            best = []
+            for scored_count, (negative_bound, position, handle, notes_score) in enumerate(bounds):
+                if (cancel_check is not None) and (scored_count % CANCEL_CHECK_PERIOD == 0) and cancel_check():
+                    return None
+                if (len(best) >= limit) and ((-negative_bound, -position) < best[0][:2]):
+                    break  # the next candidates cannot reach the selected scores
+                score = -negative_bound
+                if (query_profile is not None) and (query_profile.length > 0):  # exact fuzzy score of the name
+                    name_score = fuzz.WRatio(query_profile.text, self.get_name_profile(handle).text, full_process=False)
+                    if name_score < score_cutoff:
+                        continue
+                    score = NOTES_NAME_SCORE_WEIGHT * name_score + notes_score
+                entry = (score, -position, handle)
+                if len(best) < limit:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+            results = [handle for _, _, handle in sorted(best, reverse=True)]
+
+        self.set_cached_results(cache_key, results)
+        return results
+
+    def search(
+        self,
+        search_text: str,
+        key_condition: dict = None,
+        fuzz_search: bool = True,
+        score_cutoff: int = 50,
+        limit: int = 10,
+        cancel_check=None,
+    ) -> list:
+        """Search the build orders by name, or by notes content (can be called from any thread).
+
+        Parameters
+        ----------
+        search_text      Search text, ' ' to select any build order, see 'split_notes_search' to search in the notes.
+        key_condition    Dictionary with the keys to look for and their value (to consider as valid), None to skip it.
+        fuzz_search      True to use fuzzy search, False for splitting words search.
+        score_cutoff     Score cutoff parameter for the fuzzy search.
+        limit            Maximal number of results.
+        cancel_check     Function returning True if the search must be cancelled, None if it cannot be cancelled.
+
+        Returns
+        -------
+        Handles of the valid build orders, None if cancelled.
+        """
+        if search_text == '':  # no text added
+            return []
+
+        with self.lock:
+            # only keep build orders with valid key conditions
+            candidates = self.build_orders.filter(key_condition)
+
+            if search_text == ' ':  # special case: select any build order, up to the limit count
+                return candidates[:limit]
+
+            conditions = tuple(sorted(key_condition.items())) if (key_condition is not None) else ()
+            self.set_context((self.build_orders.version, conditions, fuzz_search, score_cutoff, limit))
+
+            if NOTES_SEARCH_KEYWORD in search_text.lower():
+                results = self.search_notes(search_text, candidates, fuzz_search, score_cutoff, limit, cancel_check)
+            elif fuzz_search:
+                results = self.search_fuzzy(search_text, candidates, score_cutoff, limit, cancel_check)
+            else:
+                results = self.search_split_words(search_text, candidates, cancel_check)
+            return results[:limit] if (results is not None) else None
@@ -0,0 +1,128 @@
+from bisect import bisect_left, bisect_right
+
+
+def get_build_order_timer_steps_window(steps_count: int, step_ids: list) -> (list, int, int):
+    """Get the window of build order timer steps to display around the current steps.
+
+    Parameters
+    ----------
+    steps_count    Number of steps of the build order.
+    step_ids       IDs of the current steps, obtained from 'BuildOrderTimeline.get_step_ids'.
+
+    Returns
+    -------
+    Step IDs of the current steps in the window.
+    ID of the first step of the window.
+    ID after the last step of the window.
+    """
+    assert len(step_ids) > 0
+    for step_id in step_ids:
+        assert 0 <= step_id < steps_count
+    step_ids.sort()  # safety (should already be the case)
+
+    # check if first and last steps are selected
+    first_step_flag = step_ids[0] == 0
+    last_step_flag = step_ids[-1] == steps_count - 1
+
+    # check if everything can be returned
+    if first_step_flag or last_step_flag:
+        if steps_count <= 2:
+            return step_ids[:], 0, steps_count
+    else:
+        if steps_count <= 3:
+            return step_ids[:], 0, steps_count
+
+    # show the previous step (or current if first step)
+    init_id = max(0, step_ids[0] - 1)
+
+    # show the next step (or current if last step)
+    final_id = min(steps_count, step_ids[-1] + 2)  # +2 because ID is not selected in Python
+
+    assert 0 <= init_id < final_id <= steps_count
+
+    out_step_ids = []
+    for step_id in step_ids:
+        out_step_id = step_id - init_id
+        if 0 <= out_step_id < final_id - init_id:
+            out_step_ids.append(out_step_id)
+    return out_step_ids, init_id, final_id
+
+
+class BuildOrderTimeline:
+    """Steps of a build order for the timer feature, grouped by time (steps referenced, not copied)."""
+
+    def __init__(self, steps: list, times: list):
+        """Constructor
+
+        Parameters
+        ----------
+        steps    Steps of the build order.
+        times    Time of each step [sec], in ascending order.
+        """
+        assert len(steps) == len(times)
+        self.steps = steps
+        self.times = []  # distinct times of the steps [sec], in ascending order
+        self.groups = []  # IDs of the steps for each time of 'times'
+        self.step_groups = []  # index in 'groups' of each step
+
+        for step_id, time_sec in enumerate(times):
+            if (len(self.times) == 0) or (time_sec != self.times[-1]):
+                assert (len(self.times) == 0) or (time_sec > self.times[-1])
+                self.times.append(time_sec)
+                self.groups.append([])
+            self.groups[-1].append(step_id)
+            self.step_groups.append(len(self.groups) - 1)
+
+        # windows of steps to display for each group, see 'get_build_order_timer_steps_window'
+        self.windows = [get_build_order_timer_steps_window(len(steps), group[:]) for group in self.groups]
+
+    def __len__(self) -> int:
+        """Count of steps in the timeline."""
+        return len(self.steps)
+
+    def get_step_ids(self, current_time_sec: int, starting_flag: bool = True) -> list:
+        """Get the IDs of the steps to display at a time.
+
+        Parameters
+        ----------
+        current_time_sec    Current game time [sec].
+        starting_flag       True if the timer steps starts at the indicated time, False if ending at this time.
+
+        Returns
+        -------
+        List of IDs of the steps to show, empty list if no step.
+        """
+        if len(self.steps) == 0:
+            return []
+
+        if starting_flag:  # last steps started at the current time
+            group_id = bisect_right(self.times, current_time_sec) - 1
+            if group_id < 0:
+                return [0]  # showing first element if nothing else valid found
+        else:  # first steps not yet finished at the current time
+            group_id = bisect_left(self.times, current_time_sec)
+            if group_id >= len(self.times):
+                return [len(self.steps) - 1]  # showing last element if nothing else valid found
+
+        return self.groups[group_id][:]
+
+    def get_steps_display(self, steps_display: list, step_ids: list) -> (list, list):
+        """Get the build order timer steps to display.
+
+        Parameters
+        ----------
+        steps_display    Display of each step of the timeline.
+        step_ids         IDs of the current steps, obtained from 'get_step_ids'.
+
+        Returns
+        -------
+        Step IDs of the output list (see below).
+        List of steps to display.
+        """
+        assert (len(steps_display) == len(self.steps)) and (len(step_ids) > 0)
+        group_id = self.step_groups[step_ids[0]]
+        if step_ids == self.groups[group_id]:  # precomputed window
+            out_step_ids, init_id, final_id = self.windows[group_id]
+        else:  # not a full group of steps (e.g. before the first step time)
+            out_step_ids, init_id, final_id = get_build_order_timer_steps_window(len(self.steps), step_ids)
+        return out_step_ids[:], steps_display[init_id:final_id]
@@ -1,7 +1,13 @@
 import json
 import os.path
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Union
 
-from common.useful_tools import list_directory_files
+from common.useful_tools import get_scan_order_key, scan_directory_files
+from common.build_order_cache import BuildOrderCache, get_validator_signature
+from common.build_order_library import BuildOrderLibrary, get_build_order_metadata
+from common.build_order_timeline import BuildOrderTimeline
 
 
 def check_valid_faction(
@@ -218,66 +224,293 @@ def check_valid_steps(build_order, bo_name_str: str, fields: list):
     return True, ''
 
 
-def is_build_order_new(existing_build_orders: list, new_build_order_data: dict, category_name: str = None) -> bool:
-    """Check if a build order is new.
+# types of the fields as {type name: (value type, item type (for arrays) or None)}
+FIELD_TYPES = {
+    'integer': (int, None),
+    'string': (str, None),
+    'boolean': (bool, None),
+    'array of strings': (list, str),
+}
+
+
+class StepsValidator:
+    """Validator of the build order steps, compiled once from the fields definitions (same checks as
+    'check_valid_steps', without analyzing the fields definitions for each step).
+    """
+
+    def __init__(self, fields: list):
+        """Constructor.
+
+        Parameters
+        ----------
+        fields    Expected fields of the BO steps, with their definition.
+        """
+        # consecutive fields with the same parent are grouped, as [(parent name, parent requested, checks)],
+        # with each check as (name, label, requested, value type, item type, valid range, type name)
+        self.groups = []
+        for field in fields:
+            if not isinstance(field, FieldDefinition):
+                raise Exception('Wrong field definition.')
+            if field.field_type not in FIELD_TYPES:
+                raise Exception('Unknown type: ' + field.field_type)
+
+            value_type, item_type = FIELD_TYPES[field.field_type]
+            valid_range = tuple(field.valid_range) if (field.valid_range and (value_type is int)) else None
+            label = f'{field.parent_name}/{field.name}' if field.parent_name else field.name
+            check = (field.name, label, field.requested, value_type, item_type, valid_range, field.field_type)
+
+            parent_name = field.parent_name if field.parent_name else None
+            if self.groups and (self.groups[-1][0] == parent_name):
+                _, parent_requested, checks = self.groups[-1]
+                self.groups[-1] = (parent_name, parent_requested or field.requested, checks + [check])
+            else:
+                self.groups.append((parent_name, field.requested, [check]))
+
+        self.signature = repr(self.groups)  # changes when the fields definitions change (see 'BuildOrderCache')
+
+    def get_step_errors(self, step: dict) -> list:
+        """Get all the errors of a build order step.
+
+        Parameters
+        ----------
+        step    Build order step to check.
+
+        Returns
+        -------
+        List of errors (empty if valid step).
+        """
+        if not isinstance(step, dict):
+            return ['Wrong step, expected JSON object.']
+
+        errors = []
+        for parent_name, parent_requested, checks in self.groups:
+            if parent_name is None:
+                container = step
+            else:
+                container = step.get(parent_name)
+                if container is None:  # parent field missing
+                    if parent_requested:
+                        errors.append(f'Missing field: "{parent_name}".')
+                    continue
+                elif not isinstance(container, dict):
+                    errors.append(f'"{parent_name}" | Wrong value, expected JSON object.')
+                    continue
+
+            for name, label, requested, value_type, item_type, valid_range, type_name in checks:
+                if name not in container:  # field missing
+                    if requested:
+                        errors.append(f'Missing field: "{label}".')
+                    continue
+
+                value = container[name]
+                if (not isinstance(value, value_type)) or (
+                    (item_type is not None) and any(not isinstance(item, item_type) for item in value)
+                ):
+                    errors.append(f'"{label}" | Wrong value ({value}), expected {type_name} type.')
+                elif (valid_range is not None) and not (valid_range[0] <= value <= valid_range[1]):
+                    errors.append(
+                        f'"{label}" | Wrong value ({value}), must be in [{valid_range[0]} ; {valid_range[1]}] range.'
+                    )
+        return errors
+
+    def get_errors(self, build_order: dict, bo_name_str: str = '', all_errors: bool = True) -> list:
+        """Get the errors of the build order steps.
+
+        Parameters
+        ----------
+        build_order    Build order to check.
+        bo_name_str    Potential name for the BO.
+        all_errors     True to check all the steps, False to stop at the first error.
+
+        Returns
+        -------
+        List of errors (empty if all steps are correct).
+        """
+        build_order_data = build_order['build_order']
+        if len(build_order_data) < 1:
+            return [bo_name_str + 'Build order is empty.']
+
+        errors = []
+        for step_id, step in enumerate(build_order_data):
+            step_errors = self.get_step_errors(step)
+            if step_errors:  # prefix only computed in case of error
+                prefix_msg = f'{bo_name_str}Step {step_id + 1}/{len(build_order_data)} | '
+                if not all_errors:
+                    return [prefix_msg + step_errors[0]]
+                errors += [prefix_msg + step_error for step_error in step_errors]
+        return errors
+
+    def check(self, build_order: dict, bo_name_str: str = '', all_errors: bool = False) -> (bool, str):
+        """Check if all the steps of the BO are correct.
+
+        Parameters
+        ----------
+        build_order    Build order to check.
+        bo_name_str    Potential name for the BO.
+        all_errors     True to report all the errors (one per line), False to stop at the first error.
+
+        Returns
+        -------
+        True if all steps are correct.
+        String indicating the error(s) (empty if no error).
+        """
+        errors = self.get_errors(build_order, bo_name_str, all_errors)
+        return len(errors) == 0, '\n'.join(errors)
+
+
+def load_build_order_file(
+    build_order_file: str, check_valid_build_order, category_name: str = None, metadata_only: bool = False
+) -> (dict, str):
+    """Load and validate a single build order file.
 
     Parameters
     ----------
-    existing_build_orders    List of existing build orders.
-    new_build_order_data     New build order data.
-    category_name            If not None, accept build orders with same name, if they are in different categories.
+    build_order_file           JSON file of the build order.
+    check_valid_build_order    Function to check if a build order is valid (with a 'check_steps' argument).
+    category_name              If not None, name of the category field which must be present.
+    metadata_only              True to only keep the metadata (all fields except 'build_order', with the counts of
+                               the notes terms), the steps being validated later (see 'BuildOrderLibrary.get_full'),
+                               False for the full build order.
 
     Returns
     -------
-    True if new build order to add
+    Valid build order data (or metadata), None if not valid.
+    Message explaining why the build order is not valid (empty if valid).
     """
-    # check if it is a new build order to add
-    for build_order in existing_build_orders:
-        if build_order['name'] == new_build_order_data['name']:
-            if (category_name is None) or (build_order[category_name] == new_build_order_data[category_name]):
-                return False  # already added
-    return True
-
-
-def get_build_orders(directory: str, check_valid_build_order, category_name: str = None) -> list:
+    with open(build_order_file, 'rb') as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError:
+            return None, f'Could not add build order \'{os.path.basename(build_order_file)}\': JSON decoding error.'
+
+    if (category_name is not None) and (category_name not in data):  # check category
+        return None, f'Category name \'{category_name}\' not in \'{build_order_file}\', skipping it.'
+
+    if metadata_only:  # all the fields except the steps are checked (steps checked when loading the full data)
+        if not isinstance(data.get('name'), str):
+            return None, f'Could not add build order \'{os.path.basename(build_order_file)}\': Missing \'name\' field.'
+        elif (not isinstance(data.get('build_order'), list)) or (len(data['build_order']) == 0):
+            return None, f'Could not add build order \'{os.path.basename(build_order_file)}\': Missing steps.'
+        valid_bo, bo_error_msg = check_valid_build_order(data, check_steps=False)
+        if not valid_bo:
+            return None, f'Could not add build order \'{os.path.basename(build_order_file)}\': {bo_error_msg}'
+        return get_build_order_metadata(data), ''
+
+    valid_bo, bo_error_msg = check_valid_build_order(data)
+    if not valid_bo:
+        return None, f'Could not add build order \'{os.path.basename(build_order_file)}\': {bo_error_msg}'
+
+    return data, ''
+
+
+def get_build_orders(
+    directory: str,
+    check_valid_build_order,
+    category_name: str = None,
+    cache_file: str = None,
+    workers: int = 1,
+    sort_key=None,
+    lazy: bool = False,
+    resident_count: int = 10,
+) -> BuildOrderLibrary:
     """Get the build orders.
 
+    Among the build orders with the same name (and category), the first file in scan order is kept
+    (see 'get_scan_order_key'), also when the library is updated later.
+
     Parameters
     ----------
     directory                  Directory where the JSON build orders are located.
     check_valid_build_order    Function to check if a build order is valid.
     category_name              If not None, accept build orders with same name, if they are in different categories.
+    cache_file                 File storing the already validated build orders (see 'BuildOrderCache'),
+                               None to always read and validate all the files.
+    workers                    Number of threads reading and validating the files (0 for the CPU count),
+                               the results are merged in the order of the files.
+    sort_key                   Function providing the sorting key of a build order, None to keep the files order.
+    lazy                       True to only read the metadata of the build orders, their steps being read and
+                               validated when requested (see 'BuildOrderLibrary.get_full'), False to read all.
+    resident_count             Maximal number of full build orders kept in memory when 'lazy' is True.
 
     Returns
     -------
-    list of valid build orders.
+    Library of valid build orders.
     """
-    build_order_files = list_directory_files(directory, extension='.json')
+    cache = (
+        BuildOrderCache(
+            cache_file,
+            get_validator_signature(check_valid_build_order, category_name, lazy, load_function=load_build_order_file),
+        )
+        if (cache_file is not None)
+        else None
+    )
+
+    def read_build_order_file(build_order_file: str) -> tuple:
+        """Read a build order file (using the cache if possible), can be called from a worker thread.
 
-    build_orders = []
+        Parameters
+        ----------
+        build_order_file    JSON file of the build order.
 
-    for build_order_file in build_order_files:
-        with open(build_order_file, 'rb') as f:
-            try:
-                data = json.load(f)
+        Returns
+        -------
+        Tuple as (file, stat (None without cache), True if new content for the cache, data, error message).
+        """
+        if cache is None:
+            return (build_order_file, None, False) + load_build_order_file(
+                build_order_file, check_valid_build_order, category_name, lazy
+            )
 
-                if (category_name is not None) and (category_name not in data):  # check category
-                    print(f'Category name \'{category_name}\' not in \'{build_order_file}\', skipping it.')
-                    continue
+        stat = os.stat(build_order_file)
+        cached, data, error_msg = cache.get(build_order_file, stat)
+        if not cached:
+            data, error_msg = load_build_order_file(build_order_file, check_valid_build_order, category_name, lazy)
+        return build_order_file, stat, not cached, data, error_msg
 
-                # check if it is a new build order to add
-                if is_build_order_new(build_orders, data, category_name):  # new build order to add
-                    valid_bo, bo_error_msg = check_valid_build_order(data)
-                    if valid_bo:
-                        build_orders.append(data)
-                    else:
-                        print(f'Could not add build order \'{os.path.basename(build_order_file)}\': {bo_error_msg}')
-                else:  # already added this build order
-                    name = data['name']
-                    print(f'Build order \'{name}\' from \'{build_order_file}\' already added, skipping it.')
+    if workers <= 0:
+        workers = os.cpu_count() or 1
 
-            except json.JSONDecodeError:
-                print(f'Could not add build order \'{os.path.basename(build_order_file)}\': JSON decoding error.')
+    # files are read and validated while the directory is scanned, results are obtained in the order of the files
+    build_order_files = scan_directory_files(directory, extension='.json')
+    if workers > 1:
+        executor = ThreadPoolExecutor(max_workers=workers)
+        results = executor.map(read_build_order_file, build_order_files)
+    else:
+        executor = None
+        results = map(read_build_order_file, build_order_files)
+
+    loader = (  # full build orders read when requested
+        partial(load_build_order_file, check_valid_build_order=check_valid_build_order, category_name=category_name)
+        if lazy
+        else None
+    )
+    build_orders = BuildOrderLibrary(
+        category_name=category_name,
+        sort_key=sort_key,
+        loader=loader,
+        resident_count=resident_count,
+        path_order_key=get_scan_order_key,
+    )
+    existing_files = set()
+
+    try:
+        for build_order_file, stat, new_content, data, error_msg in results:
+            existing_files.add(build_order_file)
+            if new_content:
+                cache.set(build_order_file, stat, data, error_msg)
+
+            if data is None:  # not valid
+                print(error_msg)
+            elif build_orders.add(data, build_order_file) < 0:  # already added this build order
+                name = data['name']
+                print(f'Build order \'{name}\' from \'{build_order_file}\' already added, skipping it.')
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    if cache is not None:  # remove the files not present anymore and save the cache
+        cache.evict(existing_files)
+        cache.save()
 
     return build_orders
 
@@ -345,8 +578,8 @@ def build_order_time_to_sec(time_str: str) -> int:
     return 60 * int_vec[0] + int_vec[1]
 
 
-def get_build_order_timer_steps(data: dict) -> list:
-    """Check if a build order can use the timer feature and return the corresponding steps.
+def get_build_order_timeline(data: dict) -> Union[BuildOrderTimeline, None]:
+    """Check if a build order can use the timer feature and return the corresponding timeline.
 
     Parameters
     ----------
@@ -354,119 +587,25 @@ def get_build_order_timer_steps(data: dict) -> list:
 
     Returns
     -------
-    Build order steps in correct format (with time in sec), empty if build order is not valid for timer feature.
+    Timeline of the build order steps (with time in sec), None if build order is not valid for timer feature.
     """
     if 'build_order' not in data:
-        return []
+        return None
     build_order_data = data['build_order']
-    if not isinstance(build_order_data, list):
-        return []
+    if (not isinstance(build_order_data, list)) or (len(build_order_data) == 0):
+        return None
 
     last_time_sec = -1  # last time of the build order [sec]
-    full_steps = []  # store the full steps
+    times = []  # time of each step [sec]
 
     for build_order_step in build_order_data:  # loop on all the steps
         if ('notes' not in build_order_step) or ('time' not in build_order_step):
-            return []
+            return None
 
         time_sec = build_order_time_to_sec(build_order_step['time'])
         if (time_sec < 0) or (time_sec < last_time_sec):  # check valid time
-            return []
+            return None
         last_time_sec = time_sec
+        times.append(time_sec)
 
-        # update step and store it
-        updated_step = build_order_step.copy()
-        updated_step['time_sec'] = time_sec
-        full_steps.append(updated_step)
-
-    return full_steps
-
-
-def get_build_order_timer_step_ids(steps: list, current_time_sec: int, starting_flag: bool = True) -> list:
-    """Get the IDs to display for the timer steps.
-
-    Parameters
-    ----------
-    steps               Steps obtained with 'get_build_order_timer_steps'.
-    current_time_sec    Current game time [sec].
-    starting_flag       True if the timer steps starts at the indicated time, False if ending at this time.
-
-    Returns
-    -------
-    List of IDs of the steps to show, empty list if 'steps' is empty.
-    """
-    steps_count = len(steps)
-    if steps_count == 0:
-        return []
-
-    last_time_sec = -1
-    selected_ids = [0]  # showing first element if nothing else valid found
-
-    # range of steps to analyze
-    step_range = range(steps_count)
-    if not starting_flag:  # going in reverse order when timing indicates finishing step
-        step_range = reversed(step_range)
-        selected_ids = [steps_count - 1]
-
-    for step_id in step_range:  # loop on the steps in ascending/descending order
-        step = steps[step_id]
-        if (starting_flag and (current_time_sec >= step['time_sec'])) or (
-            (not starting_flag) and (current_time_sec <= step['time_sec'])
-        ):
-            if step['time_sec'] != last_time_sec:
-                selected_ids = [step_id]
-                last_time_sec = step['time_sec']
-            else:
-                selected_ids.append(step_id)
-        else:
-            break
-
-    selected_ids.sort()
-    return selected_ids
-
-
-def get_build_order_timer_steps_display(steps: list, step_ids: list) -> (list, list):
-    """Get the build order timer steps to display.
-
-    Parameters
-    ----------
-    steps       Steps obtained with 'get_build_order_timer_steps'.
-    step_ids    IDs of the current steps, obtained from 'get_build_order_timer_step_ids'.
-
-    Returns
-    -------
-    Step IDs of the output list (see below).
-    List of steps to display.
-    """
-    assert len(step_ids) > 0
-    for step_id in step_ids:
-        assert 0 <= step_id < len(steps)
-    step_ids.sort()  # safety (should already be the case)
-
-    # check if first and last steps are selected
-    first_step_flag = step_ids[0] == 0
-    last_step_flag = step_ids[-1] == len(steps) - 1
-
-    # check if everything can be returned
-    if first_step_flag or last_step_flag:
-        if len(steps) <= 2:
-            return step_ids[:], steps[:]
-    else:
-        if len(steps) <= 3:
-            return step_ids[:], steps[:]
-
-    # show the previous step (or current if first step)
-    init_id = max(0, step_ids[0] - 1)
-
-    # show the next step (or current if last step)
-    final_id = min(len(steps), step_ids[-1] + 2)  # +2 because ID is not selected in Python
-
-    assert 0 <= init_id < final_id <= len(steps)
-
-    out_steps = steps[init_id:final_id]
-    out_step_ids = []
-    for step_id in step_ids:
-        out_step_id = step_id - init_id
-        if 0 <= out_step_id < len(out_steps):
-            out_step_ids.append(out_step_id)
-    return out_step_ids, out_steps
+    return BuildOrderTimeline(build_order_data, times)
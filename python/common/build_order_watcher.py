@@ -0,0 +1,142 @@
+import os
+
+from PyQt5.QtCore import QFileSystemWatcher, QTimer, QObject
+
+
+def get_files_snapshot(directory: str, extension: str = '.json') -> (dict, list):
+    """Get the modification time and size of the files in a directory (recursively).
+
+    Parameters
+    ----------
+    directory    Directory to scan.
+    extension    Extension of the files to consider.
+
+    Returns
+    -------
+    Files as {path: (modification time [ns], size)}.
+    List of the directories (including 'directory').
+    """
+    files = dict()
+    directories = []
+    for root, _, file_names in os.walk(directory):
+        directories.append(root)
+        for file_name in file_names:
+            if os.path.splitext(file_name)[1] == extension:
+                path = os.path.join(root, file_name)
+                try:
+                    stat = os.stat(path)
+                except OSError:  # removed in the meantime
+                    continue
+                files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files, directories
+
+
+class BuildOrderWatcher:
+    """Watch the build order files, to report the added, modified and deleted ones."""
+
+    def __init__(
+        self,
+        directory: str,
+        callback,
+        parent: QObject = None,
+        polling: bool = False,
+        polling_ms: int = 2000,
+        delay_ms: int = 300,
+    ):
+        """Constructor
+
+        Parameters
+        ----------
+        directory     Directory with the build order files (watched recursively).
+        callback      Function called with the changed (added or modified) files and the deleted files.
+        parent        Parent of the Qt watcher and timers.
+        polling       True to periodically check the files, False to use the system notifications
+                      (periodic check used anyway if the notifications are not available).
+        polling_ms    Period to check the files when polling [ms].
+        delay_ms      Delay between a system notification and the check of the files [ms],
+                      to wait for the end of the file writing.
+        """
+        self.directory = directory
+        self.callback = callback
+        self.files = dict()  # files snapshot, see 'get_files_snapshot'
+
+        # system notifications
+        self.file_system_watcher = None if polling else QFileSystemWatcher(parent)
+        if self.file_system_watcher is not None:
+            self.file_system_watcher.directoryChanged.connect(self.notification_received)
+            self.file_system_watcher.fileChanged.connect(self.notification_received)
+
+        self.check_timer = QTimer(parent)  # delay before checking the files after a notification
+        self.check_timer.setSingleShot(True)
+        self.check_timer.setInterval(delay_ms)
+        self.check_timer.timeout.connect(self.check_files)
+
+        self.polling_timer = QTimer(parent)  # periodic check of the files
+        self.polling_timer.setInterval(polling_ms)
+        self.polling_timer.timeout.connect(self.check_files)
+
+        self.reset()
+
+    def reset(self):
+        """Take the current state of the files as reference (e.g. after loading all the build orders)."""
+        self.check_timer.stop()
+        self.files, directories = get_files_snapshot(self.directory)
+        self.update_watched_paths(directories)
+
+    def stop(self):
+        """Stop watching the files (cannot be restarted)."""
+        self.check_timer.stop()
+        self.polling_timer.stop()
+        self.check_timer.deleteLater()
+        self.polling_timer.deleteLater()
+        if self.file_system_watcher is not None:
+            self.file_system_watcher.deleteLater()
+            self.file_system_watcher = None
+
+    def update_watched_paths(self, directories: list, changed_files: list = ()):
+        """Watch the current files and directories, or start polling if the system notifications are not available.
+
+        Parameters
+        ----------
+        directories      Directories to watch.
+        changed_files    Changed files, watched again (a file replaced by another one is not watched anymore).
+        """
+        if self.file_system_watcher is None:
+            if not self.polling_timer.isActive():
+                self.polling_timer.start()
+            return
+
+        watched_paths = set(self.file_system_watcher.files() + self.file_system_watcher.directories())
+        paths = set(self.files.keys()) | set(directories)
+
+        removed_paths = list((watched_paths - paths) | (watched_paths & set(changed_files)))
+        if removed_paths:
+            self.file_system_watcher.removePaths(removed_paths)
+
+        added_paths = list(paths - watched_paths.difference(removed_paths))
+        if added_paths and self.file_system_watcher.addPaths(added_paths):  # some paths could not be watched
+            if not self.polling_timer.isActive():
+                print('Could not watch all the build order files, checking them periodically instead.')
+                self.polling_timer.start()
+
+    def notification_received(self, path: str):
+        """Called when the system notifies a change (checking the files after a short delay).
+
+        Parameters
+        ----------
+        path    Changed file or directory.
+        """
+        self.check_timer.start()  # restarted at each notification
+
+    def check_files(self):
+        """Check the files and report the changes since the last check."""
+        files, directories = get_files_snapshot(self.directory)
+
+        changed_files = [path for path, file_state in files.items() if self.files.get(path) != file_state]
+        deleted_files = [path for path in self.files if path not in files]
+
+        self.files = files
+        self.update_watched_paths(directories, changed_files)
+
+        if changed_files or deleted_files:
+            self.callback(changed_files, deleted_files)
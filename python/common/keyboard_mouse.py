@@ -43,14 +43,16 @@ class HotkeyFlagData:
 class KeyboardMouseManagement:
     """Keyboard global hotkeys and mouse global buttons management."""
 
-    def __init__(self, print_unset: bool = True):
+    def __init__(self, print_unset: bool = True, input_callback=None):
         """Constructor
 
         Parameters
         ----------
-        print_unset    True to print unset hotkey & button warnings.
+        print_unset       True to print unset hotkey & button warnings.
+        input_callback    Function called (from the listening threads) when a flag is set, None to only poll the flags.
         """
         self.print_unset = print_unset
+        self.input_callback = input_callback
 
         self.keyboard_hotkeys = dict()  # list of keyboard hotkeys available as {name: HotkeyFlagData}
         self.keyboard_hotkey_ids = []  # IDs of keyboard hotkeys, as received from 'add_hotkey'
@@ -71,6 +73,8 @@ class KeyboardMouseManagement:
             button_name = button.name if hasattr(button, 'name') else str(button)
             if button_name in self.mouse_buttons:
                 self.set_mouse_flag(button_name, True)
+                if self.input_callback is not None:
+                    self.input_callback()
 
     def set_all_flags(self, value: bool):
         """Set all the flags (keyboard and mouse) to the same value.
@@ -150,6 +154,9 @@ class KeyboardMouseManagement:
             elif self.print_unset:
                 print(f'Unknown keyboard hotkey name received ({name}) to set the flag.')
 
+        if value and (self.input_callback is not None):
+            self.input_callback()
+
     def is_keyboard_hotkey_pressed(self, name: str) -> bool:
         """Check if a keyboard hotkey is pressed.
 
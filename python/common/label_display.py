@@ -1,33 +1,15 @@
 import os
-import re
+from bisect import bisect_left
 from typing import Union
 
 from PyQt5.QtWidgets import QLabel
-from PyQt5.QtGui import QPixmap, QFont
-from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPixmap
 
 from common.useful_tools import widget_y_end
-
-
-def split_multi_label_line(line: str) -> list:
-    """Split a line based on the @ markers and remove first/last empty elements.
-
-    Parameters
-    ----------
-    line    Line to split.
-
-    Returns
-    -------
-    Requested split line.
-    """
-    split_line = line.split('@')
-
-    if (len(split_line) > 0) and (split_line[0] == ''):
-        del split_line[0]
-    if (len(split_line) > 0) and (split_line[-1] == ''):
-        del split_line[-1]
-
-    return split_line
+from common.asset_index import AssetIndex
+from common.pixmap_cache import PixmapCache
+from common.label_style import LabelStyleCache
+from common.multi_label_line import split_multi_label_line
 
 
 def is_mouse_in_label(mouse_x: int, mouse_y: int, label: QLabel) -> bool:
@@ -122,6 +104,9 @@ class MultiQLabelDisplay:
         extra_emphasis_height=0,
         game_pictures_folder: str = None,
         common_pictures_folder: str = None,
+        asset_index: AssetIndex = None,
+        pixmap_cache: PixmapCache = None,
+        style_cache: LabelStyleCache = None,
     ):
         """Constructor
 
@@ -137,6 +122,11 @@ class MultiQLabelDisplay:
         extra_emphasis_height     Extra pixels height for the color emphasis background rectangle.
         game_pictures_folder      Folder where the game pictures are located, None if no game picture to use.
         common_pictures_folder    Folder where the common pictures are located, None if no common picture to use.
+        asset_index               Index of the images of the pictures folders (can be shared by several displays),
+                                  None to create it (if pictures folders are used).
+        pixmap_cache              Cache of the scaled images (can be shared by several displays), None to create it.
+        style_cache               Cache of the labels styles and fonts (can be shared by several displays),
+                                  None to create it.
         """
         # font and images
         self.font_police = font_police
@@ -171,16 +161,33 @@ class MultiQLabelDisplay:
 
         if (self.game_pictures_folder is not None) or (self.common_pictures_folder is not None):
             assert self.image_height > 0  # valid height must be provided
+            if asset_index is None:
+                asset_index = AssetIndex([self.game_pictures_folder, self.common_pictures_folder])
+        self.asset_index = asset_index  # index to find the images (game folder first)
+        self.pixmap_cache = pixmap_cache if (pixmap_cache is not None) else PixmapCache()  # scaled images
+        self.style_cache = style_cache if (style_cache is not None) else LabelStyleCache()  # shared styles and fonts
 
         self.labels = []  # labels to display
         self.row_emphasis = None  # rectangle used to add emphasis on rows with background color
+        self.row_emphasis_label = None  # label used for 'row_emphasis' (kept to be reused)
         self.row_emphasis_ids = []  # store the row IDs requiring emphasis
         self.row_color_ids = []  # store the row IDs for color rectangles
         self.shown = False  # True if labels currently shown
 
+        # labels are never destroyed, but reused for the next rows (only applying what changed)
+        self.label_pool = []  # hidden labels of the previous rows, reused in the same order (see 'get_label')
+        self.label_pool_id = 0  # ID of the next label to reuse in 'label_pool'
+        self.label_states = dict()  # current content and style of each label, see 'get_label'
+
         self.row_max_width = 0  # maximal width of a row
         self.row_total_height = 0  # cumulative height of all the rows (with vertical spacing)
         self.rows_roi_limits = []  # list of rows rectangular limits
+        self.layout_id = 0  # incremented when the rows or their layout change (see 'clear' and 'update_size_position')
+
+        # labels bounds computed with the layout, for the hit-test (see 'update_hit_test_bounds')
+        self.hit_rows_y_start = []  # first Y position of each row
+        self.hit_rows_y_end = []  # last Y position of each row
+        self.hit_rows_labels = []  # bounds of the labels of each row as (X starts, X ends, Y starts, Y ends)
 
     def update_settings(
         self,
@@ -228,6 +235,8 @@ class MultiQLabelDisplay:
         # color for the (optional) row emphasis
         assert len(color_row_emphasis) == 3
         self.color_row_emphasis = color_row_emphasis
+        if self.row_emphasis_label is not None:
+            self.set_label_style(self.row_emphasis_label, background_color=self.color_row_emphasis)
 
         self.clear()  # clear elements
         self.shown = False  # True if labels currently shown
@@ -300,20 +309,163 @@ class MultiQLabelDisplay:
         return False
 
     def clear(self):
-        """Hide and remove all labels."""
-        if self.row_emphasis is not None:
-            self.row_emphasis.deleteLater()
+        """Hide and remove all labels (kept to be reused by the next rows, see 'get_label')."""
+        self.hide()
+
         self.row_emphasis = None
         self.row_emphasis_ids.clear()
         self.row_color_ids.clear()
 
-        for row in self.labels:
-            for label in row:
-                label.deleteLater()
-            row.clear()
+        # labels of the removed rows first, to reuse them in the same order (as long as the content does not change)
+        self.label_pool = [label for row in self.labels for label in row] + self.label_pool[self.label_pool_id :]
+        self.label_pool_id = 0
         self.labels.clear()
+        self.layout_id += 1
+        self.update_hit_test_bounds()
 
-        self.hide()
+    def get_label(self, parent) -> QLabel:
+        """Get a label for a new row element, reusing the labels of the removed rows if possible.
+
+        Parameters
+        ----------
+        parent    Parent element of the label.
+
+        Returns
+        -------
+        Hidden label, to configure with 'set_label_content' and 'set_qlabel_settings' (only applying the changes).
+        """
+        if self.label_pool_id < len(self.label_pool):
+            label = self.label_pool[self.label_pool_id]
+            self.label_pool_id += 1
+            self.set_label_parent(label, parent)
+            return label
+
+        return self.create_label(parent)
+
+    def create_label(self, parent) -> QLabel:
+        """Create a new label (see 'get_label').
+
+        Parameters
+        ----------
+        parent    Parent element of the label.
+
+        Returns
+        -------
+        Hidden label.
+        """
+        label = QLabel('', parent)
+        # content as ('text', text) or ('pixmap', pixmap), font as (police, size, bold) and style (see 'LabelStyle')
+        self.label_states[label] = {
+            'content': ('text', ''),
+            'font': None,
+            'style': self.style_cache.get_style(),
+            'name': '',
+        }
+        return label
+
+    def set_label_parent(self, label: QLabel, parent):
+        """Set the parent of a reused label.
+
+        Parameters
+        ----------
+        label     Label to update.
+        parent    Parent element of the label.
+        """
+        if label.parent() is not parent:
+            label.setParent(parent)
+
+    def set_label_content(self, label: QLabel, text: str = '', pixmap: QPixmap = None, name: str = ''):
+        """Set the content of a label (see 'get_label'), only updating it if it changed.
+
+        Parameters
+        ----------
+        label     Label to update.
+        text      Text to display (with the display font), ignored if 'pixmap' is provided.
+        pixmap    Image to display, None to display the text.
+        name      Object name of the label.
+        """
+        state = self.label_states[label]
+        content_type, content_value = state['content']
+        if pixmap is not None:
+            if (content_type != 'pixmap') or (content_value is not pixmap):
+                label.setPixmap(pixmap)
+                state['content'] = ('pixmap', pixmap)
+        else:
+            if (content_type != 'text') or (content_value != text):
+                label.setText(text)  # also removes the pixmap
+                state['content'] = ('text', text)
+            self.set_label_font(label, state)
+
+        if state['name'] != name:
+            label.setObjectName(name)
+            state['name'] = name
+
+    def set_label_font(self, label: QLabel, state: dict):
+        """Set the font of a text label (shared font), only updating it if it changed.
+
+        Parameters
+        ----------
+        label    Label to update.
+        state    State of the label, see 'get_label'.
+        """
+        font = (self.font_police, self.font_size, state['style'].text_bold)
+        if state['font'] != font:
+            label.setFont(self.style_cache.get_font(*font))
+            state['font'] = font
+
+    def set_label_style(
+        self,
+        label: QLabel,
+        text_color: list = None,
+        background_color: list = None,
+        text_bold: bool = False,
+        text_alignment: str = None,
+    ):
+        """Set the style of a label (see 'get_label'), only updating what changed.
+
+        The text color is set with a shared palette and the boldness with a shared font,
+        the style sheet (parsed by Qt) is only changed with the background color.
+
+        Parameters
+        ----------
+        label               Label to update.
+        text_color          Color of the text [R, G, B], None to keep the current one.
+        background_color    Color of the background [R, G, B], None for no background.
+        text_bold           True for bold text, False for normal text.
+        text_alignment      Text alignment: 'left', 'center' or 'right', None for default.
+        """
+        style = self.style_cache.get_style(text_color, background_color, text_bold, text_alignment)
+        state = self.label_states[label]
+        previous_style = state['style']
+        if style is previous_style:
+            return
+        state['style'] = style
+
+        if (style.palette is not None) and (style.palette is not previous_style.palette):
+            label.setPalette(style.palette)
+        if style.style_sheet != previous_style.style_sheet:
+            label.setStyleSheet(style.style_sheet)
+        if style.qt_alignment != previous_style.qt_alignment:
+            label.setAlignment(style.qt_alignment)
+        if state['content'][0] == 'text':
+            self.set_label_font(label, state)
+
+    def get_row_emphasis(self, parent) -> QLabel:
+        """Get the rectangle used to add emphasis on rows (created once, then reused).
+
+        Parameters
+        ----------
+        parent    Parent element of the rectangle.
+
+        Returns
+        -------
+        Rectangle with the row emphasis background color.
+        """
+        if self.row_emphasis_label is None:
+            self.row_emphasis_label = self.create_label(parent)
+            self.set_label_style(self.row_emphasis_label, background_color=self.color_row_emphasis)
+            self.row_emphasis_label.lower()  # below the reused labels
+        return self.row_emphasis_label
 
     def set_qlabel_settings(self, label: QLabel, settings: QLabelSettings = None):
         """Adapt the settings (color, boldness...) of a QLabel.
@@ -326,32 +478,11 @@ class MultiQLabelDisplay:
         if settings is None:  # use default settings
             settings = QLabelSettings()
 
-        # font text color
         text_color = self.color_default if (settings.text_color is None) else settings.text_color
-        style_str = f'color: rgb({text_color[0]}, {text_color[1]}, {text_color[2]})'
-
-        # background color
-        if settings.background_color is not None:
-            background_color = settings.background_color
-            style_str += f';background-color: rgb({background_color[0]}, {background_color[1]}, {background_color[2]})'
-
-        if settings.text_bold:  # bold font
-            style_str += ';font-weight: bold'
-
-        label.setStyleSheet(style_str)
-
-        # text alignment
-        text_alignment = settings.text_alignment
-        if text_alignment is not None:
-            if text_alignment == 'left':
-                label.setAlignment(Qt.AlignLeft)
-            elif text_alignment == 'center':
-                label.setAlignment(Qt.AlignCenter)
-            elif text_alignment == 'right':
-                label.setAlignment(Qt.AlignRight)
+        self.set_label_style(label, text_color, settings.background_color, settings.text_bold, settings.text_alignment)
 
     def get_image_path(self, image_search: str) -> Union[str, None]:
-        """Get the path for an image.
+        """Get the path for an image (found in the index, without file system access).
 
         Parameters
         ----------
@@ -361,37 +492,29 @@ class MultiQLabelDisplay:
         -------
         Image with its path, None if not found.
         """
-        extensions = ['.webp', '.png', '.jpg']  # different extensions to try
-
-        # Extract current extension (if any)
-        match = re.search(r'\.(webp|png|jpg)$', image_search)
-        current_ext = match.group(0) if match else None
+        if self.asset_index is None:  # no picture
+            return None
+        return self.asset_index.get_image_path(image_search)
 
-        # Get base path without extension
-        base_path = image_search[: -len(current_ext)] if current_ext else image_search
+    def get_line_tokens(self, line: str) -> Union[tuple, None]:
+        """Get the tokens of a line mixing text and images, with the images paths resolved (to compute only once).
 
-        # Reorder extensions to start with current one (if present)
-        ordered_extensions = (
-            [current_ext] + [ext for ext in extensions if ext != current_ext] if current_ext else extensions
-        )
-
-        # Loop through variations
-        for ext in ordered_extensions:
-            image_search_extension = f"{base_path}{ext}"
+        Parameters
+        ----------
+        line    String text line with images between @ markers (e.g. 'text @image@ text').
 
-            if self.game_pictures_folder is not None:  # try first with the game folder
-                game_image_path = os.path.join(self.game_pictures_folder, image_search_extension)
-                if os.path.isfile(game_image_path):
-                    return game_image_path
+        Returns
+        -------
+        Tuple of tokens as (text, image path (None if not an image)), None if empty line (no row to add),
+        see 'add_row_from_tokens'.
+        """
+        if len(line) == 0:
+            return None
 
-            # try then with the common folder
-            if self.common_pictures_folder is not None:
-                common_image_path = os.path.join(self.common_pictures_folder, image_search_extension)
-                if os.path.isfile(common_image_path):
-                    return common_image_path
+        if (self.game_pictures_folder is None) and (self.common_pictures_folder is None):  # no picture
+            return ((line, None),)
 
-        # not found
-        return None
+        return tuple((split_part, self.get_image_path(split_part)) for split_part in split_multi_label_line(line))
 
     def add_row_from_picture_line(self, parent, line: str, labels_settings: list = None, emphasis_flag: bool = False):
         """Add a row of labels based on a line mixing text and images.
@@ -404,7 +527,20 @@ class MultiQLabelDisplay:
                            see 'split_multi_label_line' function (None for default settings).
         emphasis_flag      True to add background color emphasis on this row.
         """
-        if len(line) == 0:
+        self.add_row_from_tokens(parent, self.get_line_tokens(line), labels_settings, emphasis_flag)
+
+    def add_row_from_tokens(self, parent, tokens: tuple, labels_settings: list = None, emphasis_flag: bool = False):
+        """Add a row of labels based on the tokens of a line (no parsing of the line).
+
+        Parameters
+        ----------
+        parent             Parent element of this object.
+        tokens             Tokens of the line, obtained with 'get_line_tokens' (None to skip the row).
+        labels_settings    Settings for the QLabel elements, must be the same size as the tokens
+                           (None for default settings).
+        emphasis_flag      True to add background color emphasis on this row.
+        """
+        if tokens is None:
             return
 
         if emphasis_flag:  # add emphasis color background
@@ -413,16 +549,11 @@ class MultiQLabelDisplay:
             self.row_emphasis_ids.append(row_id)
 
             if self.row_emphasis is None:
-                self.row_emphasis = QLabel('', parent)
-                self.row_emphasis.setStyleSheet(
-                    f'background-color: rgb('
-                    f'{self.color_row_emphasis[0]}, {self.color_row_emphasis[1]}, {self.color_row_emphasis[2]})'
-                )
+                self.row_emphasis = self.get_row_emphasis(parent)
 
         if (self.game_pictures_folder is None) and (self.common_pictures_folder is None):  # no picture
-            label = QLabel('', parent)
-            label.setFont(QFont(self.font_police, self.font_size))
-            label.setText(line)
+            label = self.get_label(parent)
+            self.set_label_content(label, text=tokens[0][0])
 
             if labels_settings is not None:
                 if len(labels_settings) == 1:
@@ -439,8 +570,7 @@ class MultiQLabelDisplay:
             self.labels.append([label])
 
         else:  # pictures available
-            split_line = split_multi_label_line(line)
-            split_count = len(split_line)
+            split_count = len(tokens)
 
             if split_count > 0:
                 # check labels_settings items count
@@ -450,12 +580,8 @@ class MultiQLabelDisplay:
                         labels_settings = None
 
                 row = []
-                for split_id in range(split_count):  # loop on the line parts
-                    label = QLabel('', parent)
-                    label.setObjectName(split_line[split_id])
-
-                    # get image path
-                    image_path = self.get_image_path(split_line[split_id])
+                for split_id, (split_part, image_path) in enumerate(tokens):  # loop on the line parts
+                    label = self.get_label(parent)
 
                     if (labels_settings is not None) and (labels_settings[split_id] is not None):
                         current_label_settings = labels_settings[split_id]
@@ -473,24 +599,13 @@ class MultiQLabelDisplay:
                         if current_label_settings.image_height is not None:
                             image_height = current_label_settings.image_height
 
-                        if image_height is not None:
-                            if image_width is not None:  # scale to width and height
-                                label.setPixmap(
-                                    QPixmap(image_path).scaled(
-                                        image_width, image_height, transformMode=Qt.SmoothTransformation
-                                    )
-                                )
-                            else:  # scale to height
-                                label.setPixmap(
-                                    QPixmap(image_path).scaledToHeight(image_height, mode=Qt.SmoothTransformation)
-                                )
-                        elif image_width is not None:  # scale to width
-                            label.setPixmap(
-                                QPixmap(image_path).scaledToWidth(image_width, mode=Qt.SmoothTransformation)
-                            )
+                        if (image_height is not None) or (image_width is not None):  # decoded and scaled once
+                            pixmap = self.pixmap_cache.get(image_path, image_width, image_height)
+                            self.set_label_content(label, pixmap=pixmap, name=split_part)
+                        else:
+                            self.set_label_content(label, text='', name=split_part)
                     else:  # image not found
-                        label.setText(split_line[split_id])
-                        label.setFont(QFont(self.font_police, self.font_size))
+                        self.set_label_content(label, text=split_part, name=split_part)
 
                     if emphasis_flag and (current_label_settings.background_color is None):
                         current_label_settings.background_color = self.color_row_emphasis
@@ -499,7 +614,10 @@ class MultiQLabelDisplay:
 
                 self.labels.append(row)
             else:
-                self.labels.append([QLabel('', parent)])
+                label = self.get_label(parent)
+                self.set_label_content(label)
+                self.set_label_style(label)
+                self.labels.append([label])
 
     def add_row_color(self, parent, height: int, color: list):
         """Add a row with only a single rectangular color fitting all the width.
@@ -517,9 +635,10 @@ class MultiQLabelDisplay:
 
         self.row_color_ids.append(len(self.labels))  # store corresponding label ID
 
-        label = QLabel('', parent)
+        label = self.get_label(parent)
+        self.set_label_content(label)
+        self.set_label_style(label, background_color=color)
         label.resize(1, height)  # width will be adapted later
-        label.setStyleSheet(f';background-color: rgb({color[0]}, {color[1]}, {color[2]})')
         self.labels.append([label])
 
     def update_size_position(
@@ -536,6 +655,8 @@ class MultiQLabelDisplay:
                             (negative to ignore it, 0 to apply on the column count of the first row).
         """
 
+        self.layout_id += 1
+
         # adjust the size of the items
         for row_id, row in enumerate(self.labels):
             if row_id in self.row_color_ids:  # color rows
@@ -578,24 +699,16 @@ class MultiQLabelDisplay:
         row_count = len(self.labels)
         for row_id, row in enumerate(self.labels):  # loop on all the rows
             total_width = 0
-            max_height = 0
+            max_height = max([label.height() for label in row], default=0)
             label_x = 0 if (row_id in self.row_color_ids) else init_x  # current X position
 
-            for label in row:  # loop on all the labels of the row
-                label.move(label_x, label_y)
+            for label in row:  # loop on all the labels of the row (centered along the max height)
+                label.move(label_x, label_y + (max_height - label.height()) // 2)
                 label_x += label.width()
                 total_width += label.width()
-                max_height = max(max_height, label.height())
 
             self.rows_roi_limits.append(RectangleLimit(x=init_x, y=label_y, width=total_width, height=max_height))
 
-            # adapt to center along the max height
-            for label in row:
-                cur_height = label.height()
-                if cur_height < max_height:
-                    diff_height = max_height - cur_height
-                    label.move(label.x(), label.y() + diff_height // 2)
-
             # update maximal width and total height
             self.row_max_width = max(self.row_max_width, total_width)
             self.row_total_height += max_height
@@ -641,6 +754,23 @@ class MultiQLabelDisplay:
             self.row_emphasis.move(0, y0)
             self.row_emphasis.resize(panel_total_width, y1 - y0)
 
+        self.update_hit_test_bounds()
+
+    def update_hit_test_bounds(self):
+        """Store the bounds of the labels as integers, to find the hovered label without accessing them."""
+        self.hit_rows_y_start.clear()
+        self.hit_rows_y_end.clear()
+        self.hit_rows_labels.clear()
+
+        for row in self.labels:
+            x_starts = [label.x() for label in row]
+            x_ends = [x_start + label.width() for x_start, label in zip(x_starts, row)]
+            y_starts = [label.y() for label in row]
+            y_ends = [y_start + label.height() for y_start, label in zip(y_starts, row)]
+            self.hit_rows_y_start.append(min(y_starts, default=0))
+            self.hit_rows_y_end.append(max(y_ends, default=-1))
+            self.hit_rows_labels.append((x_starts, x_ends, y_starts, y_ends))
+
     def get_mouse_label_id(self, mouse_x: int, mouse_y: int) -> list:
         """Get the IDs of the label hovered by the mouse.
 
@@ -653,10 +783,18 @@ class MultiQLabelDisplay:
         -------
         [row ID, column ID] of the label, [-1, -1] if not hovering any label.
         """
-        for row_id, row in enumerate(self.labels):
-            for column_id, label in enumerate(row):
-                if is_mouse_in_label(mouse_x, mouse_y, label):
+        # rows (and labels in a row) one after the other: first candidates found by bisection, limits included
+        row_count = len(self.hit_rows_y_start)
+        row_id = bisect_left(self.hit_rows_y_end, mouse_y)  # first row not ending before the mouse
+        while (row_id < row_count) and (self.hit_rows_y_start[row_id] <= mouse_y):
+            x_starts, x_ends, y_starts, y_ends = self.hit_rows_labels[row_id]
+            column_count = len(x_starts)
+            column_id = bisect_left(x_ends, mouse_x)  # first label not ending before the mouse
+            while (column_id < column_count) and (x_starts[column_id] <= mouse_x):
+                if y_starts[column_id] <= mouse_y <= y_ends[column_id]:
                     return [row_id, column_id]
+                column_id += 1
+            row_id += 1
         return [-1, -1]
 
     def set_color_label(self, row_id: int, column_id: int, color: list = None):
@@ -0,0 +1,114 @@
+from PyQt5.QtGui import QFont, QPalette, QColor
+from PyQt5.QtCore import Qt
+
+
+class LabelStyle:
+    """Style of a label (shared by all the labels with the same style, must not be modified)"""
+
+    def __init__(
+        self,
+        text_color: list = None,
+        background_color: list = None,
+        text_bold: bool = False,
+        text_alignment: str = None,
+    ):
+        """Constructor
+
+        Parameters
+        ----------
+        text_color          Color of the text [R, G, B], None for default.
+        background_color    Color of the background [R, G, B], None for no background.
+        text_bold           True for bold text, False for normal text.
+        text_alignment      Text alignment: 'left', 'center' or 'right', None for default.
+        """
+        self.text_color = None if (text_color is None) else QColor(text_color[0], text_color[1], text_color[2])
+        self.background_color = (
+            None
+            if (background_color is None)
+            else QColor(background_color[0], background_color[1], background_color[2])
+        )
+        self.text_bold = text_bold
+        self.text_alignment = text_alignment
+
+        # text color applied with the palette (style sheet only needed for the background, parsed by Qt)
+        self.palette = None  # None to keep the current palette (no text color)
+        if self.text_color is not None:
+            self.palette = QPalette()
+            self.palette.setColor(QPalette.WindowText, self.text_color)
+
+        self.style_sheet = (
+            ''
+            if (background_color is None)
+            else f'background-color: rgb({background_color[0]}, {background_color[1]}, {background_color[2]})'
+        )
+
+        if text_alignment == 'left':
+            self.qt_alignment = Qt.AlignLeft
+        elif text_alignment == 'center':
+            self.qt_alignment = Qt.AlignCenter
+        elif text_alignment == 'right':
+            self.qt_alignment = Qt.AlignRight
+        else:  # default alignment of a QLabel
+            self.qt_alignment = Qt.AlignLeft | Qt.AlignVCenter
+
+
+class LabelStyleCache:
+    """Cache of the labels styles and fonts, created once and shared by the labels"""
+
+    def __init__(self):
+        """Constructor"""
+        self.styles = dict()  # styles as {(text color, background color, bold, alignment): style}
+        self.fonts = dict()  # fonts as {(police, size, bold): font}
+
+    def get_style(
+        self,
+        text_color: list = None,
+        background_color: list = None,
+        text_bold: bool = False,
+        text_alignment: str = None,
+    ) -> LabelStyle:
+        """Get a label style.
+
+        Parameters
+        ----------
+        text_color          Color of the text [R, G, B], None for default.
+        background_color    Color of the background [R, G, B], None for no background.
+        text_bold           True for bold text, False for normal text.
+        text_alignment      Text alignment: 'left', 'center' or 'right', None for default.
+
+        Returns
+        -------
+        Requested style (shared, identical objects for identical styles).
+        """
+        key = (
+            None if (text_color is None) else (text_color[0], text_color[1], text_color[2]),
+            None if (background_color is None) else (background_color[0], background_color[1], background_color[2]),
+            text_bold,
+            text_alignment,
+        )
+        style = self.styles.get(key)
+        if style is None:
+            style = LabelStyle(text_color, background_color, text_bold, text_alignment)
+            self.styles[key] = style
+        return style
+
+    def get_font(self, font_police: str, font_size: int, bold: bool = False) -> QFont:
+        """Get a font.
+
+        Parameters
+        ----------
+        font_police    Police of the font.
+        font_size      Size of the font.
+        bold           True for a bold font.
+
+        Returns
+        -------
+        Requested font (shared, must not be modified).
+        """
+        key = (font_police, font_size, bold)
+        font = self.fonts.get(key)
+        if font is None:
+            font = QFont(font_police, font_size)
+            font.setBold(bold)
+            self.fonts[key] = font
+        return font
@@ -0,0 +1,19 @@
+def split_multi_label_line(line: str) -> list:
+    """Split a line based on the @ markers and remove first/last empty elements.
+
+    Parameters
+    ----------
+    line    Line to split.
+
+    Returns
+    -------
+    Requested split line.
+    """
+    split_line = line.split('@')
+
+    if (len(split_line) > 0) and (split_line[0] == ''):
+        del split_line[0]
+    if (len(split_line) > 0) and (split_line[-1] == ''):
+        del split_line[-1]
+
+    return split_line
@@ -0,0 +1,326 @@
+from math import ceil
+
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtGui import QPainter, QPixmap, QFont, QStaticText, QTransform
+from PyQt5.QtCore import Qt, QRect, QPoint
+
+from common.label_display import MultiQLabelDisplay
+from common.label_style import LabelStyle
+
+STATIC_TEXTS_MAX_COUNT = 4096  # maximal number of cached texts (cache cleared when reached)
+
+
+class PaintedLabel:
+    """Element of a row (text or image) painted by 'PaintedRowsWidget', with the geometry interface of a QLabel"""
+
+    def __init__(self, style: LabelStyle):
+        """Constructor
+
+        Parameters
+        ----------
+        style    Initial style of the element.
+        """
+        # content
+        self.text = ''  # text to display (ignored if 'pixmap' is provided)
+        self.pixmap = None  # image to display, None to display the text
+        self.static_text = None  # prepared text, see 'PaintedMultiLabelDisplay.get_static_text'
+        self.content_width = 0  # width of the text or image
+        self.content_height = 0  # height of the text or image
+
+        self.style = style  # shared style (colors, boldness and alignment)
+
+        # geometry (relative to the parent of the painting widget)
+        self.pos_x = 0
+        self.pos_y = 0
+        self.size_width = 0
+        self.size_height = 0
+        self.visible = False
+
+    def x(self) -> int:
+        """Get the X position."""
+        return self.pos_x
+
+    def y(self) -> int:
+        """Get the Y position."""
+        return self.pos_y
+
+    def width(self) -> int:
+        """Get the width."""
+        return self.size_width
+
+    def height(self) -> int:
+        """Get the height."""
+        return self.size_height
+
+    def move(self, x: int, y: int):
+        """Move the element.
+
+        Parameters
+        ----------
+        x    New X position.
+        y    New Y position.
+        """
+        self.pos_x = x
+        self.pos_y = y
+
+    def resize(self, width: int, height: int):
+        """Resize the element.
+
+        Parameters
+        ----------
+        width     New width.
+        height    New height.
+        """
+        self.size_width = width
+        self.size_height = height
+
+    def adjustSize(self):
+        """Adjust the size to fit the content."""
+        self.resize(self.content_width, self.content_height)
+
+    def show(self):
+        """Show the element."""
+        self.visible = True
+
+    def hide(self):
+        """Hide the element."""
+        self.visible = False
+
+    def isVisible(self) -> bool:
+        """Check if the element is visible."""
+        return self.visible
+
+    def lower(self):
+        """Lower the element (nothing to do, the row emphasis is always painted first)."""
+        pass
+
+    def paint(self, painter: QPainter, font: QFont):
+        """Paint the element.
+
+        Parameters
+        ----------
+        painter    Painter of the widget.
+        font       Font of the text (with the requested boldness).
+        """
+        style = self.style
+        if style.background_color is not None:
+            painter.fillRect(self.pos_x, self.pos_y, self.size_width, self.size_height, style.background_color)
+
+        if (self.pixmap is None) and ((self.static_text is None) or (style.text_color is None)):
+            return  # nothing more to paint
+
+        # content aligned as in a QLabel (vertically centered)
+        content_x = self.pos_x
+        if style.text_alignment == 'center':
+            content_x += (self.size_width - self.content_width) // 2
+        elif style.text_alignment == 'right':
+            content_x += self.size_width - self.content_width
+        content_y = self.pos_y + (self.size_height - self.content_height) // 2
+
+        if self.pixmap is not None:
+            painter.drawPixmap(content_x, content_y, self.pixmap)
+        else:
+            painter.setFont(font)
+            painter.setPen(style.text_color)
+            painter.drawStaticText(QPoint(content_x, content_y), self.static_text)
+
+
+class PaintedRowsWidget(QWidget):
+    """Widget painting all the elements of a 'PaintedMultiLabelDisplay'"""
+
+    def __init__(self, display, parent):
+        """Constructor
+
+        Parameters
+        ----------
+        display    Display with the elements to paint.
+        parent     Parent widget (elements positioned relatively to it).
+        """
+        super().__init__(parent)
+        self.display = display
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)  # mouse handled by the parent, as with the QLabel items
+
+    def paintEvent(self, event):
+        """Paint the visible elements.
+
+        Parameters
+        ----------
+        event    Paint event.
+        """
+        painter = QPainter(self)
+        painter.translate(-self.x(), -self.y())  # elements positioned relatively to the parent
+        self.display.paint(painter)
+        painter.end()
+
+
+class PaintedMultiLabelDisplay(MultiQLabelDisplay):
+    """Display of several rows painted in a single widget (same interface as 'MultiQLabelDisplay')"""
+
+    def __init__(self, *args, **kwargs):
+        """Constructor, see 'MultiQLabelDisplay'."""
+        super().__init__(*args, **kwargs)
+        self.widget = None  # widget painting the rows (created with the first element, see 'set_widget_parent')
+        self.static_texts = dict()  # prepared texts as {(text, bold): (static text, width, height)}
+
+    def update_settings(self, *args, **kwargs):
+        """Update the settings, see 'MultiQLabelDisplay.update_settings'."""
+        super().update_settings(*args, **kwargs)
+        self.static_texts.clear()  # font may have changed
+        for label in self.label_pool:  # texts prepared again when reused
+            label.static_text = None
+
+    def get_font(self, bold: bool) -> QFont:
+        """Get the font of the texts.
+
+        Parameters
+        ----------
+        bold    True for the bold font.
+
+        Returns
+        -------
+        Requested font.
+        """
+        return self.style_cache.get_font(self.font_police, self.font_size, bold)
+
+    def get_static_text(self, text: str, bold: bool) -> tuple:
+        """Get a text prepared for painting (laid out only once).
+
+        Parameters
+        ----------
+        text    Text to prepare.
+        bold    True for bold text.
+
+        Returns
+        -------
+        Static text, width and height of the text.
+        """
+        key = (text, bold)
+        cached = self.static_texts.get(key)
+        if cached is None:
+            if len(self.static_texts) >= STATIC_TEXTS_MAX_COUNT:
+                self.static_texts.clear()
+            font = self.get_font(bold)
+            static_text = QStaticText(text)  # automatic text format, as a QLabel
+            static_text.prepare(QTransform(), font)
+            size = static_text.size()
+            cached = (static_text, ceil(size.width()), ceil(size.height()))
+            self.static_texts[key] = cached
+        return cached
+
+    def set_widget_parent(self, parent):
+        """Set the parent of the painting widget, creating the widget if needed.
+
+        Parameters
+        ----------
+        parent    Parent element of the rows.
+        """
+        if self.widget is None:
+            self.widget = PaintedRowsWidget(self, parent)
+        elif self.widget.parent() is not parent:
+            self.widget.setParent(parent)
+
+    def create_label(self, parent) -> PaintedLabel:
+        """Create a new element, see 'MultiQLabelDisplay.create_label'."""
+        self.set_widget_parent(parent)
+        return PaintedLabel(self.style_cache.get_style())
+
+    def set_label_parent(self, label: PaintedLabel, parent):
+        """Set the parent of a reused element, see 'MultiQLabelDisplay.set_label_parent'."""
+        self.set_widget_parent(parent)
+
+    def prepare_label_text(self, label: PaintedLabel):
+        """Prepare the text of an element and update its content size.
+
+        Parameters
+        ----------
+        label    Element to update.
+        """
+        if label.pixmap is not None:
+            label.static_text = None
+            label.content_width = label.pixmap.width()
+            label.content_height = label.pixmap.height()
+        else:
+            label.static_text, label.content_width, label.content_height = self.get_static_text(
+                label.text, label.style.text_bold
+            )
+
+    def set_label_content(self, label: PaintedLabel, text: str = '', pixmap: QPixmap = None, name: str = ''):
+        """Set the content of an element, see 'MultiQLabelDisplay.set_label_content'."""
+        if pixmap is not None:
+            if label.pixmap is not pixmap:
+                label.pixmap = pixmap
+                self.prepare_label_text(label)
+        elif (label.pixmap is not None) or (label.text != text) or (label.static_text is None):
+            label.pixmap = None
+            label.text = text
+            self.prepare_label_text(label)
+
+    def set_label_style(
+        self,
+        label: PaintedLabel,
+        text_color: list = None,
+        background_color: list = None,
+        text_bold: bool = False,
+        text_alignment: str = None,
+    ):
+        """Set the style of an element, see 'MultiQLabelDisplay.set_label_style'."""
+        style = self.style_cache.get_style(text_color, background_color, text_bold, text_alignment)
+        previous_style = label.style
+        if style is previous_style:
+            return  # no change
+
+        label.style = style
+        if style.text_bold != previous_style.text_bold:
+            self.prepare_label_text(label)
+
+        if label.visible and (self.widget is not None):  # e.g. color changed when hovering the element
+            self.widget.update()
+
+    def show(self):
+        """Show all the rows."""
+        super().show()
+        if self.widget is not None:
+            self.widget.show()
+            self.widget.update()
+
+    def hide(self):
+        """Hide all the rows."""
+        super().hide()
+        if self.widget is not None:
+            self.widget.hide()
+
+    def update_size_position(self, *args, **kwargs):
+        """Update the size and position of all the elements, see 'MultiQLabelDisplay.update_size_position'."""
+        super().update_size_position(*args, **kwargs)
+        if self.widget is None:
+            return
+
+        # painting widget covering all the elements
+        elements = [label for row in self.labels for label in row]
+        if self.row_emphasis is not None:
+            elements.append(self.row_emphasis)
+        if len(elements) > 0:
+            x0 = min(label.x() for label in elements)
+            y0 = min(label.y() for label in elements)
+            x1 = max(label.x() + label.width() for label in elements)
+            y1 = max(label.y() + label.height() for label in elements)
+            self.widget.setGeometry(QRect(x0, y0, x1 - x0, y1 - y0))
+        else:
+            self.widget.setGeometry(QRect(0, 0, 0, 0))
+        self.widget.update()
+
+    def paint(self, painter: QPainter):
+        """Paint the visible elements (called by the painting widget).
+
+        Parameters
+        ----------
+        painter    Painter of the widget (with coordinates relative to the parent of the widget).
+        """
+        if (self.row_emphasis is not None) and self.row_emphasis.visible:
+            self.row_emphasis.paint(painter, None)
+
+        fonts = (self.get_font(False), self.get_font(True))
+        for row in self.labels:
+            for label in row:
+                if label.visible:
+                    label.paint(painter, fonts[label.style.text_bold])
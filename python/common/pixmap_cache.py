@@ -0,0 +1,95 @@
+from collections import OrderedDict
+
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtCore import Qt
+
+
+class PixmapCache:
+    """Cache of the scaled images (decoded and resized once), with least recently used eviction."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        """Constructor
+
+        Parameters
+        ----------
+        max_bytes    Memory budget of the cached images [bytes].
+        """
+        self.max_bytes = max_bytes
+        self.pixmaps = OrderedDict()  # scaled images as {(path, width, height): (pixmap, bytes)}, oldest first
+        self.total_bytes = 0  # memory used by the cached images [bytes]
+
+        # counters (e.g. to check that no image is decoded when displaying the same steps again)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def clear(self):
+        """Remove all the cached images (e.g. when the images size changes)."""
+        self.pixmaps.clear()
+        self.total_bytes = 0
+
+    def set_max_bytes(self, max_bytes: int):
+        """Set the memory budget, evicting the oldest images if needed.
+
+        Parameters
+        ----------
+        max_bytes    Memory budget of the cached images [bytes].
+        """
+        self.max_bytes = max_bytes
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used images until the memory budget is respected."""
+        while self.pixmaps and (self.total_bytes > self.max_bytes):
+            _, (_, pixmap_bytes) = self.pixmaps.popitem(last=False)
+            self.total_bytes -= pixmap_bytes
+            self.evictions += 1
+
+    def get(self, image_path: str, width: int = None, height: int = None) -> QPixmap:
+        """Get a scaled image.
+
+        Parameters
+        ----------
+        image_path    Image with its path.
+        width         Width of the image, None to keep the aspect ratio (scaled to height).
+        height        Height of the image, None to keep the aspect ratio (scaled to width).
+
+        Returns
+        -------
+        Scaled image (must not be modified, shared with the cache).
+        """
+        key = (image_path, width, height)
+        cached = self.pixmaps.get(key)
+        if cached is not None:
+            self.pixmaps.move_to_end(key)
+            self.hits += 1
+            return cached[0]
+
+        self.misses += 1
+        pixmap = QPixmap(image_path)
+        if height is not None:
+            if width is not None:  # scale to width and height
+                pixmap = pixmap.scaled(width, height, transformMode=Qt.SmoothTransformation)
+            else:  # scale to height
+                pixmap = pixmap.scaledToHeight(height, mode=Qt.SmoothTransformation)
+        elif width is not None:  # scale to width
+            pixmap = pixmap.scaledToWidth(width, mode=Qt.SmoothTransformation)
+
+        pixmap_bytes = pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+        if pixmap_bytes <= self.max_bytes:
+            self.pixmaps[key] = (pixmap, pixmap_bytes)
+            self.total_bytes += pixmap_bytes
+            self.evict()
+        return pixmap
+
+    def get_stats(self) -> str:
+        """Get the statistics of the cache.
+
+        Returns
+        -------
+        Description of the cache usage.
+        """
+        return (
+            f'{self.hits} hits, {self.misses} misses, {self.evictions} evictions, '
+            f'{len(self.pixmaps)} images ({self.total_bytes / (1024 * 1024):.1f} MB)'
+        )
@@ -3,25 +3,25 @@ import json
 import time
 import appdirs
 import subprocess
-from math import floor
+from math import floor, ceil
 from enum import Enum
 from copy import deepcopy
-from thefuzz import process
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Union
 
 from PyQt5.QtWidgets import QMainWindow, QApplication, QLabel, QLineEdit
 from PyQt5.QtWidgets import QWidget, QComboBox, QShortcut
 from PyQt5.QtGui import QKeySequence, QFont, QIcon, QCursor
-from PyQt5.QtCore import Qt, QPoint, QSize
-
-from common.build_order_tools import (
-    get_build_orders,
-    check_build_order_key_values,
-    get_build_order_timer_steps,
-    get_build_order_timer_step_ids,
-    get_build_order_timer_steps_display,
-)
+from PyQt5.QtCore import Qt, QPoint, QSize, QTimer, pyqtSignal
+
+from common.build_order_tools import get_build_orders, load_build_order_file, get_build_order_timeline
+from common.build_order_search import BuildOrderSearch
+from common.build_order_watcher import BuildOrderWatcher
+from common.asset_index import AssetIndex
+from common.pixmap_cache import PixmapCache
+from common.label_style import LabelStyleCache
 from common.label_display import MultiQLabelDisplay, QLabelSettings
+from common.painted_label_display import PaintedMultiLabelDisplay
 from common.useful_tools import (
     TwinHoverButton,
     scale_int,
@@ -45,6 +45,12 @@ class PanelID(Enum):
 class RTSGameOverlay(QMainWindow):
     """RTS game overlay application."""
 
+    # build order search done (emitted from the search thread), with the search request ID and the valid handles
+    build_order_search_done = pyqtSignal(int, list)
+
+    # global hotkey or mouse button flag set (emitted from the keyboard and mouse listening threads)
+    hotkey_input_received = pyqtSignal()
+
     def __init__(
         self,
         app: QApplication,
@@ -56,6 +62,7 @@ class RTSGameOverlay(QMainWindow):
         check_valid_build_order,
         get_faction_selection,
         build_order_category_name: str = None,
+        build_order_sorting=None,
         build_order_timer_available: bool = True,
         build_order_timer_step_starting_flag: bool = True,
     ):
@@ -73,6 +80,8 @@ class RTSGameOverlay(QMainWindow):
         get_faction_selection                   Function to get the faction selection dictionary.
         build_order_category_name               If not None, accept build orders with same name,
                                                 provided they are in different categories.
+        build_order_sorting                     Function providing the sorting key of a build order,
+                                                None to keep the files order.
         build_order_timer_available             True if the build order timer feature is available.
         build_order_timer_step_starting_flag    True if the timer steps starts at the requested time,
                                                 False if ending at this time.
@@ -109,6 +118,7 @@ class RTSGameOverlay(QMainWindow):
         self.directory_config_game = os.path.join(self.directory_config_rts_overlay, name_game)  # game configuration
         self.directory_settings = os.path.join(self.directory_config_game, 'settings')  # settings file
         self.directory_build_orders = os.path.join(self.directory_config_game, 'build_orders')  # build orders
+        self.build_orders_cache_file = os.path.join(self.directory_config_game, 'build_orders_cache.json')
 
         # settings
         self.unscaled_settings = settings_class()
@@ -171,18 +181,34 @@ class RTSGameOverlay(QMainWindow):
 
         # build order selection
         print('Loading the build orders.')
-        self.valid_build_orders = []  # valid build orders names
+        self.valid_build_orders = []  # handles of the valid build orders (see 'BuildOrderLibrary')
         self.build_order_selection_id = 0  # ID selection of the build order in list
+        # last hovering check of the build orders list as (mouse X, mouse Y, 'layout_id' of the list), None if no check
+        self.build_order_hovering_check = None
+        self.build_order_hovering_id = -1  # ID of the build order hovered by the mouse, -1 if none
         self.selected_build_order = None  # selected build order
         self.selected_build_order_name = None  # selected build order name
         self.selected_build_order_step_count = 0  # selected build order count of steps
         self.selected_build_order_step_id = -1  # selected build order step ID
+        self.selected_build_order_path = None  # file of the selected build order (None if unknown)
+        self.selected_build_order_display = None  # display of each step, see 'get_build_order_display'
         self.check_valid_build_order = check_valid_build_order
         self.get_faction_selection = get_faction_selection
         self.build_order_category_name = build_order_category_name
+        self.build_order_sorting = build_order_sorting
         self.build_orders = get_build_orders(
-            self.directory_build_orders, check_valid_build_order, category_name=self.build_order_category_name
+            self.directory_build_orders,
+            check_valid_build_order,
+            category_name=self.build_order_category_name,
+            cache_file=self.get_build_orders_cache_file(),
+            workers=self.settings.build_order_loading.workers,
+            sort_key=self.build_order_sorting,
+            lazy=self.settings.build_order_loading.lazy,
+            resident_count=self.settings.build_order_loading.resident_count,
         )
+        self.build_order_search_engine = BuildOrderSearch(self.build_orders)
+        self.build_orders_watcher = None  # watcher of the build order files (None if not watching)
+        self.start_build_orders_watcher()
 
         # move window
         self.setMouseTracking(True)  # mouse tracking
@@ -197,44 +223,60 @@ class RTSGameOverlay(QMainWindow):
         self.build_order_title = QLabel('Build order', self)
         self.build_order_search = QLineEdit(self)
         self.build_order_search.setPlaceholderText('keywords or space')
-        self.build_order_search.textChanged.connect(self.update_build_order_display)
+        self.build_order_search.textChanged.connect(self.build_order_search_changed)
+        self.build_order_search_timer = QTimer(self)  # delay between typing and searching
+        self.build_order_search_timer.setSingleShot(True)
+        self.build_order_search_timer.timeout.connect(self.update_build_order_display_async)
+        self.build_order_search_executor = None  # thread used for the asynchronous searches (None if not started)
+        self.build_order_search_request_id = 0  # ID of the last search request (the previous ones are outdated)
+        self.build_order_search_pending = False  # True if an asynchronous search is not yet displayed
+        self.build_order_search_async_call = False  # True to request an asynchronous search
+        self.build_order_search_done.connect(self.build_order_search_finished)
+        self.label_style_cache = LabelStyleCache()  # styles and fonts shared by the labels of all the displays
         self.build_order_selection = MultiQLabelDisplay(
             font_police=layout.font_police,
             font_size=layout.font_size,
             border_size=layout.border_size,
             vertical_spacing=layout.configuration.build_order_selection_vertical_spacing,
             color_default=layout.color_default,
+            style_cache=self.label_style_cache,
         )
 
         # configuration elements initialization
         self.build_order_step_time = QLabel('Step: 0/0', self)
         self.configuration_initialization()
 
-        self.build_order_resources = MultiQLabelDisplay(
-            font_police=layout.font_police,
-            font_size=layout.font_size,
-            image_height=layout.build_order.image_height,
-            border_size=layout.border_size,
-            vertical_spacing=layout.vertical_spacing,
-            color_default=layout.color_default,
-            game_pictures_folder=self.directory_game_pictures,
-            common_pictures_folder=self.directory_common_pictures,
-        )
-
-        color_row_emphasis = layout.build_order.color_row_emphasis if self.settings.timer_available else [0, 0, 0]
-        extra_emphasis_height = layout.build_order.extra_emphasis_height if self.settings.timer_available else 0
-        self.build_order_notes = MultiQLabelDisplay(
-            font_police=layout.font_police,
-            font_size=layout.font_size,
-            image_height=layout.build_order.image_height,
-            extra_emphasis_height=extra_emphasis_height,
-            border_size=layout.border_size,
-            vertical_spacing=layout.vertical_spacing,
-            color_default=layout.color_default,
-            color_row_emphasis=color_row_emphasis,
-            game_pictures_folder=self.directory_game_pictures,
-            common_pictures_folder=self.directory_common_pictures,
+        self.asset_index = AssetIndex(  # images of the build orders, found without file system access
+            [self.directory_game_pictures, self.directory_common_pictures],
+            case_insensitive=layout.build_order.image_case_insensitive,
         )
+        self.pixmap_cache = PixmapCache(layout.build_order.image_cache_mb * 1024 * 1024)  # scaled images
+
+        # rows painted in a single widget, or one QLabel per element
+        self.rows_display = PaintedMultiLabelDisplay if layout.build_order.painted_rows else MultiQLabelDisplay
+        self.build_order_resources, self.build_order_notes = self.create_build_order_displays()
+
+        # neighbouring steps prepared in advance (in idle time), swapped with the current displays when selected
+        self.build_order_displays_key = None  # render key of the current displays, see 'get_build_order_render_key'
+        self.build_order_prefetch = dict()  # prepared displays as {render key: (resources, notes, columns, resources)}
+        self.build_order_prefetch_candidates = []  # states to prepare, see 'get_build_order_prefetch_candidates'
+        self.build_order_spare_displays = []  # unused displays as (resources, notes), reused for the next preparations
+        self.build_order_prefetch_timer = QTimer(self)  # preparation when no other event is pending
+        self.build_order_prefetch_timer.setSingleShot(True)
+        self.build_order_prefetch_timer.setInterval(0)
+        self.build_order_prefetch_timer.timeout.connect(self.prefetch_build_order_step)
+        self.build_order_prefetch_hits = 0  # number of panel updates using prepared displays
+        self.build_order_prefetch_misses = 0  # number of panel updates building the displays
+
+        # build order panel rendered at most once per event loop iteration, see 'request_build_order_render'
+        self.build_order_render_rebuild = False  # True if the build order displays must be updated
+        self.build_order_render_layout = False  # True if the build order panel must be laid out
+        self.build_order_render_timer = QTimer(self)  # render after the pending events (e.g. several hotkeys)
+        self.build_order_render_timer.setSingleShot(True)
+        self.build_order_render_timer.setInterval(0)
+        self.build_order_render_timer.timeout.connect(self.render_build_order)
+        self.build_order_render_requests = 0  # number of requested renders
+        self.build_order_renders = 0  # number of renders performed for these requests
 
         # build order timer elements
         self.build_order_timer: Dict[
@@ -252,11 +294,17 @@ class RTSGameOverlay(QMainWindow):
             'last_time_int': 0,  # last value for 'time_int' [sec]
             'time_sec_init': 0.0,  # value of 'time_sec' when run started [sec]
             'last_time_label': '',  # last string value for the time label
-            'steps': [],  # steps adapted for the timer feature
+            'steps': None,  # timeline of the steps for the timer feature (None if not available)
             'steps_ids': [],  # IDs to select the current steps from 'steps'
             'last_steps_ids': [],  # last value for 'steps_ids'
         }
 
+        # running build order timer updated at its next second (steps only changing on a new second)
+        self.build_order_timer_engine = QTimer(self)
+        self.build_order_timer_engine.setSingleShot(True)
+        self.build_order_timer_engine.setTimerType(Qt.PreciseTimer)
+        self.build_order_timer_engine.timeout.connect(self.timer_build_order_call)
+
         # window color and position
         self.upper_left_position = [0, 0]
         self.upper_right_position = [0, 0]
@@ -390,7 +438,9 @@ class RTSGameOverlay(QMainWindow):
                 ['switch_timer_manual', 'start_timer', 'stop_timer', 'start_stop_timer', 'reset_timer']
             )
 
-        self.keyboard_mouse = KeyboardMouseManagement(print_unset=False)
+        # hotkeys processed in the GUI thread as soon as received (instead of polling their flags on a timer)
+        self.hotkey_input_received.connect(self.process_hotkeys, Qt.QueuedConnection)
+        self.keyboard_mouse = KeyboardMouseManagement(print_unset=False, input_callback=self.hotkey_input_received.emit)
 
         self.mouse_buttons_dict = dict()  # dictionary as {keyboard_name: mouse_button_name}
         self.set_keyboard_mouse()
@@ -450,9 +500,22 @@ class RTSGameOverlay(QMainWindow):
         self.selected_build_order_name = None
         self.selected_build_order_step_count = 0
         self.selected_build_order_step_id = -1
+        self.selected_build_order_path = None
+        self.selected_build_order_display = None
+        self.build_order_search_request_id += 1  # outdate the running search
+        self.build_order_search_pending = False
         self.build_orders = get_build_orders(
-            self.directory_build_orders, self.check_valid_build_order, category_name=self.build_order_category_name
+            self.directory_build_orders,
+            self.check_valid_build_order,
+            category_name=self.build_order_category_name,
+            cache_file=self.get_build_orders_cache_file(),
+            workers=self.settings.build_order_loading.workers,
+            sort_key=self.build_order_sorting,
+            lazy=self.settings.build_order_loading.lazy,
+            resident_count=self.settings.build_order_loading.resident_count,
         )
+        self.build_order_search_engine = BuildOrderSearch(self.build_orders)
+        self.start_build_orders_watcher()
 
         # move window
         self.left_click_start = False  # left click pressing started
@@ -474,27 +537,34 @@ class RTSGameOverlay(QMainWindow):
         self.configuration_initialization()
 
         # display build order
-        self.build_order_resources.update_settings(
-            font_police=layout.font_police,
-            font_size=layout.font_size,
-            image_height=layout.build_order.image_height,
-            border_size=layout.border_size,
-            vertical_spacing=layout.vertical_spacing,
-            color_default=layout.color_default,
-        )
-
+        self.asset_index.set_case_insensitive(layout.build_order.image_case_insensitive)
+        self.asset_index.refresh()  # images possibly added since the last scan
+        self.pixmap_cache.clear()  # images height possibly changed by 'settings_scaling'
+        self.pixmap_cache.set_max_bytes(layout.build_order.image_cache_mb * 1024 * 1024)
+        self.discard_build_order_prefetch()  # prepared with the previous settings
         color_row_emphasis = layout.build_order.color_row_emphasis if self.settings.timer_available else [0, 0, 0]
         extra_emphasis_height = layout.build_order.extra_emphasis_height if self.settings.timer_available else 0
-        self.build_order_notes.update_settings(
-            font_police=layout.font_police,
-            font_size=layout.font_size,
-            image_height=layout.build_order.image_height,
-            extra_emphasis_height=extra_emphasis_height,
-            border_size=layout.border_size,
-            vertical_spacing=layout.vertical_spacing,
-            color_default=layout.color_default,
-            color_row_emphasis=color_row_emphasis,
-        )
+        for build_order_resources, build_order_notes in [
+            (self.build_order_resources, self.build_order_notes)
+        ] + self.build_order_spare_displays:
+            build_order_resources.update_settings(
+                font_police=layout.font_police,
+                font_size=layout.font_size,
+                image_height=layout.build_order.image_height,
+                border_size=layout.border_size,
+                vertical_spacing=layout.vertical_spacing,
+                color_default=layout.color_default,
+            )
+            build_order_notes.update_settings(
+                font_police=layout.font_police,
+                font_size=layout.font_size,
+                image_height=layout.build_order.image_height,
+                extra_emphasis_height=extra_emphasis_height,
+                border_size=layout.border_size,
+                vertical_spacing=layout.vertical_spacing,
+                color_default=layout.color_default,
+                color_row_emphasis=color_row_emphasis,
+            )
 
         self.deactivate_timer(self.build_order_timer['use_timer'])  # build order timer elements
 
@@ -572,6 +642,131 @@ class RTSGameOverlay(QMainWindow):
         # re-initialization done
         self.init_done = True
 
+    def get_build_orders_cache_file(self) -> Union[str, None]:
+        """Get the file used to cache the validated build orders.
+
+        Returns
+        -------
+        Cache file, None if the cache is deactivated.
+        """
+        return self.build_orders_cache_file if self.settings.build_order_loading.use_cache else None
+
+    def start_build_orders_watcher(self):
+        """Start watching the build order files (replacing the previous watcher), if requested in the settings."""
+        if self.build_orders_watcher is not None:
+            self.build_orders_watcher.stop()
+            self.build_orders_watcher = None
+
+        loading = self.settings.build_order_loading
+        if loading.watch_files:
+            self.build_orders_watcher = BuildOrderWatcher(
+                self.directory_build_orders,
+                self.build_order_files_changed,
+                parent=self,
+                polling=loading.watch_polling,
+                polling_ms=loading.watch_polling_ms,
+            )
+
+    def build_order_files_changed(self, changed_files: list, deleted_files: list):
+        """Update the build orders after a change of their files (only reading the changed ones).
+
+        Parameters
+        ----------
+        changed_files    Added or modified build order files.
+        deleted_files    Deleted build order files.
+        """
+        build_orders = self.build_orders
+        self.build_order_search_request_id += 1  # outdate the running search (library modified)
+
+        def add_build_order_file(build_order_file: str):
+            """Read a build order file and add it to the library.
+
+            Parameters
+            ----------
+            build_order_file    JSON file of the build order.
+            """
+            data, error_msg = load_build_order_file(
+                build_order_file,
+                self.check_valid_build_order,
+                self.build_order_category_name,
+                metadata_only=build_orders.loader is not None,
+            )
+            if data is None:  # not valid
+                print(error_msg)
+            elif build_orders.add(data, build_order_file) < 0:  # already added this build order
+                name = data['name']
+                print(f'Build order \'{name}\' from \'{build_order_file}\' already added, skipping it.')
+
+        with self.build_order_search_engine.lock:  # no search during the modification
+            removed_keys = []
+            for build_order_file in deleted_files + changed_files:
+                build_orders.discard_shadowed_path(build_order_file)
+                handle = build_orders.find_path(build_order_file)
+                if handle >= 0:
+                    removed_keys.append(build_orders.get_key(build_orders.get(handle)))
+                    build_orders.remove(handle)
+
+            for build_order_file in changed_files:
+                add_build_order_file(build_order_file)
+
+            # build orders skipped as duplicates of a removed one (and not replaced): take its place
+            restored_files = [
+                path
+                for key in removed_keys
+                if build_orders.find(*key) < 0
+                for path in build_orders.pop_shadowed_paths(key)
+            ]
+            for build_order_file in restored_files:
+                add_build_order_file(build_order_file)
+
+        print(
+            f'Build orders updated ({len(changed_files)} changed, {len(deleted_files)} deleted, '
+            f'{len(restored_files)} restored files).'
+        )
+
+        # selected build order modified: use its new version (kept as it is if deleted or not valid anymore)
+        if (self.selected_build_order_path is not None) and (self.selected_build_order_path in changed_files):
+            handle = build_orders.find_path(self.selected_build_order_path)
+            if handle >= 0:
+                with self.build_order_search_engine.lock:
+                    data, error_msg = build_orders.get_full(handle)
+                if data is None:  # steps not valid (lazy loading)
+                    print(error_msg)
+                else:
+                    self.update_selected_build_order(data)
+
+        self.update_build_order_display()  # update the search results
+
+    def update_selected_build_order(self, data: dict):
+        """Replace the selected build order by a new version, keeping the current step and timer.
+
+        Parameters
+        ----------
+        data    New version of the selected build order data.
+        """
+        self.selected_build_order = data
+        self.selected_build_order_name = data['name']
+        self.selected_build_order_display = self.get_build_order_display(data)
+        self.discard_build_order_prefetch()
+        self.selected_build_order_step_count = len(data['build_order'])
+        self.selected_build_order_step_id = min(
+            self.selected_build_order_step_id, self.selected_build_order_step_count - 1
+        )
+
+        if self.build_order_timer['available']:
+            self.build_order_timer['steps'] = get_build_order_timeline(data)
+            if not self.build_order_timer['steps']:  # non valid timer BO
+                self.deactivate_timer()
+            else:
+                self.build_order_timer['steps_ids'] = self.build_order_timer['steps'].get_step_ids(
+                    self.build_order_timer['time_int'], self.build_order_timer['step_starting_flag']
+                )
+                self.build_order_timer['last_steps_ids'] = []
+                self.timer_build_order_call()  # steps updated now if the timer is running
+
+        if self.selected_panel == PanelID.BUILD_ORDER:
+            self.update_build_order()
+
     def update_build_order_start_stop_timer_icon(self):
         """Update the icon for 'build_order_start_stop_timer'."""
         images = self.images
@@ -599,9 +794,10 @@ class RTSGameOverlay(QMainWindow):
         self.build_order_timer['last_time_int'] = 0
         self.build_order_timer['time_sec_init'] = 0.0
         self.build_order_timer['last_time_label'] = ''
-        self.build_order_timer['steps'] = []
+        self.build_order_timer['steps'] = None
         self.build_order_timer['steps_ids'] = []
         self.build_order_timer['last_steps_ids'] = []
+        self.build_order_timer_engine.stop()
 
     def screen_position_safety(self):
         """Check that the upper left/right corner is inside the screen."""
@@ -725,7 +921,7 @@ class RTSGameOverlay(QMainWindow):
         )
         self.build_order_search.setStyleSheet(qwidget_color_default_str)
         self.build_order_search.setFont(QFont(layout.font_police, layout.font_size))
-        self.build_order_search.setToolTip('build order keywords, separated by spaces')
+        self.build_order_search.setToolTip("build order keywords, separated by spaces ('note:' to search in the notes)")
 
         # indicating the build orders selection
         self.build_order_selection.clear()
@@ -824,6 +1020,7 @@ class RTSGameOverlay(QMainWindow):
             self.config_panel_layout()
             self.build_order_search.setFocus()
         elif self.selected_panel == PanelID.BUILD_ORDER:  # Build Order
+            self.timer_build_order_call()  # running timer at the current time
             self.update_build_order()
 
         # show the main window
@@ -853,6 +1050,18 @@ class RTSGameOverlay(QMainWindow):
         """Quit the application."""
         self.stop_application = True
         print('Stopping the application.')
+        print(f'Images cache: {self.pixmap_cache.get_stats()}.')
+        print(
+            f'Steps prefetch: {self.build_order_prefetch_hits} prepared, '
+            f'{self.build_order_prefetch_misses} built when displayed.'
+        )
+        print(
+            f'Build order renders: {self.build_order_renders} for {self.build_order_render_requests} requests '
+            f'({self.build_order_render_requests - self.build_order_renders} avoided).'
+        )
+        self.build_order_prefetch_timer.stop()
+        self.build_order_render_timer.stop()
+        self.build_order_timer_engine.stop()
 
         self.hide()  # hide the application while closing it
         self.config_quit_button.hide()
@@ -876,6 +1085,16 @@ class RTSGameOverlay(QMainWindow):
             self.panel_config_hotkeys.close()
             self.panel_config_hotkeys = None
 
+        if self.build_orders_watcher is not None:
+            self.build_orders_watcher.stop()
+            self.build_orders_watcher = None
+
+        self.build_order_search_timer.stop()
+        if self.build_order_search_executor is not None:
+            self.build_order_search_request_id += 1  # cancel the running search
+            self.build_order_search_executor.shutdown(wait=False)
+            self.build_order_search_executor = None
+
         self.close()
         QApplication.quit()
 
@@ -964,8 +1183,8 @@ class RTSGameOverlay(QMainWindow):
 
         return False  # not set
 
-    def timer_build_order_call(self):
-        """Function called on a timer for build order timer update."""
+    def update_build_order_timer_time(self):
+        """Update the time of the build order timer from the elapsed time (only if running)."""
         if self.build_order_timer['run_timer']:
             elapsed_time = time.time() - self.build_order_timer['absolute_time_init']
             if hasattr(self.settings, 'timer_speed_factor'):  # in case timer value is not the same as real-time
@@ -973,6 +1192,25 @@ class RTSGameOverlay(QMainWindow):
             self.build_order_timer['time_sec'] = self.build_order_timer['time_sec_init'] + elapsed_time
             self.build_order_timer['time_int'] = int(floor(self.build_order_timer['time_sec']))
 
+    def schedule_build_order_timer(self):
+        """Arm the build order timer update at its next second (timer stopped if not running)."""
+        if not self.build_order_timer['run_timer']:
+            self.build_order_timer_engine.stop()
+            return
+
+        speed_factor = self.settings.timer_speed_factor if hasattr(self.settings, 'timer_speed_factor') else 1.0
+        time_sec = (
+            self.build_order_timer['time_sec_init']
+            + (time.time() - self.build_order_timer['absolute_time_init']) * speed_factor
+        )
+        next_second_delay = (floor(time_sec) + 1 - time_sec) / speed_factor  # real time to the next second [sec]
+        self.build_order_timer_engine.start(max(1, ceil(1000.0 * next_second_delay)))
+
+    def timer_build_order_call(self):
+        """Function called on a timer for build order timer update (at each new second of the running timer)."""
+        if self.build_order_timer['run_timer']:
+            self.update_build_order_timer_time()
+
             if self.selected_panel == PanelID.BUILD_ORDER:  # update build order panel display
                 self.update_build_order_time_label()
 
@@ -983,20 +1221,20 @@ class RTSGameOverlay(QMainWindow):
                     self.build_order_timer['last_time_int'] = self.build_order_timer['time_int']
 
                     # compute current note ID
-                    self.build_order_timer['steps_ids'] = get_build_order_timer_step_ids(
-                        self.build_order_timer['steps'],
-                        self.build_order_timer['time_int'],
-                        self.build_order_timer['step_starting_flag'],
+                    self.build_order_timer['steps_ids'] = self.build_order_timer['steps'].get_step_ids(
+                        self.build_order_timer['time_int'], self.build_order_timer['step_starting_flag']
                     )
 
                     # note ID was updated
                     if self.build_order_timer['last_steps_ids'] != self.build_order_timer['steps_ids']:
                         self.build_order_timer['last_steps_ids'] = self.build_order_timer['steps_ids']
 
-                        self.update_build_order()
+                        self.request_build_order_render()
+
+        self.schedule_build_order_timer()  # next update
 
     def timer_mouse_keyboard_call(self):
-        """Function called on a timer for mouse and keyboard inputs."""
+        """Function called on a timer for mouse inputs (hovering), hotkeys handled by 'process_hotkeys'."""
         self.update_mouse()  # update the mouse position
 
         # next panel button
@@ -1005,12 +1243,17 @@ class RTSGameOverlay(QMainWindow):
         # hide panel button
         self.hide_panel_button.hovering_show(self.is_mouse_in_roi_widget)
 
-        # build order hovering
-        if len(self.valid_build_orders) > 1:  # more than one build order for hovering color
-            # get build order ID for hovering
-            build_order_ids = self.build_order_selection.get_mouse_label_id(
-                self.mouse_x - self.x(), self.mouse_y - self.y()
+        # build order hovering (only checked when the mouse moved or the list changed)
+        hovering_check = (self.mouse_x - self.x(), self.mouse_y - self.y(), self.build_order_selection.layout_id)
+        if (len(self.valid_build_orders) > 1) and (hovering_check != self.build_order_hovering_check):
+            # list rows updated (all their colors to set) or only mouse moved
+            rows_updated = (self.build_order_hovering_check is None) or (
+                hovering_check[2] != self.build_order_hovering_check[2]
             )
+            self.build_order_hovering_check = hovering_check
+
+            # get build order ID for hovering
+            build_order_ids = self.build_order_selection.get_mouse_label_id(hovering_check[0], hovering_check[1])
             hovering_id = (
                 build_order_ids[0]
                 if (
@@ -1021,9 +1264,17 @@ class RTSGameOverlay(QMainWindow):
                 else -1
             )
 
-            # loop on the build order suggestions
-            for row_id in range(len(self.valid_build_orders)):
-                if row_id != self.build_order_selection_id:
+            # build order suggestions to color: all of them, or the previously and newly hovered ones
+            if rows_updated:
+                row_ids = range(len(self.valid_build_orders))
+            elif hovering_id != self.build_order_hovering_id:
+                row_ids = [self.build_order_hovering_id, hovering_id]
+            else:
+                row_ids = []
+            self.build_order_hovering_id = hovering_id
+
+            for row_id in row_ids:
+                if (0 <= row_id < len(self.valid_build_orders)) and (row_id != self.build_order_selection_id):
                     self.build_order_selection.set_color_label(
                         row_id,
                         0,
@@ -1034,7 +1285,25 @@ class RTSGameOverlay(QMainWindow):
                         ),
                     )
 
-        # keyboard action flags
+        if self.is_mouse_in_window():
+            if self.selected_panel == PanelID.CONFIG:  # configuration specific buttons
+                self.config_quit_button.hovering_show(self.is_mouse_in_roi_widget)
+                self.config_save_button.hovering_show(self.is_mouse_in_roi_widget)
+                self.config_reload_button.hovering_show(self.is_mouse_in_roi_widget)
+                self.config_hotkey_button.hovering_show(self.is_mouse_in_roi_widget)
+                self.open_build_order_button.hovering_show(self.is_mouse_in_roi_widget)
+
+            elif self.selected_panel == PanelID.BUILD_ORDER:  # build order specific buttons
+                self.build_order_previous_button.hovering_show(self.is_mouse_in_roi_widget)
+                self.build_order_next_button.hovering_show(self.is_mouse_in_roi_widget)
+                if self.build_order_timer['available'] and self.build_order_timer['steps']:
+                    self.build_order_switch_timer_manual.hovering_show(self.is_mouse_in_roi_widget)
+                    if self.build_order_timer['use_timer']:
+                        self.build_order_start_stop_timer.hovering_show(self.is_mouse_in_roi_widget)
+                        self.build_order_reset_timer.hovering_show(self.is_mouse_in_roi_widget)
+
+    def process_hotkeys(self):
+        """Apply the actions of the global hotkeys and mouse buttons (called when one of their flags is set)."""
         if (self.panel_config_hotkeys is None) or (not self.panel_config_hotkeys.isVisible()):
 
             bo_panel_open = self.selected_panel == PanelID.BUILD_ORDER  # is build order panel open
@@ -1087,23 +1356,6 @@ class RTSGameOverlay(QMainWindow):
                     if apply_timer_update:
                         self.reset_build_order_timer()
 
-        if self.is_mouse_in_window():
-            if self.selected_panel == PanelID.CONFIG:  # configuration specific buttons
-                self.config_quit_button.hovering_show(self.is_mouse_in_roi_widget)
-                self.config_save_button.hovering_show(self.is_mouse_in_roi_widget)
-                self.config_reload_button.hovering_show(self.is_mouse_in_roi_widget)
-                self.config_hotkey_button.hovering_show(self.is_mouse_in_roi_widget)
-                self.open_build_order_button.hovering_show(self.is_mouse_in_roi_widget)
-
-            elif self.selected_panel == PanelID.BUILD_ORDER:  # build order specific buttons
-                self.build_order_previous_button.hovering_show(self.is_mouse_in_roi_widget)
-                self.build_order_next_button.hovering_show(self.is_mouse_in_roi_widget)
-                if self.build_order_timer['available'] and self.build_order_timer['steps']:
-                    self.build_order_switch_timer_manual.hovering_show(self.is_mouse_in_roi_widget)
-                    if self.build_order_timer['use_timer']:
-                        self.build_order_start_stop_timer.hovering_show(self.is_mouse_in_roi_widget)
-                        self.build_order_reset_timer.hovering_show(self.is_mouse_in_roi_widget)
-
     def show_hide(self):
         """Show or hide the windows."""
         self.hidden = not self.hidden  # change the hidden state
@@ -1292,34 +1544,38 @@ class RTSGameOverlay(QMainWindow):
         if self.selected_panel == PanelID.BUILD_ORDER:
 
             if self.build_order_timer['use_timer']:  # update timer
+                self.update_build_order_timer_time()  # time of the running timer since its last update
                 self.build_order_timer['time_sec'] -= 1.0
                 self.build_order_timer['absolute_time_init'] += 1.0  # like the timer was started 1 sec later
                 self.build_order_timer['time_int'] = int(floor(self.build_order_timer['time_sec']))
                 self.update_build_order_time_label()
+                self.timer_build_order_call()  # steps and next update of the running timer
             else:  # update step
                 old_selected_build_order_step_id = self.selected_build_order_step_id
                 self.selected_build_order_step_id = max(
                     0, min(self.selected_build_order_step_id - 1, self.selected_build_order_step_count - 1)
                 )
                 if old_selected_build_order_step_id != self.selected_build_order_step_id:
-                    self.update_build_order()  # update the rendering
+                    self.request_build_order_render()  # update the rendering
 
     def build_order_next_step(self):
         """Select the next step of the build order (or update to +1 sec for timer feature)."""
         if self.selected_panel == PanelID.BUILD_ORDER:
 
             if self.build_order_timer['use_timer']:  # update timer
+                self.update_build_order_timer_time()  # time of the running timer since its last update
                 self.build_order_timer['time_sec'] += 1.0
                 self.build_order_timer['absolute_time_init'] -= 1.0  # like the timer was started 1 sec earlier
                 self.build_order_timer['time_int'] = int(floor(self.build_order_timer['time_sec']))
                 self.update_build_order_time_label()
+                self.timer_build_order_call()  # steps and next update of the running timer
             else:  # update step
                 old_selected_build_order_step_id = self.selected_build_order_step_id
                 self.selected_build_order_step_id = max(
                     0, min(self.selected_build_order_step_id + 1, self.selected_build_order_step_count - 1)
                 )
                 if old_selected_build_order_step_id != self.selected_build_order_step_id:
-                    self.update_build_order()  # update the rendering
+                    self.request_build_order_render()  # update the rendering
 
     def select_build_order_id(self, build_order_id: int = -1) -> bool:
         """Select build order ID.
@@ -1332,6 +1588,9 @@ class RTSGameOverlay(QMainWindow):
         -------
         True if valid build order selection.
         """
+        if self.build_order_search_pending:  # search not yet displayed: get its results now
+            self.update_build_order_display()
+
         if len(self.valid_build_orders) >= 1:  # at least one build order
             if build_order_id >= 0:  # build order ID given
                 if 0 <= build_order_id < len(self.valid_build_orders):
@@ -1346,61 +1605,31 @@ class RTSGameOverlay(QMainWindow):
         return False
 
     def get_valid_build_orders(self, key_condition: dict = None):
-        """Get the names of the valid build orders (with search bar).
+        """Get the handles of the valid build orders (with search bar).
 
         Parameters
         ----------
         key_condition   Dictionary with the keys to look for and their value (to consider as valid), None to skip it.
         """
-        self.valid_build_orders = []  # reset the list
-        build_order_search_string = self.build_order_search.text()
-
-        if build_order_search_string == '':  # no text added
-            return
-
-        # only keep build orders with valid key conditions
-        if key_condition is not None:
-            valid_key_build_orders = [
-                build_order
-                for build_order in self.build_orders
-                if check_build_order_key_values(build_order, key_condition)
-            ]
-        else:
-            valid_key_build_orders = self.build_orders
-
         configuration = self.settings.layout.configuration
-        if build_order_search_string == ' ':  # special case: select any build order, up to the limit count
-            for count, build_order in enumerate(valid_key_build_orders):
-                if count >= configuration.bo_list_max_count:
-                    break
-                self.valid_build_orders.append(build_order['name'])
-
-        elif configuration.bo_list_fuzz_search:  # do a fuzzy search for matching build orders
-            self.valid_build_orders = [
-                match[0]
-                for match in process.extractBests(
-                    build_order_search_string,
-                    [build_order['name'] for build_order in valid_key_build_orders],
-                    score_cutoff=configuration.bo_list_fuzz_score_cutoff,
-                    limit=configuration.bo_list_max_count,
-                )
-            ]
-
-        else:  # search by splitting the words
-            search_split = build_order_search_string.split(' ')  # split according to spaces
+        self.set_valid_build_orders(
+            self.build_order_search_engine.search(
+                self.build_order_search.text(),
+                key_condition=key_condition,
+                fuzz_search=configuration.bo_list_fuzz_search,
+                score_cutoff=configuration.bo_list_fuzz_score_cutoff,
+                limit=configuration.bo_list_max_count,
+            )
+        )
 
-            for build_order in self.build_orders:
-                if len(self.valid_build_orders) >= configuration.bo_list_max_count:
-                    break
+    def set_valid_build_orders(self, valid_build_orders: list):
+        """Set the valid build orders (search results).
 
-                valid_name = True  # assumes valid name
-                build_order_name = build_order['name']
-                for search_part in search_split:  # loop on the sub-parts to find
-                    if search_part.lower() not in build_order_name.lower():
-                        valid_name = False
-                        break
-                if valid_name:  # add valid build order
-                    self.valid_build_orders.append(build_order_name)
+        Parameters
+        ----------
+        valid_build_orders    Handles of the valid build orders.
+        """
+        self.valid_build_orders = valid_build_orders
 
         # check all elements are unique
         assert len(set(self.valid_build_orders)) == len(self.valid_build_orders)
@@ -1416,7 +1645,91 @@ class RTSGameOverlay(QMainWindow):
         ----------
         key_condition   Dictionary with the keys to look for and their value (to consider as valid), None to skip it.
         """
+        self.build_order_search_request_id += 1  # outdate the running search
+        if self.build_order_search_async_call:
+            self.start_build_order_search(key_condition)
+            return
+
+        self.build_order_search_timer.stop()
+        self.build_order_search_pending = False
         self.get_valid_build_orders(key_condition)
+        self.display_build_order_search()
+
+    def start_build_order_search(self, key_condition: dict = None):
+        """Start the search of the valid build orders in another thread (see 'build_order_search_finished').
+
+        Parameters
+        ----------
+        key_condition   Dictionary with the keys to look for and their value (to consider as valid), None to skip it.
+        """
+        request_id = self.build_order_search_request_id
+        search_engine = self.build_order_search_engine
+        configuration = self.settings.layout.configuration
+        search_parameters = {
+            'search_text': self.build_order_search.text(),
+            'key_condition': key_condition,
+            'fuzz_search': configuration.bo_list_fuzz_search,
+            'score_cutoff': configuration.bo_list_fuzz_score_cutoff,
+            'limit': configuration.bo_list_max_count,
+        }
+        self.build_order_search_pending = True
+
+        def search_task():
+            """Search task, cancelled as soon as another search is requested."""
+            try:
+                valid_build_orders = search_engine.search(
+                    **search_parameters, cancel_check=lambda: request_id != self.build_order_search_request_id
+                )
+            except Exception as e:
+                print(f'Error while searching the build orders: {e}')
+                return
+            if valid_build_orders is not None:
+                self.build_order_search_done.emit(request_id, valid_build_orders)  # queued to the GUI thread
+
+        if self.build_order_search_executor is None:
+            self.build_order_search_executor = ThreadPoolExecutor(max_workers=1)
+        self.build_order_search_executor.submit(search_task)
+
+    def build_order_search_finished(self, request_id: int, valid_build_orders: list):
+        """Display the results of an asynchronous build order search.
+
+        Parameters
+        ----------
+        request_id            ID of the search request.
+        valid_build_orders    Handles of the valid build orders.
+        """
+        if (request_id != self.build_order_search_request_id) or (not self.build_order_search_pending):
+            return  # outdated search
+
+        self.build_order_search_pending = False
+        self.set_valid_build_orders(valid_build_orders)
+        self.display_build_order_search()
+        self.config_panel_layout()
+
+    def build_order_search_changed(self):
+        """Search the build orders after a change of the search bar (after a delay if asynchronous search)."""
+        configuration = self.settings.layout.configuration
+        if configuration.bo_list_async_search and (self.build_order_search.text().strip() != ''):
+            self.build_order_search_pending = True
+            self.build_order_search_timer.start(max(0, configuration.bo_list_search_delay_ms))
+        else:  # no search needed for an empty text, so no delay
+            self.update_build_order_display()
+
+    def update_build_order_display_async(self):
+        """Update the build order search matching display, with the search done in another thread."""
+        self.build_order_search_async_call = True
+        try:
+            self.update_build_order_display()
+        finally:
+            self.build_order_search_async_call = False
+
+    def display_build_order_search(self, error_msg: str = None):
+        """Display the valid build orders in the selection list.
+
+        Parameters
+        ----------
+        error_msg    Error found when selecting a build order (displayed below the list), None if no error.
+        """
         valid_count = len(self.valid_build_orders)
         self.build_order_selection.clear()
 
@@ -1424,10 +1737,14 @@ class RTSGameOverlay(QMainWindow):
             assert 0 <= self.build_order_selection_id < valid_count
 
             for i in range(valid_count):
+                handle = self.valid_build_orders[i]
+                name = self.build_orders.get(handle)['name']
+                if self.build_orders.get_error(handle):  # steps found as not valid (lazy loading)
+                    name += ' (not valid)'
                 if i == self.build_order_selection_id:
                     self.build_order_selection.add_row_from_picture_line(
                         parent=self,
-                        line=self.valid_build_orders[i],
+                        line=name,
                         labels_settings=[
                             QLabelSettings(
                                 text_bold=True, text_color=self.settings.layout.configuration.selected_build_order_color
@@ -1435,37 +1752,42 @@ class RTSGameOverlay(QMainWindow):
                         ],
                     )
                 else:
-                    self.build_order_selection.add_row_from_picture_line(parent=self, line=self.valid_build_orders[i])
+                    self.build_order_selection.add_row_from_picture_line(parent=self, line=name)
         else:
             if self.selected_build_order is None:
                 text = 'Select build order with search bar.' if (self.build_order_search.text() == '') else 'No valid build order found with these keywords.'
                 self.build_order_selection.add_row_from_picture_line(parent=self, line=text)
 
-    def select_build_order(self, key_condition: dict = None):
-        """Select the requested valid build order.
+        if error_msg is not None:
+            self.build_order_selection.add_row_from_picture_line(parent=self, line=error_msg)
+
+    def select_build_order(self):
+        """Select the requested valid build order."""
+        if self.build_order_search_pending:  # search not yet displayed: get its results now
+            self.update_build_order_display()
 
-        Parameters
-        ----------
-        key_condition   Dictionary with the keys to look for and their value (to consider as valid), None to skip it.
-        """
         self.build_order_selection.clear()
 
         if len(self.valid_build_orders) > 0:  # valid
             assert 0 <= self.build_order_selection_id < len(self.valid_build_orders)
-            self.selected_build_order_name = self.valid_build_orders[self.build_order_selection_id]
-
-            self.selected_build_order = None
-            for build_order in self.build_orders:
-                if (build_order['name'] == self.selected_build_order_name) and check_build_order_key_values(
-                    build_order, key_condition
-                ):
-                    self.selected_build_order = build_order
-                    break
-            assert self.selected_build_order is not None
+            selected_handle = self.valid_build_orders[self.build_order_selection_id]
+            with self.build_order_search_engine.lock:  # steps possibly read by a notes search in progress
+                selected_build_order, error_msg = self.build_orders.get_full(selected_handle)
+            if selected_build_order is None:  # not valid steps (lazy loading): previous selection kept
+                print(error_msg)
+                self.display_build_order_search(error_msg)
+                self.build_order_search.clearFocus()
+                return
+
+            self.selected_build_order = selected_build_order
+            self.selected_build_order_name = self.selected_build_order['name']
+            self.selected_build_order_path = self.build_orders.get_path(selected_handle)
 
             self.selected_build_order_step_id = 0
             self.selected_build_order_step_count = len(self.selected_build_order['build_order'])
             assert self.selected_build_order_step_count > 0
+            self.selected_build_order_display = self.get_build_order_display(self.selected_build_order)
+            self.discard_build_order_prefetch()
 
             self.build_order_search.setText('')
             self.build_order_selection.add_row_from_picture_line(
@@ -1480,7 +1802,7 @@ class RTSGameOverlay(QMainWindow):
 
             # obtain build order time notes
             if self.build_order_timer['available']:
-                self.build_order_timer['steps'] = get_build_order_timer_steps(self.selected_build_order)
+                self.build_order_timer['steps'] = get_build_order_timeline(self.selected_build_order)
                 if not self.build_order_timer['steps']:  # non valid timer BO
                     self.deactivate_timer()
                 else:  # valid timer BO
@@ -1494,6 +1816,9 @@ class RTSGameOverlay(QMainWindow):
             self.selected_build_order_name = None
             self.selected_build_order_step_count = 0
             self.selected_build_order_step_id = -1
+            self.selected_build_order_path = None
+            self.selected_build_order_display = None
+            self.discard_build_order_prefetch()
             self.build_order_selection.clear()
             self.build_order_selection.add_row_from_picture_line(parent=self, line='No valid build order found.')
         self.build_order_search.clearFocus()
@@ -1620,8 +1945,111 @@ class RTSGameOverlay(QMainWindow):
         # update position (in case the size changed)
         self.update_position()
 
+    def create_build_order_displays(self) -> tuple:
+        """Create the displays of the build order resources and notes.
+
+        Returns
+        -------
+        Resources display, notes display.
+        """
+        layout = self.settings.layout
+        build_order_resources = self.rows_display(
+            font_police=layout.font_police,
+            font_size=layout.font_size,
+            image_height=layout.build_order.image_height,
+            border_size=layout.border_size,
+            vertical_spacing=layout.vertical_spacing,
+            color_default=layout.color_default,
+            game_pictures_folder=self.directory_game_pictures,
+            common_pictures_folder=self.directory_common_pictures,
+            asset_index=self.asset_index,
+            pixmap_cache=self.pixmap_cache,
+            style_cache=self.label_style_cache,
+        )
+
+        color_row_emphasis = layout.build_order.color_row_emphasis if self.settings.timer_available else [0, 0, 0]
+        extra_emphasis_height = layout.build_order.extra_emphasis_height if self.settings.timer_available else 0
+        build_order_notes = self.rows_display(
+            font_police=layout.font_police,
+            font_size=layout.font_size,
+            image_height=layout.build_order.image_height,
+            extra_emphasis_height=extra_emphasis_height,
+            border_size=layout.border_size,
+            vertical_spacing=layout.vertical_spacing,
+            color_default=layout.color_default,
+            color_row_emphasis=color_row_emphasis,
+            game_pictures_folder=self.directory_game_pictures,
+            common_pictures_folder=self.directory_common_pictures,
+            asset_index=self.asset_index,
+            pixmap_cache=self.pixmap_cache,
+            style_cache=self.label_style_cache,
+        )
+
+        return build_order_resources, build_order_notes
+
+    def request_build_order_render(self, rebuild: bool = True):
+        """Request a render of the build order panel, performed once after the pending events.
+
+        Parameters
+        ----------
+        rebuild    True to update the build order displays, False to only update the layout.
+        """
+        self.build_order_render_requests += 1
+        if rebuild:
+            self.build_order_render_rebuild = True
+        else:
+            self.build_order_render_layout = True
+        if not self.build_order_render_timer.isActive():
+            self.build_order_render_timer.start()
+
+    def render_build_order(self):
+        """Perform the requested render of the build order panel (if not already done meanwhile)."""
+        if self.selected_panel != PanelID.BUILD_ORDER:  # panel updated when selected again
+            self.build_order_render_rebuild = False
+            self.build_order_render_layout = False
+        elif self.build_order_render_rebuild:
+            self.update_build_order()
+            self.build_order_renders += 1
+        elif self.build_order_render_layout:
+            self.build_order_panel_layout()
+            self.build_order_renders += 1
+
     def update_build_order(self):
         """Update the build order panel."""
+        self.build_order_render_rebuild = False  # pending render request done now
+        render_key = self.get_build_order_render_key(
+            self.selected_build_order_step_id, self.build_order_timer['steps_ids']
+        )
+        prepared = self.build_order_prefetch.pop(render_key, None) if (render_key is not None) else None
+
+        if prepared is not None:  # prepared in advance: swapped with the current displays
+            self.release_build_order_displays()
+            (
+                self.build_order_resources,
+                self.build_order_notes,
+                self.adapt_notes_to_columns,
+                self.show_resources,
+            ) = prepared
+            self.build_order_prefetch_hits += 1
+        else:
+            self.update_build_order_displays()
+            self.build_order_prefetch_misses += 1
+        self.build_order_displays_key = render_key
+
+        # valid build order selected
+        if (self.selected_build_order is not None) and ('build_order' in self.selected_build_order):
+
+            # display selected step
+            if self.build_order_timer['use_timer']:
+                self.update_build_order_time_label()
+            else:
+                self.update_build_order_step_label()
+
+        self.build_order_panel_layout()  # update layout
+        self.schedule_build_order_prefetch()
+
+    def update_build_order_displays(self):
+        """Update the build order resources and notes displays (to specialize for each game)."""
         # clear the elements (also hide them)
         self.build_order_resources.clear()
         self.build_order_notes.clear()
@@ -1636,84 +2064,298 @@ class RTSGameOverlay(QMainWindow):
 
         self.adapt_notes_to_columns = -1  # no column adaptation by default
 
-        # valid build order selected
-        if (self.selected_build_order is not None) and ('build_order' in self.selected_build_order):
+    def get_build_order_render_key(self, step_id: int, steps_ids: list) -> Union[tuple, None]:
+        """Get the key identifying the content of the build order displays.
 
-            # display selected step
-            if self.build_order_timer['use_timer']:
-                self.update_build_order_time_label()
+        Parameters
+        ----------
+        step_id      Selected step ID (manual selection).
+        steps_ids    Selected timer steps IDs (timer selection).
+
+        Returns
+        -------
+        Key of the displays content, None if no build order step to display.
+        """
+        if (self.selected_build_order is None) or ('build_order' not in self.selected_build_order):
+            return None
+        if self.build_order_timer['use_timer'] and self.build_order_timer['steps']:
+            return 'timer', self.build_order_timer['run_timer'], tuple(steps_ids)
+        return 'step', step_id
+
+    def get_build_order_prefetch_candidates(self) -> list:
+        """Get the neighbouring states of the build order panel, to prepare in advance.
+
+        Returns
+        -------
+        List of states as (step ID, timer steps IDs): next and previous steps for the manual selection,
+        steps displayed at the next and previous time boundaries for the timer selection.
+        """
+        if self.get_build_order_render_key(self.selected_build_order_step_id, []) is None:
+            return []
+
+        timer = self.build_order_timer
+        if timer['use_timer'] and timer['steps']:
+            timeline = timer['steps']
+            boundaries = sorted({time_sec + offset for time_sec in timeline.times for offset in (-1, 0, 1)})
+            candidates = []
+            for search_times in (  # closest boundaries first
+                [time_sec for time_sec in boundaries if time_sec > timer['time_int']],
+                [time_sec for time_sec in reversed(boundaries) if time_sec < timer['time_int']],
+            ):
+                for time_sec in search_times:
+                    steps_ids = timeline.get_step_ids(time_sec, timer['step_starting_flag'])
+                    if steps_ids != timer['steps_ids']:
+                        candidates.append((self.selected_build_order_step_id, steps_ids))
+                        break
+            return candidates
+
+        step_id = self.selected_build_order_step_id
+        return [
+            (neighbour_id, timer['steps_ids'])
+            for neighbour_id in (step_id + 1, step_id - 1)
+            if 0 <= neighbour_id < self.selected_build_order_step_count
+        ]
+
+    def schedule_build_order_prefetch(self):
+        """Schedule the preparation of the neighbouring states (discarding the other prepared displays)."""
+        if not self.settings.layout.build_order.prefetch_steps:
+            return
+
+        self.build_order_prefetch_candidates = self.get_build_order_prefetch_candidates()
+        candidate_keys = {
+            self.get_build_order_render_key(step_id, steps_ids)
+            for step_id, steps_ids in self.build_order_prefetch_candidates
+        }
+        for render_key in list(self.build_order_prefetch.keys()):
+            if render_key not in candidate_keys:
+                self.release_build_order_displays(self.build_order_prefetch.pop(render_key)[:2])
+
+        if self.build_order_prefetch_candidates:
+            self.build_order_prefetch_timer.start()
+
+    def prefetch_build_order_step(self):
+        """Prepare the displays of one neighbouring state (called when no other event is pending)."""
+        if self.build_order_render_rebuild:
+            return  # candidates computed again after the pending render
+        while self.build_order_prefetch_candidates:
+            step_id, steps_ids = self.build_order_prefetch_candidates.pop(0)
+            render_key = self.get_build_order_render_key(step_id, steps_ids)
+            if (
+                (render_key is None)
+                or (render_key == self.build_order_displays_key)
+                or (render_key in self.build_order_prefetch)
+            ):
+                continue  # nothing to prepare
+
+            # build the displays of this state (instead of the current ones)
+            current_state = (
+                self.build_order_resources,
+                self.build_order_notes,
+                self.adapt_notes_to_columns,
+                self.show_resources,
+                self.selected_build_order_step_id,
+                self.build_order_timer['steps_ids'],
+            )
+            if self.build_order_spare_displays:
+                self.build_order_resources, self.build_order_notes = self.build_order_spare_displays.pop()
             else:
-                self.update_build_order_step_label()
+                self.build_order_resources, self.build_order_notes = self.create_build_order_displays()
+            self.selected_build_order_step_id = step_id
+            self.build_order_timer['steps_ids'] = list(steps_ids)
+            try:
+                self.update_build_order_displays()
+                self.build_order_prefetch[render_key] = (
+                    self.build_order_resources,
+                    self.build_order_notes,
+                    self.adapt_notes_to_columns,
+                    self.show_resources,
+                )
+            finally:
+                (
+                    self.build_order_resources,
+                    self.build_order_notes,
+                    self.adapt_notes_to_columns,
+                    self.show_resources,
+                    self.selected_build_order_step_id,
+                    self.build_order_timer['steps_ids'],
+                ) = current_state
+
+            if self.build_order_prefetch_candidates:  # next state at the next idle time
+                self.build_order_prefetch_timer.start()
+            return
+
+    def release_build_order_displays(self, displays: tuple = None):
+        """Release build order displays (hidden), kept if prepared for a neighbouring state or reused later.
+
+        Parameters
+        ----------
+        displays    Displays to release as (resources, notes), None for the current ones.
+        """
+        if displays is None:  # current displays: kept as prepared for their state (e.g. previous step)
+            if (self.build_order_displays_key is not None) and (
+                self.build_order_displays_key not in self.build_order_prefetch
+            ):
+                self.build_order_resources.hide()
+                self.build_order_notes.hide()
+                self.build_order_prefetch[self.build_order_displays_key] = (
+                    self.build_order_resources,
+                    self.build_order_notes,
+                    self.adapt_notes_to_columns,
+                    self.show_resources,
+                )
+                return
+            displays = (self.build_order_resources, self.build_order_notes)
 
-    def get_build_order_selected_steps_and_ids(self) -> (list, list):
-        """Get the build order timer steps to display.
+        for display in displays:
+            display.clear()
+        self.build_order_spare_displays.append(displays)
+
+    def discard_build_order_prefetch(self):
+        """Discard the prepared displays (e.g. when the build order or the settings change)."""
+        self.build_order_prefetch_timer.stop()
+        self.build_order_prefetch_candidates = []
+        self.build_order_displays_key = None  # current displays to build again
+        for build_order_resources, build_order_notes, _, _ in self.build_order_prefetch.values():
+            self.release_build_order_displays((build_order_resources, build_order_notes))
+        self.build_order_prefetch.clear()
+
+    def get_resources_line(self, resource_step: dict) -> str:
+        """Get the line displaying the resources of a build order step (to specialize for each game).
+
+        Parameters
+        ----------
+        resource_step    Build order step.
 
         Returns
         -------
-        Step IDs of the output list (see below).
-        List of steps to display.
+        Line with images between @ markers, empty if no resource to display.
         """
+        return ''
 
+    def get_build_order_step_display(self, step: dict) -> dict:
+        """Get the display of a build order step: tokens of its resources and notes lines (see 'get_line_tokens').
+
+        Parameters
+        ----------
+        step    Build order step.
+
+        Returns
+        -------
+        Dictionary with the tokens of the resources line ('resources', None if no resource to display),
+        of the notes lines ('notes') and of the notes lines starting with the step time
+        ('timed_notes', None if no time for this step).
+        """
+        spacing = ' ' * self.settings.layout.build_order.resource_spacing  # space between the elements
+        get_line_tokens = self.build_order_notes.get_line_tokens
+
+        step_display = {
+            'resources': self.build_order_resources.get_line_tokens(self.get_resources_line(step)),
+            'notes': [get_line_tokens(note) for note in step['notes']],
+            'timed_notes': None,
+        }
+        if 'time' in step:
+            step_display['timed_notes'] = [
+                get_line_tokens((str(step['time']) if (note_id == 0) else ' ') + '@' + spacing + '@' + note)
+                for note_id, note in enumerate(step['notes'])
+            ]
+        return step_display
+
+    def get_build_order_display(self, data: dict) -> list:
+        """Get the display of all the steps of a build order, computed once when selecting it
+        (the steps are then displayed without parsing their lines nor looking for their images).
+
+        Parameters
+        ----------
+        data    Build order data.
+
+        Returns
+        -------
+        Display of each step, see 'get_build_order_step_display'.
+        """
+        return [self.get_build_order_step_display(step) for step in data['build_order']]
+
+    def get_build_order_selected_steps_display(self) -> (list, list):
+        """Get the display of the build order steps to show.
+
+        Returns
+        -------
+        List of steps displays to show (see 'get_build_order_step_display').
+        Step IDs of the output list (the last one is used to display the resources).
+        """
+        build_order_display = self.selected_build_order_display
         if self.build_order_timer['use_timer'] and self.build_order_timer['steps']:
-            # get steps to display
-            selected_steps_ids, selected_steps = get_build_order_timer_steps_display(
-                self.build_order_timer['steps'], self.build_order_timer['steps_ids']
+            # timer steps matching the build order steps
+            assert len(self.build_order_timer['steps']) == len(build_order_display)
+            selected_steps_ids, selected_steps = self.build_order_timer['steps'].get_steps_display(
+                build_order_display, self.build_order_timer['steps_ids']
             )
         else:
-            selected_build_order_content = self.selected_build_order['build_order']
-
             # select current step
             assert 0 <= self.selected_build_order_step_id < self.selected_build_order_step_count
             selected_steps_ids = [0]
-            selected_steps = [selected_build_order_content[self.selected_build_order_step_id]]
-            assert selected_steps[0] is not None
+            selected_steps = [build_order_display[self.selected_build_order_step_id]]
         assert (len(selected_steps) > 0) and (len(selected_steps_ids) > 0)
 
         return selected_steps, selected_steps_ids
 
+    def update_build_order_resources(self, selected_steps, selected_steps_ids) -> bool:
+        """Update the resources of the build order.
+
+        Parameters
+        ----------
+        selected_steps        List of steps displays to show (see 'get_build_order_selected_steps_display').
+        selected_steps_ids    Step IDs of 'selected_steps' (the last one is used to display the resources).
+
+        Returns
+        -------
+        True if resources displayed, False if no resource to display.
+        """
+        resources_tokens = selected_steps[selected_steps_ids[-1]]['resources']
+        self.build_order_resources.add_row_from_tokens(parent=self, tokens=resources_tokens)
+        return resources_tokens is not None
+
     def update_build_order_notes(self, selected_steps, selected_steps_ids):
         """Update the notes of the build order.
 
         Parameters
         ----------
-        selected_steps        Step IDs of the output list (see below).
-        selected_steps_ids    List of steps to display.
+        selected_steps        List of steps displays to show (see 'get_build_order_selected_steps_display').
+        selected_steps_ids    Step IDs of 'selected_steps'.
         """
 
         layout = self.settings.layout
-        spacing = ' ' * layout.build_order.resource_spacing  # space between the elements
 
         # line before notes
         self.build_order_notes.add_row_color(
             parent=self, height=layout.build_order.height_line_notes, color=layout.build_order.color_line_notes
         )
 
+        # add time if running timer and time available
+        resource_step = selected_steps[selected_steps_ids[-1]]  # ID of the step to use to display the resources
+        time_in_notes = (
+            (self.build_order_timer['use_timer'])
+            and (resource_step['timed_notes'] is not None)
+            and hasattr(layout.build_order, 'show_time_in_notes')
+            and layout.build_order.show_time_in_notes
+        )
+
         # loop on the steps for notes
         for step_id, selected_step in enumerate(selected_steps):
 
             # check if emphasis must be added on the corresponding note
             emphasis_flag = self.build_order_timer['run_timer'] and (step_id in selected_steps_ids)
 
-            notes = selected_step['notes']
-            for note_id, note in enumerate(notes):
-                # add time if running timer and time available
-                line = ''
-                resource_step = selected_steps[selected_steps_ids[-1]]  # ID of the step to use to display the resources
-                if (
-                    (self.build_order_timer['use_timer'])
-                    and ('time' in resource_step)
-                    and hasattr(layout.build_order, 'show_time_in_notes')
-                    and layout.build_order.show_time_in_notes
-                ):
-                    line += (str(selected_step['time']) if (note_id == 0) else ' ') + '@' + spacing + '@'
+            notes_tokens = selected_step['timed_notes'] if time_in_notes else selected_step['notes']
+            for note_tokens in notes_tokens:
+                if time_in_notes:
                     self.adapt_notes_to_columns = 1
-                line += note
-                self.build_order_notes.add_row_from_picture_line(parent=self, line=line, emphasis_flag=emphasis_flag)
+                self.build_order_notes.add_row_from_tokens(parent=self, tokens=note_tokens, emphasis_flag=emphasis_flag)
 
     def build_order_panel_layout(self):
         """Layout of the Build order panel."""
         if self.selected_panel != PanelID.BUILD_ORDER:
             return
+        self.build_order_render_layout = False  # pending layout request done now
 
         # show elements
         if (self.selected_build_order is not None) and ('build_order' in self.selected_build_order):
@@ -1870,7 +2512,8 @@ class RTSGameOverlay(QMainWindow):
                 self.selected_build_order_step_id = self.build_order_timer['steps_ids'][0]
 
             self.update_build_order_start_stop_timer_icon()
-            self.update_build_order()
+            self.schedule_build_order_timer()  # stopped for the manual selection
+            self.request_build_order_render()
         else:
             self.build_order_timer['use_timer'] = False
 
@@ -1886,18 +2529,19 @@ class RTSGameOverlay(QMainWindow):
             new_run_state = (not self.build_order_timer['run_timer']) if invert_run else run_value
 
             if new_run_state != self.build_order_timer['run_timer']:  # only update if change
+                self.update_build_order_timer_time()  # time when stopping the timer
                 self.build_order_timer['run_timer'] = new_run_state
 
                 # panel display
                 self.update_build_order_start_stop_timer_icon()  # update icon
                 self.build_order_timer['last_time_label'] = ''
-                self.build_order_panel_layout()
 
                 # time
                 self.build_order_timer['absolute_time_init'] = time.time()
                 self.build_order_timer['time_sec_init'] = self.build_order_timer['time_sec']
+                self.schedule_build_order_timer()
 
-                self.update_build_order()
+                self.request_build_order_render()
 
     def update_build_order_step_label(self):
         """Update the build order step label."""
@@ -1925,9 +2569,10 @@ class RTSGameOverlay(QMainWindow):
             time_label = negative_str + str(time_min) + ':' + str('{:02d}'.format(time_sec))
 
             if time_label != self.build_order_timer['last_time_label']:
-                # update label and layout
+                # update label in place, layout only needed if the label does not fit anymore
                 self.build_order_step_time.setText(time_label)
-                self.build_order_panel_layout()
+                if self.build_order_step_time.sizeHint().width() > self.build_order_step_time.width():
+                    self.request_build_order_render(rebuild=False)
 
                 self.build_order_timer['last_time_label'] = time_label
 
@@ -1946,5 +2591,5 @@ class RTSGameOverlay(QMainWindow):
                 self.update_build_order_time_label()
             else:
                 self.update_build_order_step_label()
-            self.update_build_order()
-            self.build_order_panel_layout()
+            self.timer_build_order_call()  # steps and next update of the running timer
+            self.request_build_order_render()
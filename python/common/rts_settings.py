@@ -16,6 +16,8 @@ class RTSConfigurationLayout(SettingsSubclass):
         self.bo_list_max_count: int = 10  # maximum count of valid build orders in the selection list
         self.bo_list_fuzz_search: bool = True  # True to use fuzzy search, False for splitting words search
         self.bo_list_fuzz_score_cutoff: int = 50  # score cutoff parameter for the fuzzy search
+        self.bo_list_async_search: bool = True  # True to search the build orders in another thread (no typing lag)
+        self.bo_list_search_delay_ms: int = 100  # delay between typing and searching (asynchronous search) [ms]
 
 
 class RTSBuildOrderLayout(SettingsSubclass):
@@ -28,6 +30,10 @@ class RTSBuildOrderLayout(SettingsSubclass):
         self.bo_next_tab_spacing: int = 30  # horizontal spacing between build order last button and next tab button
         self.height_line_notes: int = 3  # height of the line before the notes
         self.color_line_notes: list = [168, 177, 183]  # color of the line before the notes
+        self.image_case_insensitive: bool = True  # True to find the images even if their case does not match
+        self.image_cache_mb: int = 32  # memory budget of the cache of the scaled images [MB]
+        self.painted_rows: bool = False  # True to paint the resources and notes rows in a single widget (at launch)
+        self.prefetch_steps: bool = True  # True to prepare the neighbouring steps in idle time (faster step change)
 
 
 class RTSBuildOrderTimerLayout(RTSBuildOrderLayout):
@@ -122,6 +128,20 @@ class RTSTimerHotkeys(RTSHotkeys):
         self.reset_timer: KeyboardMouse = KeyboardMouse()  # reset the build order timer
 
 
+class RTSBuildOrderLoading(SettingsSubclass):
+    """Settings for the loading of the build orders"""
+
+    def __init__(self):
+        """Constructor"""
+        self.use_cache: bool = True  # True to store the validated build orders in a cache file (faster loading)
+        self.workers: int = 0  # number of threads reading the build order files (0 for CPU count, 1 for no thread)
+        self.lazy: bool = True  # True to read the build order steps at their first selection (faster loading)
+        self.resident_count: int = 10  # maximal number of full build orders kept in memory when 'lazy' is True
+        self.watch_files: bool = True  # True to update the build orders when their files change (no reload needed)
+        self.watch_polling: bool = False  # True to check the files periodically instead of using system notifications
+        self.watch_polling_ms: int = 2000  # period to check the build order files when polling [ms]
+
+
 class RTSOverlaySettings(SettingsSubclass):
     """Settings for the RTS overlay"""
 
@@ -131,5 +151,8 @@ class RTSOverlaySettings(SettingsSubclass):
 
         self.call_ms: int = 20  # interval between 2 calls (e.g. for mouse motion) [ms]
 
+        # loading of the build orders
+        self.build_order_loading: RTSBuildOrderLoading = RTSBuildOrderLoading()
+
         # panel to configure the hotkeys
         self.panel_hotkeys: RTSHotkeysConfigurationLayout = RTSHotkeysConfigurationLayout()
@@ -90,6 +90,54 @@ def list_directory_files(directory: str, extension: Union[str, list] = None, rec
         ]
 
 
+def scan_directory_files(directory: str, extension: str = None, recursive: bool = True):
+    """Generator listing the files in a directory, using 'os.scandir' (order given by 'get_scan_order_key').
+
+    Parameters
+    ----------
+    directory    Directory to check.
+    extension    Extension of the files to look for (with dot), None if not relevant.
+    recursive    True if recursive search, False for search only at the root.
+
+    Returns
+    -------
+    Requested files, yielded as soon as they are found.
+    """
+    try:
+        entries = sorted(os.scandir(directory), key=lambda entry: entry.name)  # same order on any file system
+    except OSError:
+        return
+
+    sub_directories = []
+    for entry in entries:
+        try:
+            if entry.is_file():
+                if (extension is None) or (os.path.splitext(entry.name)[1] == extension):
+                    yield entry.path
+            elif recursive and entry.is_dir(follow_symlinks=False):
+                sub_directories.append(entry.path)
+        except OSError:
+            continue
+
+    for sub_directory in sub_directories:  # files of the root first, then the sub-directories (like 'os.walk')
+        yield from scan_directory_files(sub_directory, extension, recursive)
+
+
+def get_scan_order_key(path: str) -> tuple:
+    """Get a sorting key of a file, following the order of 'scan_directory_files' in its directories.
+
+    Parameters
+    ----------
+    path    File to sort.
+
+    Returns
+    -------
+    Sorting key: files sorted by name, those of a directory before its sub-directories (also sorted by name).
+    """
+    parts = os.path.normpath(path).split(os.sep)
+    return tuple((1, directory_name) for directory_name in parts[:-1]) + ((0, parts[-1]),)
+
+
 def cut_name_length(name: str, max_length: int) -> str:
     """Cut a name to a maximum length (and remove starting and ending spaces).
 
@@ -2,17 +2,33 @@ from sc2.sc2_race_icon import sc2_race_icon
 from common.build_order_tools import (
     check_valid_faction,
     FieldDefinition,
-    check_valid_steps,
+    StepsValidator,
 )
 
 
-def check_valid_sc2_build_order(data: dict, bo_name_msg: bool = False) -> (bool, str):
+# validator of the build order steps (fields definitions compiled once)
+sc2_steps_validator = StepsValidator(
+    [
+        FieldDefinition('notes', 'array of strings', True),
+        FieldDefinition('time', 'string', False),
+        FieldDefinition('supply', 'integer', False),
+        FieldDefinition('minerals', 'integer', False),
+        FieldDefinition('vespene_gas', 'integer', False),
+    ]
+)
+
+
+def check_valid_sc2_build_order(
+    data: dict, bo_name_msg: bool = False, all_errors: bool = False, check_steps: bool = True
+) -> (bool, str):
     """Check if a build order is valid for SC2.
 
     Parameters
     ----------
     data           Data of the build order JSON file.
     bo_name_msg    True to add the build order name in the error message.
+    all_errors     True to report all the steps errors (one per line), False to stop at the first error.
+    check_steps    True to check the steps, False to only check the other fields (e.g. lazy loading).
 
     Returns
     -------
@@ -37,15 +53,10 @@ def check_valid_sc2_build_order(data: dict, bo_name_msg: bool = False) -> (bool,
         if not valid_opponent_race:
             return False, opponent_race_msg
 
-        fields = [
-            FieldDefinition('notes', 'array of strings', True),
-            FieldDefinition('time', 'string', False),
-            FieldDefinition('supply', 'integer', False),
-            FieldDefinition('minerals', 'integer', False),
-            FieldDefinition('vespene_gas', 'integer', False),
-        ]
+        if not check_steps:  # steps checked later
+            return True, ''
 
-        return check_valid_steps(data, bo_name_str, fields)
+        return sc2_steps_validator.check(data, bo_name_str, all_errors)
 
     except KeyError as err:
         return False, bo_name_str + f'Wrong JSON key: {err}.'
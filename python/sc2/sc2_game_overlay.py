@@ -188,12 +188,7 @@ class SC2GameOverlay(RTSGameOverlay):
                     }
                 )
                 if build_order_id >= 0:  # directly select in case of clicking
-                    self.select_build_order(
-                        key_condition={
-                            'race': self.race_combo_ids[self.race_select.currentIndex()],
-                            'opponent_race': self.opponent_race_combo_ids[self.opponent_race_select.currentIndex()],
-                        }
-                    )
+                    self.select_build_order()
                 self.config_panel_layout()
                 return True
         return False
@@ -222,12 +217,7 @@ class SC2GameOverlay(RTSGameOverlay):
         """Actions performed when pressing the Enter key."""
         if self.selected_panel == PanelID.CONFIG:
             if self.build_order_search.hasFocus():
-                self.select_build_order(
-                    key_condition={
-                        'race': self.race_combo_ids[self.race_select.currentIndex()],
-                        'opponent_race': self.opponent_race_combo_ids[self.opponent_race_select.currentIndex()],
-                    }
-                )
+                self.select_build_order()
 
             self.config_panel_layout()  # update layout
 
@@ -289,39 +279,46 @@ class SC2GameOverlay(RTSGameOverlay):
 
         self.config_panel_layout_resize_move()  # size and position
 
-    def update_build_order(self):
-        """Update the build order panel."""
-        super().update_build_order()
+    def get_resources_line(self, resource_step: dict) -> str:
+        """Get the line displaying the resources of a build order step.
+
+        Parameters
+        ----------
+        resource_step    Build order step.
+
+        Returns
+        -------
+        Line with images between @ markers, empty if no resource to display.
+        """
+        layout = self.settings.layout
+        spacing = ' ' * layout.build_order.resource_spacing  # space between the elements
+        images = self.images
+
+        resources_line = ''
+
+        if ('minerals' in resource_step) and (resource_step['minerals'] >= 0):
+            resources_line += spacing + '@' + images.minerals + '@ ' + str(resource_step['minerals'])
+        if ('vespene_gas' in resource_step) and (resource_step['vespene_gas'] >= 0):
+            resources_line += spacing + '@' + images.vespene_gas + '@ ' + str(resource_step['vespene_gas'])
+        if ('supply' in resource_step) and (resource_step['supply'] >= 0):
+            resources_line += spacing + '@' + images.supply + '@ ' + str(resource_step['supply'])
+        if layout.show_time_resource and ('time' in resource_step) and (resource_step['time'] != ''):
+            resources_line += spacing + '@' + images.time + '@ ' + str(resource_step['time'])
+
+        return resources_line[layout.build_order.resource_spacing :]  # remove initial spacing
+
+    def update_build_order_displays(self):
+        """Update the build order resources and notes displays."""
+        super().update_build_order_displays()
 
         # valid build order selected
         if (self.selected_build_order is not None) and ('build_order' in self.selected_build_order):
 
-            layout = self.settings.layout
-            spacing = ' ' * layout.build_order.resource_spacing  # space between the elements
-
-            # get selected steps and corresponding IDs
-            selected_steps, selected_steps_ids = self.get_build_order_selected_steps_and_ids()
+            # get selected steps (precomputed display) and corresponding IDs
+            selected_steps, selected_steps_ids = self.get_build_order_selected_steps_display()
 
             # resource line
-            images = self.images
-            resource_step = selected_steps[selected_steps_ids[-1]]  # ID of the step to use to display the resources
-            resources_line = ''
-
-            if ('minerals' in resource_step) and (resource_step['minerals'] >= 0):
-                resources_line += spacing + '@' + images.minerals + '@ ' + str(resource_step['minerals'])
-            if ('vespene_gas' in resource_step) and (resource_step['vespene_gas'] >= 0):
-                resources_line += spacing + '@' + images.vespene_gas + '@ ' + str(resource_step['vespene_gas'])
-            if ('supply' in resource_step) and (resource_step['supply'] >= 0):
-                resources_line += spacing + '@' + images.supply + '@ ' + str(resource_step['supply'])
-            if layout.show_time_resource and ('time' in resource_step) and (resource_step['time'] != ''):
-                resources_line += spacing + '@' + images.time + '@ ' + str(resource_step['time'])
-
-            self.show_resources = resources_line != ''
-            if self.show_resources:
-                resources_line = resources_line[layout.build_order.resource_spacing :]  # remove initial spacing
-                self.build_order_resources.add_row_from_picture_line(parent=self, line=str(resources_line))
+            self.show_resources = self.update_build_order_resources(selected_steps, selected_steps_ids)
 
             # update the notes of the build order
             self.update_build_order_notes(selected_steps, selected_steps_ids)
-
-        self.build_order_panel_layout()  # update layout
@@ -0,0 +1,337 @@
+import os
+import sys
+import math
+import time
+import random
+import argparse
+
+from thefuzz import process
+from PyQt5.QtWidgets import QApplication, QWidget, QLabel
+from PyQt5.QtGui import QFont
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.build_order_library import BuildOrderLibrary  # noqa: E402
+from common.build_order_search import BuildOrderSearch  # noqa: E402
+from common.build_order_tools import FieldDefinition, check_valid_steps  # noqa: E402
+from common.label_display import MultiQLabelDisplay, QLabelSettings  # noqa: E402
+from common.painted_label_display import PaintedMultiLabelDisplay  # noqa: E402
+from aoe2.aoe2_build_order import aoe2_steps_validator  # noqa: E402
+
+# words used to generate the build order names
+NAME_WORDS = [
+    'Fast',
+    'Castle',
+    'Feudal',
+    'Imperial',
+    'Scouts',
+    'Archers',
+    'Knights',
+    'Drush',
+    'FC',
+    'Boom',
+    'Tower',
+    'Rush',
+    'Men-at-Arms',
+    'Skirmishers',
+    'into',
+    'with',
+    '(Generic)',
+    'Mangudai',
+    'Crossbows',
+    'Spearmen',
+]
+
+# search texts (each prefix is searched, as when typing them)
+SEARCH_TEXTS = ['fast castle', 'archers', 'men at arms', 'kni rush', 'drush fc', 'boom into imp', 'mangu']
+
+
+def generate_library(count: int, seed: int) -> BuildOrderLibrary:
+    """Generate a library of build orders with random names.
+
+    Parameters
+    ----------
+    count    Number of build orders.
+    seed     Seed of the random generator.
+
+    Returns
+    -------
+    Library of the generated build orders.
+    """
+    rng = random.Random(seed)
+    build_orders = BuildOrderLibrary()
+    for i in range(count):
+        name = ' '.join(rng.sample(NAME_WORDS, rng.randint(2, 5))) + f' {i}'
+        build_orders.add({'name': name})
+    return build_orders
+
+
+def benchmark_fuzzy_search(build_orders: BuildOrderLibrary, score_cutoff: int, limit: int):
+    """Compare the fuzzy search of 'BuildOrderSearch' with 'thefuzz.process.extractBests'.
+
+    Parameters
+    ----------
+    build_orders    Library of the build orders.
+    score_cutoff    Score cutoff parameter for the fuzzy search.
+    limit           Maximal number of results.
+    """
+    queries = [text[:i] for text in SEARCH_TEXTS for i in range(1, len(text) + 1)]
+    handles = build_orders.handles()
+    names = {handle: build_orders.get(handle)['name'] for handle in handles}
+
+    search_engine = BuildOrderSearch(build_orders)
+    for handle in handles:  # names profiles computed once, as when using the search bar
+        search_engine.get_name_profile(handle)
+
+    reference_duration = 0.0
+    search_duration = 0.0
+    for query in queries:
+        start = time.perf_counter()
+        reference = [match[2] for match in process.extractBests(query, names, score_cutoff=score_cutoff, limit=limit)]
+        reference_duration += time.perf_counter() - start
+
+        search_engine.results_cache.clear()  # no cached result
+        start = time.perf_counter()
+        results = search_engine.search_fuzzy(query, handles, score_cutoff=score_cutoff, limit=limit)
+        search_duration += time.perf_counter() - start
+
+        if results != reference:
+            print(f'Different results for \'{query}\': {results} instead of {reference}.')
+
+    print(f'Fuzzy search of {len(queries)} texts in {len(build_orders)} build orders:')
+    print(f'    extractBests:     {1000.0 * reference_duration / len(queries):.2f} ms per search')
+    print(f'    BuildOrderSearch: {1000.0 * search_duration / len(queries):.2f} ms per search')
+    print(f'    speedup:          {reference_duration / max(search_duration, 1e-9):.1f}x')
+
+
+def generate_steps_build_orders(step_count: int, seed: int, steps_per_build_order: int = 20) -> list:
+    """Generate AoE2 build orders (only their steps), some of them with errors.
+
+    Parameters
+    ----------
+    step_count               Total number of steps.
+    seed                     Seed of the random generator.
+    steps_per_build_order    Number of steps of each build order.
+
+    Returns
+    -------
+    List of build orders data.
+    """
+    rng = random.Random(seed)
+    build_orders = []
+    for bo_id in range(max(1, step_count // steps_per_build_order)):
+        steps = []
+        for step_id in range(steps_per_build_order):
+            step = {
+                'villager_count': 3 + step_id,
+                'age': 1 + step_id * 3 // steps_per_build_order,
+                'resources': {'wood': rng.randint(0, 20), 'food': rng.randint(0, 20), 'gold': 0, 'stone': 0},
+                'notes': [f'Note {step_id}', 'Build @building_economy/house.png@'],
+            }
+            if rng.random() < 0.5:
+                step['time'] = f'{step_id // 2}:{10 * (step_id % 6)}'
+            steps.append(step)
+
+        if bo_id % 10 == 0:  # errors in some steps
+            error_step = steps[rng.randrange(steps_per_build_order)]
+            error_type = rng.randrange(3)
+            if error_type == 0:
+                error_step['age'] = 7  # out of range
+            elif error_type == 1:
+                del error_step['resources']['food']  # missing field
+            else:
+                error_step['notes'] = 'Not a list'  # wrong type
+
+        build_orders.append({'name': f'Build order {bo_id}', 'build_order': steps})
+    return build_orders
+
+
+def benchmark_steps_validation(build_orders: list):
+    """Compare the compiled steps validator ('StepsValidator') with 'check_valid_steps'.
+
+    Parameters
+    ----------
+    build_orders    Build orders data.
+    """
+    fields = [check for _, _, checks in aoe2_steps_validator.groups for check in checks]
+    step_count = sum(len(build_order['build_order']) for build_order in build_orders)
+
+    # reference validator, with the fields definitions created for each build order (as before compiling them)
+    start = time.perf_counter()
+    reference = []
+    for build_order in build_orders:
+        reference_fields = [
+            FieldDefinition('villager_count', 'integer', True),
+            FieldDefinition('age', 'integer', True, None, [-math.inf, 4]),
+            FieldDefinition('wood', 'integer', True, 'resources'),
+            FieldDefinition('food', 'integer', True, 'resources'),
+            FieldDefinition('gold', 'integer', True, 'resources'),
+            FieldDefinition('stone', 'integer', True, 'resources'),
+            FieldDefinition('builder', 'integer', False, 'resources'),
+            FieldDefinition('notes', 'array of strings', True),
+            FieldDefinition('time', 'string', False),
+        ]
+        try:
+            reference.append(check_valid_steps(build_order, '', reference_fields))
+        except Exception as err:  # wrong type of value not converted to string in 'FieldDefinition.check'
+            reference.append((False, str(err)))
+    reference_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [aoe2_steps_validator.check(build_order) for build_order in build_orders]
+    compiled_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    all_errors = [aoe2_steps_validator.get_errors(build_order) for build_order in build_orders]
+    all_errors_duration = time.perf_counter() - start
+
+    for build_order, (valid, _), (reference_valid, _) in zip(build_orders, results, reference):
+        if valid != reference_valid:
+            print(f'Different validity for \'{build_order["name"]}\': {valid} instead of {reference_valid}.')
+
+    print(f'Validation of {len(build_orders)} build orders ({step_count} steps, {len(fields)} fields per step):')
+    print(f'    check_valid_steps:              {1000.0 * reference_duration:.2f} ms')
+    print(f'    StepsValidator (first error):   {1000.0 * compiled_duration:.2f} ms')
+    print(f'    StepsValidator (all errors):    {1000.0 * all_errors_duration:.2f} ms')
+    print(f'    speedup:                        {reference_duration / max(compiled_duration, 1e-9):.1f}x')
+    print(f'    invalid build orders:           {sum(not valid for valid, _ in results)}')
+    print(f'    errors (all errors mode):       {sum(len(errors) for errors in all_errors)}')
+
+
+def benchmark_rows_display(build_orders: list, display_count: int):
+    """Compare the display of the build order notes with one QLabel per element and with painted rows.
+
+    Parameters
+    ----------
+    build_orders     Build orders data.
+    display_count    Number of displayed steps.
+    """
+    app = QApplication.instance() or QApplication(sys.argv)  # use QT_QPA_PLATFORM=offscreen without screen
+    steps = [step for build_order in build_orders for step in build_order['build_order']][:display_count]
+    pictures_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'docs', 'assets', 'aoe2')
+
+    print(f'Display of {len(steps)} steps (notes rows):')
+    for display_class in [MultiQLabelDisplay, PaintedMultiLabelDisplay]:
+        parent = QWidget()
+        parent.show()
+        display = display_class(
+            font_police='Arial',
+            font_size=11,
+            border_size=15,
+            vertical_spacing=10,
+            color_default=[255, 255, 255],
+            color_row_emphasis=[0, 51, 102],
+            image_height=30,
+            game_pictures_folder=pictures_folder,
+        )
+
+        start = time.perf_counter()
+        for step_id, step in enumerate(steps):
+            display.clear()
+            for note_id, note in enumerate(step['notes'] if isinstance(step['notes'], list) else [step['notes']]):
+                display.add_row_from_picture_line(parent, note, emphasis_flag=(note_id == step_id % 2))
+            display.update_size_position()
+            display.show()
+            parent.repaint()  # paint immediately
+            app.processEvents()
+        duration = time.perf_counter() - start
+
+        print(f'    {display_class.__name__ + ":":<30}{1000.0 * duration / max(1, len(steps)):.2f} ms per step')
+        display.clear()
+        parent.close()
+
+
+def benchmark_label_styles(note_count: int, repeat_count: int = 20):
+    """Compare the labels style sheets (one per label) with the shared styles, on a step with many notes.
+
+    Parameters
+    ----------
+    note_count      Number of notes of the step.
+    repeat_count    Number of times the step is styled.
+    """
+    app = QApplication.instance() or QApplication(sys.argv)  # use QT_QPA_PLATFORM=offscreen without screen
+    parent = QWidget()
+    parent.setStyleSheet('background-color: rgb(30, 30, 30)')  # as the overlay window
+    parent.show()
+    notes = [f'Note {note_id} with some text' for note_id in range(note_count)]
+    colors = [[255, 255, 255], [255, 0, 0]]  # default and hovering colors
+
+    # style sheet and font created for each label
+    create_durations = [0.0, 0.0]  # creation and style of the labels, for each method [s]
+    recolor_durations = [0.0, 0.0]  # recoloring of all the labels (e.g. when hovering them), for each method [s]
+    for repeat_id in range(repeat_count):
+        start = time.perf_counter()
+        labels = []
+        for note in notes:
+            label = QLabel(note, parent)
+            label.setFont(QFont('Arial', 11))
+            label.setStyleSheet('color: rgb(255, 255, 255)')
+            label.adjustSize()
+            label.show()
+            labels.append(label)
+        create_durations[0] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for color in colors * 2:
+            for label in labels:
+                label.setStyleSheet(f'color: rgb({color[0]}, {color[1]}, {color[2]})')
+        recolor_durations[0] += time.perf_counter() - start
+
+        for label in labels:
+            label.deleteLater()
+        app.processEvents()  # painting and deletion (not measured, same for both methods)
+
+    # shared styles and fonts
+    display = MultiQLabelDisplay(
+        font_police='Arial', font_size=11, border_size=15, vertical_spacing=10, color_default=[255, 255, 255]
+    )
+    for repeat_id in range(repeat_count):
+        start = time.perf_counter()
+        labels = []
+        for note in notes:
+            label = display.create_label(parent)
+            display.set_label_content(label, text=note)
+            display.set_qlabel_settings(label)
+            label.adjustSize()
+            label.show()
+            labels.append(label)
+        create_durations[1] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for color in colors * 2:
+            for label in labels:
+                display.set_qlabel_settings(label, QLabelSettings(text_color=color))
+        recolor_durations[1] += time.perf_counter() - start
+
+        for label in labels:
+            del display.label_states[label]
+            label.deleteLater()
+        app.processEvents()
+
+    parent.close()
+
+    print(f'Style of a step with {note_count} notes:')
+    for name, durations in [('labels creation', create_durations), ('labels recoloring', recolor_durations)]:
+        print(f'    {name}:')
+        print(f'        style sheets:     {1000.0 * durations[0] / repeat_count:.2f} ms per step')
+        print(f'        shared styles:    {1000.0 * durations[1] / repeat_count:.2f} ms per step')
+        print(f'        speedup:          {durations[0] / max(durations[1], 1e-9):.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the build orders management.')
+    parser.add_argument('-c', '--count', type=int, default=10000, help='Number of generated build orders')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='Seed of the random generator')
+    parser.add_argument('--score_cutoff', type=int, default=50, help='Score cutoff parameter for the fuzzy search')
+    parser.add_argument('--limit', type=int, default=10, help='Maximal number of results of the fuzzy search')
+    parser.add_argument('--steps', type=int, default=10000, help='Number of generated steps for the validation')
+    parser.add_argument('--display_steps', type=int, default=500, help='Number of displayed steps (0 to skip)')
+    parser.add_argument('--notes', type=int, default=40, help='Number of notes of the styled step (0 to skip)')
+
+    args = parser.parse_args()
+
+    benchmark_fuzzy_search(generate_library(args.count, args.seed), args.score_cutoff, args.limit)
+    benchmark_steps_validation(generate_steps_build_orders(args.steps, args.seed))
+    if args.display_steps > 0:
+        benchmark_rows_display(generate_steps_build_orders(args.display_steps, args.seed), args.display_steps)
+    if args.notes > 0:
+        benchmark_label_styles(args.notes)